@@ -0,0 +1,82 @@
+"""CLI startup benchmark: import cost of ``it_claws.main`` and ``it-claws --help``.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_import --repeat 20 --budget 0.15
+
+Every sample runs in a fresh interpreter. The run fails when a module from
+``HEAVY_MODULES`` is imported at startup, or when the median ``--help`` time
+exceeds ``--budget`` seconds.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("selenium", "lxml", "inquirer", "fake_useragent", "patoolib", "asyncio", "httpx")
+
+_PROBE = (
+    "import sys, it_claws.main; it_claws.main.build_parser(); "
+    "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+)
+
+
+def loaded_modules() -> set[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return set(out.strip().split(","))
+
+
+def import_seconds() -> float:
+    """Cumulative ``-X importtime`` of ``it_claws.main`` in seconds."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import it_claws.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    for line in err.splitlines():
+        if line.rstrip().endswith("| it_claws.main"):
+            return int(line.split("|")[1]) / 1_000_000
+    raise RuntimeError("it_claws.main missing from -X importtime output")
+
+
+def help_seconds() -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import sys; sys.argv[1:] = ['--help']; "
+         "from it_claws.main import run; run()"],
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )  # fmt: skip
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_import", description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=None, help="Max median --help seconds")
+    args = parser.parse_args(argv)
+
+    imports = [import_seconds() for _ in range(args.repeat)]
+    helps = [help_seconds() for _ in range(args.repeat)]
+    heavy = sorted(loaded_modules() & set(HEAVY_MODULES))
+
+    print(f"Python {sys.version.split()[0]}, {args.repeat} run(s) each")
+    print(f"import it_claws.main  median {statistics.median(imports) * 1000:7.1f} ms")
+    print(f"it-claws --help       median {statistics.median(helps) * 1000:7.1f} ms")
+    status = 0
+    if heavy:
+        print(f"heavy modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        status = 1
+    if args.budget is not None and statistics.median(helps) > args.budget:
+        print(f"--help exceeds the {args.budget:.3f}s budget", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""End-to-end pipeline benchmark against the local fake-vendor server.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_pipeline --max-concurrent 1 4 8 --compress-level 1 5 \\
+        --archive-mode none zip --size 8M --latency 0.05 --bandwidth 20M
+
+Each combination runs the real ``ConcurrentPipeline``/``AsyncPipeline`` on
+rewired copies of ``presets.TARGETS``. Results are appended to a JSON-lines
+file and compared with the best earlier result for the same parameters.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from it_claws import archive
+from it_claws.async_engine import AsyncPipeline
+from it_claws.bandwidth import parse_size
+from it_claws.engine import ConcurrentPipeline
+from it_claws.models import DownloadJob, ScrapeTarget
+from it_claws.presets import expand_selection, get_selection_choices
+from it_claws.scrapers import (
+    resolve_direct_url,
+    resolve_intel_static,
+    resolve_nvidia_static,
+    resolve_static_download,
+)
+
+from .fake_vendor import (
+    ARCHIVE_TYPES,
+    FakeVendorServer,
+    FaultProfile,
+    href_for,
+    synthetic_archive,
+    synthetic_bytes,
+    vendor_page,
+)
+
+ENGINES = {"threads": ConcurrentPipeline, "async": AsyncPipeline}
+DEFAULT_RESULTS = Path(__file__).parent / "results" / "pipeline.jsonl"
+
+
+def _have_7z() -> bool:
+    program = archive._find_7z()
+    return bool(shutil.which(program) or Path(program).exists())
+
+
+def rewire(
+    server: FakeVendorServer,
+    target: ScrapeTarget,
+    slug: str,
+    size: int,
+    compressibility: float,
+    filler: int,
+) -> ScrapeTarget | str:
+    """Point ``target`` at the fake server, or return the reason it cannot be."""
+    if target.file_type in ARCHIVE_TYPES and not _have_7z():
+        return "7z not available for extraction"
+
+    seed = sum(slug.encode())
+    if target.file_type in ARCHIVE_TYPES:
+        body = synthetic_archive(target.file_type, size, compressibility, seed)
+        suffix, content_type = ".zip", "application/zip"
+    else:
+        body = synthetic_bytes(size, compressibility, seed)
+        suffix, content_type = ".exe", "application/octet-stream"
+
+    resolver = target.static_resolver if target.resolver_type == "dynamic" else target.resolver
+    kwargs = {**target.resolver_kwargs, **target.static_resolver_kwargs}
+    page = f"/page/{slug}"
+
+    if resolver is resolve_direct_url:
+        url = server.add(f"/bin/{slug}/{slug}{suffix}", body, content_type)
+        kwargs = {"url": url}
+    elif resolver is resolve_static_download:
+        binary = server.add(href_for(slug, kwargs["selector"], suffix), body, content_type)
+        html = vendor_page(slug, kwargs["selector"], binary, filler)
+        kwargs["url"] = server.add(page, html.encode(), "text/html")
+    elif resolver is resolve_intel_static:
+        binary = server.add(f"/bin/{slug}/{slug}{suffix}", body, content_type)
+        html = f'<html><head><meta name="RecommendedDownloadUrl" content="{binary}"></head></html>'
+        kwargs["url"] = server.add(page, html.encode(), "text/html")
+    elif resolver is resolve_nvidia_static:
+        binary = server.add(f"/bin/{slug}/{slug}{suffix}", body, content_type)
+        landing = server.add(
+            f"{page}/landing",
+            f'<a id="agreeDownloadBtn" href="{binary}">Agree</a>'.encode(),
+            "text/html",
+        )
+        html = f'<a id="DsktpGrdDwnldBtn" href="{landing}">Download</a>'
+        kwargs["url"] = server.add(page, html.encode(), "text/html")
+    else:
+        name = getattr(resolver, "__name__", "no static resolver")
+        return f"{name} targets a fixed vendor host"
+
+    if target.resolver_type == "dynamic":
+        return replace(target, resolver_kwargs=kwargs, static_resolver_kwargs={})
+    return replace(target, resolver_kwargs=kwargs, include_cookies=None)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_case(args: argparse.Namespace, params: dict[str, Any]) -> dict[str, Any]:
+    faults = FaultProfile(args.latency, args.bandwidth, args.failure_rate, args.seed)
+    server = FakeVendorServer(faults).start()
+    try:
+        jobs_spec, skipped = [], {}
+        for target, name in expand_selection(args.targets or get_selection_choices()):
+            slug = (name or target.name).replace(" ", "-")
+            wired = rewire(server, target, slug, args.size, args.compressibility, args.filler)
+            if isinstance(wired, str):
+                skipped[slug] = wired
+            else:
+                jobs_spec.append((wired, name))
+
+        with tempfile.TemporaryDirectory(prefix="it-claws-bench-") as tmp:
+            output = Path(tmp) / "downloads"
+            zip_path = Path(tmp) / "pack.zip" if params["archive_mode"] != "none" else None
+            pipeline = ENGINES[params["engine"]](
+                max_concurrent=params["max_concurrent"],
+                retries=args.retries,
+                compress_level=params["compress_level"],
+            )
+            pipeline.execute(
+                [DownloadJob(target=t, output_root=output, name=n) for t, n in jobs_spec],
+                output,
+                zip_path,
+                manifest=params["archive_mode"] == "zip+manifest",
+            )
+            report = pipeline.report.to_dict()
+            archive_bytes = zip_path.stat().st_size if zip_path and zip_path.exists() else None
+    finally:
+        server.stop()
+
+    return {
+        "recorded_at": datetime.now(UTC).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "params": params,
+        "server": {
+            "size": args.size,
+            "latency": args.latency,
+            "bandwidth": args.bandwidth,
+            "failure_rate": args.failure_rate,
+            "compressibility": args.compressibility,
+            "requests": server.requests,
+        },
+        "skipped": skipped,
+        "wall_seconds": report["wall_seconds"],
+        "upload_ready_seconds": report["upload_ready_seconds"],
+        "archive_bytes": archive_bytes,
+        "totals": report["totals"],
+    }
+
+
+def _key(record: dict[str, Any]) -> str:
+    return json.dumps([record["params"], {**record["server"], "requests": None}], sort_keys=True)
+
+
+def load_results(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bench_pipeline", description=__doc__.split("\n")[0])
+    parser.add_argument("--targets", nargs="+", default=None, help="Preset names (default: all)")
+    parser.add_argument("--engine", nargs="+", choices=ENGINES, default=["threads"])
+    parser.add_argument("--max-concurrent", nargs="+", type=int, default=[3])
+    parser.add_argument("--compress-level", nargs="+", type=int, default=[5])
+    parser.add_argument(
+        "--archive-mode",
+        nargs="+",
+        choices=("none", "zip", "zip+manifest"),
+        default=["zip"],
+    )
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=parse_size("4M"),
+        help="Payload size, e.g. 4M (decimal units)",
+    )
+    parser.add_argument("--compressibility", type=float, default=0.5)
+    parser.add_argument("--filler", type=int, default=2000, help="Filler elements per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument(
+        "--bandwidth", type=parse_size, default=None, help="Bytes/s per stream, e.g. 25M"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--no-record", action="store_true", help="Do not append results")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    history = load_results(args.results)
+    rows = []
+
+    for engine, concurrent, level, mode, _ in itertools.product(
+        args.engine, args.max_concurrent, args.compress_level, args.archive_mode, range(args.repeat)
+    ):
+        params = {
+            "engine": engine,
+            "max_concurrent": concurrent,
+            "compress_level": level,
+            "archive_mode": mode,
+        }
+        record = run_case(args, params)
+        earlier = [r["wall_seconds"] for r in history if _key(r) == _key(record)]
+        best = min(earlier) if earlier else None
+        rows.append((record, best))
+        history.append(record)
+        if not args.no_record:
+            args.results.parent.mkdir(parents=True, exist_ok=True)
+            with args.results.open("a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    print(
+        f"{'engine':8} {'conc':>4} {'lvl':>3} {'archive':13} "
+        f"{'wall s':>8} {'MB/s':>8} {'vs best':>8}"
+    )
+    for record, best in rows:
+        p, totals = record["params"], record["totals"]
+        mbps = (totals["download_throughput_bps"] or 0) / 10**6
+        delta = f"{(record['wall_seconds'] / best - 1) * 100:+.1f}%" if best else "new"
+        print(
+            f"{p['engine']:8} {p['max_concurrent']:>4} {p['compress_level']:>3} "
+            f"{p['archive_mode']:13} {record['wall_seconds']:>8.2f} {mbps:>8.1f} {delta:>8}"
+        )
+    if rows and rows[0][0]["skipped"]:
+        print(f"Skipped {len(rows[0][0]['skipped'])} target(s):", file=sys.stderr)
+        for slug, reason in rows[0][0]["skipped"].items():
+            print(f"  {slug}: {reason}", file=sys.stderr)
+    return 0 if all(r["totals"]["failed"] == 0 for r, _ in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Local HTTP server impersonating vendor support pages and download mirrors.
+
+Pages are generated per target so the selectors in ``presets.TARGETS`` match
+them, and every page links to a synthetic payload served from ``/bin/``.
+Latency, per-connection bandwidth and failure rate are injectable.
+"""
+
+import io
+import random
+import re
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+ARCHIVE_TYPES = ("zip", "zip/exe", "zip/folder", "sfx")
+SFX_STUB = b"MZ" + b"\0" * 510
+"""Stand-in for the PE stub a self-extracting archive starts with."""
+
+
+@dataclass
+class FaultProfile:
+    latency: float = 0.0
+    """Seconds added before every response."""
+    bandwidth: int | None = None
+    """Bytes per second per connection, or None for unthrottled."""
+    failure_rate: float = 0.0
+    """Probability of answering 503 instead of the real response."""
+    seed: int = 0
+
+
+@dataclass
+class Route:
+    body: bytes
+    content_type: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def synthetic_bytes(size: int, compressibility: float = 0.5, seed: int = 0) -> bytes:
+    """Return ``size`` bytes of which roughly ``compressibility`` deflates away."""
+    rng = random.Random(seed)
+    block = 64 * 1024
+    out = bytearray(b"MZ")
+    while len(out) < size:
+        if rng.random() < compressibility:
+            out += bytes([rng.randrange(256)]) * block
+        else:
+            out += rng.randbytes(block)
+    return bytes(out[:size])
+
+
+def synthetic_archive(file_type: str, size: int, compressibility: float, seed: int) -> bytes:
+    """Build a zip whose layout satisfies ``extract_archive`` for ``file_type``.
+
+    ``sfx`` bodies get a stub PE header in front, like a self-extracting
+    archive, so they pass the download signature check; 7z still finds the zip.
+    """
+    payload = synthetic_bytes(size, compressibility, seed)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        if file_type == "zip/exe":
+            zf.writestr("setup/Setup.exe", payload)
+        elif file_type == "zip/folder":
+            zf.writestr("package/Setup.exe", payload)
+            zf.writestr("package/readme.txt", b"synthetic\n")
+        else:
+            zf.writestr("Setup.exe", payload)
+            zf.writestr("data/readme.txt", b"synthetic\n")
+    if file_type == "sfx":
+        return SFX_STUB + buf.getvalue()
+    return buf.getvalue()
+
+
+class FakeVendorServer:
+    """Threaded HTTP server with a mutable route table."""
+
+    def __init__(self, faults: FaultProfile | None = None, host: str = "127.0.0.1") -> None:
+        self.faults = faults or FaultProfile()
+        self.routes: dict[str, Route] = {}
+        self.requests = 0
+        self._rng = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                server._handle(self, send_body=True)
+
+            def do_HEAD(self) -> None:
+                server._handle(self, send_body=False)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, path: str, body: bytes, content_type: str, **headers: str) -> str:
+        self.routes[path] = Route(body, content_type, headers)
+        return self.base_url + path
+
+    def start(self) -> "FakeVendorServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handle(self, handler: BaseHTTPRequestHandler, send_body: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.faults.failure_rate
+        if self.faults.latency:
+            time.sleep(self.faults.latency)
+
+        route = self.routes.get(handler.path.split("?")[0])
+        if route is None or fail:
+            status, body = (503, b"unavailable") if route else (404, b"not found")
+            handler.send_response(status)
+            handler.send_header("Content-Type", "text/plain")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            if send_body:
+                handler.wfile.write(body)
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", route.content_type)
+        handler.send_header("Content-Length", str(len(route.body)))
+        for name, value in route.headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if send_body:
+            self._write_throttled(handler, route.body)
+
+    def _write_throttled(self, handler: BaseHTTPRequestHandler, body: bytes) -> None:
+        chunk = 64 * 1024
+        view = memoryview(body)
+        started = time.perf_counter()
+        for offset in range(0, len(body), chunk):
+            try:
+                handler.wfile.write(view[offset : offset + chunk])
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            if self.faults.bandwidth:
+                ahead = (offset + chunk) / self.faults.bandwidth - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def _literals(selector: str) -> list[str]:
+    return re.findall(r'"([^"]+)"', selector)
+
+
+def href_for(name: str, selector: str, suffix: str) -> str:
+    """Build a link satisfying CSS ``[href*=..]``/``[href$=..]`` tests in ``selector``."""
+    contains = re.findall(r'\[href\*="([^"]+)"\]', selector)
+    ends = re.findall(r'\[href\$="([^"]+)"\]', selector)
+    tail = ends[0] if ends else suffix
+    return f"/bin/{name}/{''.join(contains)}{name}{tail}"
+
+
+def vendor_page(name: str, selector: str, binary_url: str, filler: int = 2000) -> str:
+    """A page where ``selector`` (CSS or XPath) finds a link to ``binary_url``.
+
+    Every quoted literal in the selector is repeated in the row text so
+    ``contains(., "...")`` predicates match too.
+    """
+    text = " ".join(_literals(selector)) or name
+    return (
+        "<html><head><title>Support</title></head><body>"
+        + "<p>filler</p>" * filler
+        + "<table><tr><th>Download Link</th></tr>"
+        + f'<tr class="item-group"><td>{text} Windows</td>'
+        + f'<td><a href="{binary_url}">Download</a></td></tr></table>'
+        + "</body></html>"
+    )
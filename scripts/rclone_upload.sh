@@ -21,6 +21,7 @@ it-claws \
     -z "$ARCHIVE_PATH" \
     --retries "${RETRIES:-1}" \
     --compress-level "${COMPRESS_LEVEL:-5}" \
+    ${METRICS_TEXTFILE:+--metrics-textfile "$METRICS_TEXTFILE"} \
     $ARGUMENTS
 
 pipeline_exit=$?
@@ -1,12 +1,26 @@
-"""Archive operations backed by 7z (extraction) and zipfile (creation)."""
+"""Archive operations backed by 7z (extraction) and zipfile, zstd or 7z (creation).
 
+``create`` writes one of ``BACKENDS``; each takes the same ``(filepath,
+arcname)`` entries, so the layout from ``walk`` is identical in every format.
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import struct
 import subprocess
 import sys
+import tarfile
+import tempfile
+import time
 import zipfile
-from collections.abc import Iterable, Iterator
+import zlib
+from collections.abc import Callable, Container, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime
 from pathlib import Path
-
-import patoolib
+from typing import BinaryIO
 
 
 def _find_7z() -> str:
@@ -17,6 +31,8 @@ def _find_7z() -> str:
     if bundled.exists():
         return str(bundled)
     try:
+        import patoolib
+
         return patoolib.find_archive_program("7z", "extract")
     except Exception:
         pass
@@ -32,6 +48,13 @@ def unzip(source: Path, target: Path, *, silent: bool = True) -> int:
     ).returncode
 
 
+def manifest_json() -> str:
+    return (
+        json.dumps({"format_version": 1, "exported_at": datetime.now(UTC).isoformat()}, indent=2)
+        + "\n"
+    )
+
+
 def walk(
     root: Path,
     base: Path,
@@ -54,7 +77,328 @@ def zip(
     entries: Iterable[tuple[Path, str]],
     *,
     level: int = 5,
+    on_entry: Callable[[Path, str, float], None] | None = None,
 ) -> None:
+    """Deflate entries into target.
+
+    on_entry, if given, is called with (filepath, arcname, seconds) after each write.
+    """
     with zipfile.ZipFile(Path(target), "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
         for filepath, arcname in entries:
+            started = time.perf_counter()
             zf.write(str(filepath), arcname)
+            if on_entry is not None:
+                on_entry(Path(filepath), arcname, time.perf_counter() - started)
+
+
+def tar_zst(
+    target: Path,
+    entries: Iterable[tuple[Path, str]],
+    *,
+    level: int = 5,
+    on_entry: Callable[[Path, str, float], None] | None = None,
+) -> None:
+    """Write entries into a zstd-compressed tar, compressing on all cores.
+
+    Needs the ``zstd`` extra (the ``zstandard`` package); see ``backend_error``.
+    Level 0 is zstd's default.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("tar.zst output needs the zstandard package") from None
+    compressor = zstandard.ZstdCompressor(level=level or 3, threads=-1)
+    with (
+        open(target, "wb") as raw,
+        compressor.stream_writer(raw) as stream,
+        tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as tar,
+    ):
+        for filepath, arcname in entries:
+            started = time.perf_counter()
+            tar.add(str(filepath), arcname, recursive=False)
+            if on_entry is not None:
+                on_entry(Path(filepath), arcname, time.perf_counter() - started)
+
+
+def sevenzip(
+    target: Path,
+    entries: Iterable[tuple[Path, str]],
+    *,
+    level: int = 5,
+    on_entry: Callable[[Path, str, float], None] | None = None,
+) -> None:
+    """Write entries into a 7z archive with the 7z binary, on all cores (``-mmt``).
+
+    7z names members after their path on disk, so the entries are first laid
+    out under their arcnames as hard links (copies across filesystems) in a
+    staging directory next to target. 7z compresses them in one call, so
+    on_entry gets each file's share of the time by size.
+    """
+    target = Path(target).resolve()
+    target.unlink(missing_ok=True)  # 7z a adds to an existing archive
+    with tempfile.TemporaryDirectory(prefix=".7z-", dir=target.parent) as staging:
+        staged: list[tuple[Path, str, int]] = []
+        for filepath, arcname in entries:
+            link = Path(staging, arcname)
+            link.parent.mkdir(parents=True, exist_ok=True)
+            link.unlink(missing_ok=True)
+            try:
+                os.link(filepath, link)
+            except OSError:
+                shutil.copy2(filepath, link)
+            staged.append((Path(filepath), arcname, link.stat().st_size))
+        started = time.perf_counter()
+        result = subprocess.run(
+            [_find_7z(), "a", "-t7z", f"-mx={level}", "-mmt=on", "-y", str(target), "."],
+            cwd=staging,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if result.returncode:
+            raise RuntimeError(
+                f"Failed to create {target} (7z exit code {result.returncode}): "
+                f"{result.stderr.strip()}"
+            )
+    if on_entry is not None:
+        seconds = time.perf_counter() - started
+        total = sum(size for _, _, size in staged) or 1
+        for filepath, arcname, size in staged:
+            on_entry(filepath, arcname, seconds * size / total)
+
+
+BACKENDS: dict[str, Callable[..., None]] = {"zip": zip, "tar.zst": tar_zst, "7z": sevenzip}
+"""Archive writers by ``--archive-format`` name."""
+
+EXTENSIONS = {"zip": ".zip", "tar.zst": ".tar.zst", "7z": ".7z"}
+
+
+def backend_error(format: str) -> str | None:
+    """Why archives in ``format`` cannot be written here, or None if they can."""
+    if format == "tar.zst" and importlib.util.find_spec("zstandard") is None:
+        return "tar.zst archives need the zstandard package (install it-claws[zstd])"
+    if format == "7z" and shutil.which(_find_7z()) is None:
+        return "7z archives need the 7z binary"
+    return None
+
+
+def create(
+    target: Path,
+    entries: Iterable[tuple[Path, str]],
+    *,
+    format: str = "zip",
+    level: int = 5,
+    on_entry: Callable[[Path, str, float], None] | None = None,
+) -> None:
+    """Write entries into target with the ``format`` backend."""
+    BACKENDS[format](target, entries, level=level, on_entry=on_entry)
+
+
+INDEX_NAME = "volumes.json"
+"""Member of every volume listing the files of all volumes."""
+
+
+def _stem(target: Path, format: str) -> str:
+    extension = EXTENSIONS[format]
+    name = target.name
+    return name.removesuffix(extension) if name.endswith(extension) else Path(name).stem
+
+
+def volume_path(target: Path, format: str, number: int) -> Path:
+    """``pack.003.zip`` for volume 3 of ``pack.zip``."""
+    return target.with_name(f"{_stem(target, format)}.{number:03d}{EXTENSIONS[format]}")
+
+
+def plan_volumes(
+    entries: Iterable[tuple[Path, str]], volume_size: int
+) -> list[list[tuple[Path, str]]]:
+    """Split entries, in order, into groups of at most volume_size bytes before compression.
+
+    Files are never split; one larger than volume_size gets a volume to itself.
+    """
+    volumes: list[list[tuple[Path, str]]] = []
+    current: list[tuple[Path, str]] = []
+    used = 0
+    for filepath, arcname in entries:
+        size = Path(filepath).stat().st_size
+        if current and used + size > volume_size:
+            volumes.append(current)
+            current, used = [], 0
+        current.append((filepath, arcname))
+        used += size
+    if current:
+        volumes.append(current)
+    return volumes
+
+
+def write_volumes(
+    target: Path,
+    entries: Iterable[tuple[Path, str]],
+    *,
+    volume_size: int,
+    format: str = "zip",
+    level: int = 5,
+    shared: Iterable[tuple[Path, str]] = (),
+    workers: int | None = None,
+    on_entry: Callable[[Path, str, float], None] | None = None,
+    on_volume: Callable[[Path], None] | None = None,
+) -> list[Path]:
+    """Write entries as volumes of target, each a complete archive, on parallel workers.
+
+    Every volume also holds the ``shared`` entries and ``INDEX_NAME``, which
+    lists the files of all volumes; the index is kept next to the volumes as
+    ``<name>.index.json`` too. A volume is written as ``.part`` and renamed
+    once complete, then passed to on_volume, so it can be uploaded while
+    others are still being written. Higher-numbered volumes left by an
+    earlier run of the same target are removed.
+    """
+    target = Path(target)
+    shared = list(shared)
+    volumes = [
+        (volume_path(target, format, number), group)
+        for number, group in enumerate(plan_volumes(entries, volume_size) or [[]], 1)
+    ]
+    index_path = target.with_name(f"{_stem(target, format)}.index.json")
+    index = {
+        "format_version": 1,
+        "volumes": [
+            {"name": path.name, "files": [arcname for _, arcname in group]}
+            for path, group in volumes
+        ],
+    }
+    index_path.write_text(json.dumps(index, indent=2) + "\n")
+
+    def write(path: Path, group: list[tuple[Path, str]]) -> Path:
+        part = path.with_name(path.name + ".part")
+        create(
+            part,
+            [*shared, *group, (index_path, INDEX_NAME)],
+            format=format,
+            level=level,
+            on_entry=on_entry,
+        )
+        os.replace(part, path)
+        return path
+
+    workers = workers or min(len(volumes), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(write, path, group) for path, group in volumes]
+        try:
+            for future in as_completed(futures):
+                if on_volume is not None:
+                    on_volume(future.result())
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            for path, _ in volumes:
+                path.with_name(path.name + ".part").unlink(missing_ok=True)
+    number = len(volumes) + 1
+    while (stale := volume_path(target, format, number)).exists():
+        stale.unlink()
+        number += 1
+    return [path for path, _ in volumes]
+
+
+class MergeConflict(ValueError):
+    """Two merge sources hold different files under the same name."""
+
+
+def merge(
+    target: Path,
+    sources: Iterable[Path],
+    *,
+    prefix: str | None = None,
+    level: int = 5,
+    exclude: Container[str] = (),
+    extra: dict[str, str] | None = None,
+) -> int:
+    """Combine zips and directories into target; returns the number of members.
+
+    Zip members are copied as they are, without decompressing. Files of a
+    directory are deflated under ``prefix``. A name found in several sources
+    is kept once if the copies match, and raises ``MergeConflict`` otherwise.
+    Names in ``exclude`` are dropped; ``extra`` maps names to text to add.
+    """
+    seen: dict[str, tuple[int, int, str]] = {}
+
+    def admit(name: str, crc: int, size: int, source: Path) -> bool:
+        if name in exclude:
+            return False
+        if name not in seen:
+            seen[name] = (crc, size, str(source))
+            return True
+        if seen[name][:2] != (crc, size):
+            raise MergeConflict(f"{name} differs between {seen[name][2]} and {source}")
+        return False
+
+    with zipfile.ZipFile(Path(target), "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+        for source in sources:
+            if source.is_dir():
+                for filepath, arcname in walk(source, source, prefix):
+                    known = arcname in seen
+                    crc, size = (_crc(filepath), filepath.stat().st_size) if known else (0, 0)
+                    if admit(arcname, crc, size, source):
+                        zf.write(str(filepath), arcname)
+                        info = zf.getinfo(arcname)
+                        seen[arcname] = (info.CRC, info.file_size, str(source))
+                continue
+            with zipfile.ZipFile(source) as src, open(source, "rb") as raw:
+                for info in src.infolist():
+                    if admit(info.filename, info.CRC, info.file_size, source):
+                        _copy_member(zf, raw, info)
+        for name, text in (extra or {}).items():
+            zf.writestr(name, text)
+        return len(zf.filelist)
+
+
+def _crc(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _copy_member(zf: zipfile.ZipFile, raw: BinaryIO, info: zipfile.ZipInfo) -> None:
+    """Append ``info``'s compressed data from the open source file ``raw`` to ``zf``.
+
+    zipfile has no public way to copy a member without recompressing it, so
+    this writes the local header and data itself and registers the member for
+    the central directory ``zf`` writes on close.
+    """
+    raw.seek(info.header_offset)
+    header = raw.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    raw.seek(info.header_offset + 30 + name_length + extra_length)
+
+    info.flag_bits &= ~0x08  # sizes and CRC go in the header, not a data descriptor
+    info.extra = _strip_zip64(info.extra)
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+    info.header_offset = zf.fp.tell()
+    zf.fp.write(info.FileHeader(zip64))
+    remaining = info.compress_size
+    while remaining:
+        chunk = raw.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise zipfile.BadZipFile(f"truncated data for {info.filename}")
+        zf.fp.write(chunk)
+        remaining -= len(chunk)
+    zf.filelist.append(info)
+    zf.NameToInfo[info.filename] = info
+    zf.start_dir = zf.fp.tell()
+
+
+def _strip_zip64(extra: bytes) -> bytes:
+    """``extra`` without its ZIP64 field, which the writer adds back when needed."""
+    kept = []
+    while len(extra) >= 4:
+        kind, length = struct.unpack("<HH", extra[:4])
+        if kind != 0x0001:
+            kept.append(extra[: 4 + length])
+        extra = extra[4 + length :]
+    return b"".join(kept)
@@ -0,0 +1,135 @@
+"""asyncio counterpart of ConcurrentPipeline built on httpx.AsyncClient."""
+
+import asyncio
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from tqdm import tqdm
+
+from .engine import TRANSFER_ATTEMPTS, ConcurrentPipeline
+from .models import DownloadJob
+from .scrapers import download_file_async
+from .validate import DownloadError
+from .writer import TransferStats
+
+
+class AsyncPipeline(ConcurrentPipeline):
+    """Run the resolve and download stages on an asyncio event loop.
+
+    Transfers share a single ``httpx.AsyncClient`` so hundreds of them can be
+    in flight without an OS thread each. Blocking work (static resolvers,
+    Selenium, 7z extraction) is offloaded to the default executor. Jobs,
+    result tuples and archiving are shared with ``ConcurrentPipeline``.
+    """
+
+    def _resolve_all(
+        self, pending: list[DownloadJob]
+    ) -> list[tuple[DownloadJob, str, Path, dict[str, str] | None]]:
+        return self._run(self._resolve_all_async(pending))
+
+    def _run_downloads(
+        self, scraped: list[tuple[DownloadJob, str, Path, dict[str, str] | None]]
+    ) -> list[DownloadJob]:
+        return self._run(self._download_all(scraped))
+
+    def _run(self, coro):
+        try:
+            return asyncio.run(coro)
+        except KeyboardInterrupt:
+            self._browser.close()
+            tqdm.write("Interrupted: run again with --resume to continue")
+            sys.exit(1)
+
+    async def _resolve_all_async(
+        self, pending: list[DownloadJob]
+    ) -> list[tuple[DownloadJob, str, Path, dict[str, str] | None]]:
+        semaphore = asyncio.Semaphore(self._max_concurrent)
+
+        async def resolve(job: DownloadJob):
+            queued_at = time.perf_counter()
+            async with semaphore:
+                self._report.add_span(job.display_name, "queue", queued_at, time.perf_counter())
+                return await asyncio.to_thread(self._resolve_job, job)
+
+        entries = await asyncio.gather(*(resolve(job) for job in pending))
+        return [entry for entry in entries if entry]
+
+    async def _download_all(
+        self, scraped: list[tuple[DownloadJob, str, Path, dict[str, str] | None]]
+    ) -> list[DownloadJob]:
+        semaphore = asyncio.Semaphore(self._max_concurrent)
+        succeeded: list[DownloadJob] = []
+
+        async def run(client: httpx.AsyncClient, entry) -> tuple[DownloadJob, BaseException | None]:
+            queued_at = time.perf_counter()
+            async with semaphore:
+                self._report.add_span(
+                    entry[0].display_name, "queue", queued_at, time.perf_counter()
+                )
+                try:
+                    await self._download_job_async(client, *entry)
+                except Exception as exc:
+                    return entry[0], exc
+                return entry[0], None
+
+        limits = httpx.Limits(
+            max_connections=self._max_concurrent,
+            max_keepalive_connections=self._max_concurrent,
+        )
+        async with httpx.AsyncClient(follow_redirects=True, timeout=120.0, limits=limits) as client:
+            for done in asyncio.as_completed([run(client, entry) for entry in scraped]):
+                job, exc = await done
+                self._on_download_done(job, exc)
+                if exc is None:
+                    succeeded.append(job)
+        return succeeded
+
+    async def _download_job_async(
+        self,
+        client: httpx.AsyncClient,
+        job: DownloadJob,
+        download_url: str,
+        dest: Path,
+        headers: dict[str, str] | None,
+    ) -> None:
+        resume = await asyncio.to_thread(self._resume_point, job, dest)
+        if resume is None:
+            self._record_transfer(job, dest, TransferStats())
+            await asyncio.to_thread(self._post_download, job, dest)
+            return
+        cookies = await asyncio.to_thread(self._download_cookies, job, download_url)
+        for attempt in range(1, TRANSFER_ATTEMPTS + 1):
+            check = self._payload_check(job, download_url)
+            stats = TransferStats()
+            digest = hashlib.sha256()
+            try:
+                try:
+                    with self._report.stage(job.display_name, "download"):
+                        await download_file_async(
+                            client,
+                            download_url,
+                            dest,
+                            headers={**(self._ua_headers(job) or {}), **(headers or {})},
+                            cookies=cookies,
+                            progress=self._transfer_progress(job),
+                            chunk_size=self._chunk_size,
+                            drop_cache=self._drop_cache,
+                            stats=stats,
+                            offset=resume[0],
+                            if_range=resume[1],
+                            digest=digest,
+                            on_start=self._transfer_started(job, dest),
+                            limiter=self.bandwidth,
+                            priority=job.target.priority,
+                            check=check,
+                        )
+                finally:
+                    self._report.end_transfer(job.display_name)
+                await asyncio.to_thread(self._record_transfer, job, dest, stats, digest, check)
+                break
+            except (DownloadError, httpx.TransportError) as exc:
+                resume = self._retry_point(job, dest, exc, attempt)
+        await asyncio.to_thread(self._post_download, job, dest)
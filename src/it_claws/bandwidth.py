@@ -0,0 +1,148 @@
+"""Global download bandwidth cap shared by priority classes.
+
+Transfers run inside ``stream`` and report each chunk they read with
+``reserve``, then sleep for the returned delay, which keeps the combined
+rate at ``rate`` bytes per second.
+Because the reader pauses, the socket's receive window fills and the sender
+slows down, so the cap applies on the wire, not only to the disk.
+
+The cap is divided among the classes with open transfers in proportion
+to their ``PRIORITIES`` weight. Jobs within a class share its part. A class
+alone on the link gets all of it.
+"""
+
+import re
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+PRIORITIES = {"high": 4, "normal": 2, "low": 1}
+"""Weight of each priority class in the shared cap."""
+
+THROUGHPUT_WINDOW = 5.0
+"""Seconds of traffic ``throughput`` averages over."""
+
+_UNITS = {"": 1, "k": 10**3, "m": 10**6, "g": 10**9}
+
+
+def parse_size(value: str) -> int:
+    """Bytes from ``512k``, ``700M`` or ``1.5GB``.
+
+    Units are decimal (``1M`` is 1,000,000 bytes) here and for rates, to
+    match ``format_rate``. ``--volume-size`` and ``--bandwidth`` both go
+    through this.
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([kmg]?)b?", value.strip().lower())
+    if match is None:
+        raise ValueError(f"expected a size such as 750k, 5M or 1.5G, got {value!r}")
+    size = int(float(match[1]) * _UNITS[match[2]])
+    if size <= 0:
+        raise ValueError(f"size must be positive, got {value!r}")
+    return size
+
+
+def parse_rate(value: str) -> float | None:
+    """Bytes per second from ``750k``, ``5M`` or ``10MB/s``; None for ``0`` or ``off``."""
+    if value.strip().lower() in ("0", "off", "none"):
+        return None
+    return float(parse_size(value.strip().lower().removesuffix("/s")))
+
+
+def format_rate(rate: float | None) -> str:
+    if rate is None:
+        return "unlimited"
+    for unit, size in (("GB/s", 10**9), ("MB/s", 10**6), ("kB/s", 10**3)):
+        if rate >= size:
+            return f"{rate / size:.1f} {unit}"
+    return f"{rate:.0f} B/s"
+
+
+class BandwidthLimiter:
+    """Token bucket per priority class, refilled from one shared ``rate``.
+
+    ``rate`` None means unlimited; byte and wait accounting still runs.
+    All methods are thread-safe.
+    """
+
+    def __init__(self, rate: float | None = None) -> None:
+        self.configured = rate
+        self._rate = rate
+        self._lock = threading.Lock()
+        self._next: dict[str, float] = {}
+        self._streams: Counter[str] = Counter()
+        self._recent: deque[tuple[float, int]] = deque()
+        self.reset_stats()
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    def set_rate(self, rate: float | None) -> None:
+        """Change the cap; transfers pick it up with their next chunk."""
+        with self._lock:
+            self._rate = rate
+            self._next.clear()
+            self._changes.append(
+                {"seconds": round(time.monotonic() - self._started, 3), "limit_bps": rate}
+            )
+
+    @contextmanager
+    def stream(self, priority: str = "normal") -> Iterator[None]:
+        """Count a transfer of ``priority`` as open, giving its class a share."""
+        with self._lock:
+            self._streams[priority] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._streams[priority] -= 1
+                if not self._streams[priority]:
+                    del self._streams[priority]
+                    self._next.pop(priority, None)
+
+    def reserve(self, nbytes: int, priority: str = "normal") -> float:
+        """Account ``nbytes`` read by a ``priority`` transfer; returns seconds to pause."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._classes.setdefault(priority, {"bytes": 0, "throttled_seconds": 0.0})
+            stats["bytes"] += nbytes
+            self._recent.append((now, nbytes))
+            while self._recent[0][0] < now - THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            if self._rate is None:
+                return 0.0
+            active = sum(PRIORITIES[p] for p in self._streams | {priority: 1})
+            share = self._rate * PRIORITIES[priority] / active
+            done = max(now, self._next.get(priority, now)) + nbytes / share
+            self._next[priority] = done
+            stats["throttled_seconds"] += done - now
+            return done - now
+
+    def throughput(self) -> float:
+        """Combined bytes per second over the last ``THROUGHPUT_WINDOW`` seconds."""
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW
+        with self._lock:
+            recent = sum(n for t, n in self._recent if t >= cutoff)
+        return recent / THROUGHPUT_WINDOW
+
+    def reset_stats(self) -> None:
+        """Start accounting afresh, e.g. for a new run on a long-lived pipeline."""
+        with self._lock:
+            self._started = time.monotonic()
+            self._classes: dict[str, dict[str, Any]] = {}
+            self._changes: list[dict[str, Any]] = []
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "limit_bps": self._rate,
+                "configured_bps": self.configured,
+                "changes": list(self._changes),
+                "classes": {
+                    name: {**stats, "throttled_seconds": round(stats["throttled_seconds"], 6)}
+                    for name, stats in self._classes.items()
+                },
+            }
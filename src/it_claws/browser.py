@@ -0,0 +1,199 @@
+"""Headless Chrome session shared by the pipeline stages.
+
+Selenium is imported on first launch, so runs that never need a browser
+do not pay for it.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from tqdm import tqdm
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+BLOCKED_RESOURCES: tuple[str, ...] = (
+    # images
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    # fonts
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.eot",
+    # stylesheets
+    "*.css",
+    # media
+    "*.mp4",
+    "*.webm",
+    "*.m3u8",
+    "*.mp3",
+    # trackers
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*adobedtm.com*",
+    "*demdex.net*",
+    "*omtrdc.net*",
+    "*nr-data.net*",
+    "*clarity.ms*",
+    "*tiktok.com*",
+)
+"""URL patterns Chrome refuses to load; vendor pages only need the DOM and scripts."""
+
+_binaries_lock = threading.Lock()
+_binaries: dict[str, str] | None = None
+
+
+def _chrome_binaries(options: ChromeOptions) -> dict[str, str]:
+    """Locate chromedriver and Chrome once per process.
+
+    ``webdriver.Chrome()`` otherwise runs Selenium Manager on every launch.
+    An empty dict means discovery failed and Selenium should try on its own.
+    """
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium.webdriver.common.driver_finder import DriverFinder
+
+    global _binaries
+    with _binaries_lock:
+        if _binaries is None:
+            try:
+                finder = DriverFinder(ChromeService(), options)
+                _binaries = {
+                    "driver_path": finder.get_driver_path(),
+                    "browser_path": finder.get_browser_path(),
+                }
+            except Exception:
+                return {}
+        return _binaries
+
+
+class ChromeSession:
+    """Lazily created headless Chrome, optionally launched ahead of time.
+
+    Callers must hold ``lock`` while using the driver returned by ``ensure``.
+    The profile directory outlives individual browsers so relaunches after
+    ``close`` reuse its disk cache.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.user_agent: str | None = None
+        self.launch_seconds: list[float] = []
+        self.on_launch: Callable[[float, float], None] | None = None
+        self._driver: WebDriver | None = None
+        self._generation = 0
+        self._profile = tempfile.TemporaryDirectory(prefix="it-claws-chrome-")
+        self._warm_up_thread: threading.Thread | None = None
+        self._blocked: tuple[str, ...] | None = None
+
+    def ensure(self, allow_resources: list[str] | None = None) -> WebDriver:
+        """Return the running driver, launching Chrome if needed.
+
+        ``allow_resources`` lists ``BLOCKED_RESOURCES`` patterns to let through
+        for sites that break without them; ``["*"]`` disables blocking.
+        """
+        if self._driver is None:
+            self._launch()
+        self._apply_resource_policy(allow_resources or [])
+        return self._driver
+
+    def _launch(self) -> None:
+        generation = self._generation
+        started = time.perf_counter()
+        driver = self._create()
+        if generation != self._generation:
+            driver.quit()
+            raise RuntimeError("Browser session was closed while Chrome was starting")
+        ended = time.perf_counter()
+        self.launch_seconds.append(ended - started)
+        if self.on_launch is not None:
+            self.on_launch(started, ended)
+        tqdm.write(f"Chrome ready in {self.launch_seconds[-1]:.1f}s")
+        self._driver = driver
+        self._blocked = None
+
+    def _apply_resource_policy(self, allow: list[str]) -> None:
+        blocked = () if "*" in allow else tuple(p for p in BLOCKED_RESOURCES if p not in allow)
+        if blocked == self._blocked:
+            return
+        self._driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked)})
+        self._blocked = blocked
+
+    def warm_up(self) -> None:
+        """Start Chrome on a background thread so the first job does not wait for it."""
+        if self._driver is not None:
+            return
+        if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+            return
+        self._warm_up_thread = threading.Thread(target=self._warm_up, daemon=True)
+        self._warm_up_thread.start()
+
+    def close(self) -> None:
+        self._generation += 1
+        driver, self._driver = self._driver, None
+        if driver:
+            driver.quit()
+
+    def _warm_up(self) -> None:
+        with self.lock:
+            if self._driver is not None:
+                return
+            try:
+                self.ensure()
+            except Exception as exc:
+                tqdm.write(f"Chrome warm-up failed, will retry on demand: {exc}")
+
+    def _create(self) -> WebDriver:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+
+        options = ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument(f"--user-data-dir={self._profile.name}")
+        options.page_load_strategy = "eager"
+
+        if os.environ.get("CHROME_NO_SANDBOX", "").lower() in ("1", "true", "yes", "y"):
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+
+        options.add_experimental_option(
+            "prefs",
+            {
+                "download.prompt_for_download": False,
+                "download.directory_upgrade": True,
+            },
+        )
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+
+        if self.user_agent:
+            options.add_argument(f"--user-agent={self.user_agent}")
+
+        binaries = _chrome_binaries(options)
+        if binaries.get("browser_path"):
+            options.binary_location = binaries["browser_path"]
+        service = ChromeService(executable_path=binaries.get("driver_path") or None)
+
+        driver = webdriver.Chrome(options=options, service=service)
+        driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "deny"})
+        driver.execute_cdp_cmd("Network.enable", {})
+        return driver
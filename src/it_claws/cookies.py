@@ -0,0 +1,45 @@
+"""Cookies taken from Chrome, cached per domain until they expire."""
+
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+EXPIRY_MARGIN = 30.0
+"""Seconds before expiry at which a cached cookie is no longer handed out."""
+
+
+class CookieCache:
+    """Cookies by request host, shared by every job downloading from it.
+
+    Entries are CDP cookie objects (``Network.getCookies``); session cookies
+    are kept until ``clear``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict[str, tuple[str, float | None]]] = {}
+
+    def get(self, url: str, names: list[str]) -> dict[str, str] | None:
+        """Values of ``names`` for ``url``'s host, or None unless all are cached and fresh."""
+        now = time.time()
+        with self._lock:
+            jar = self._hosts.get(urlsplit(url).hostname or "", {})
+            cookies = {}
+            for name in names:
+                value, expires = jar.get(name, (None, None))
+                if value is None or (expires is not None and expires - EXPIRY_MARGIN <= now):
+                    return None
+                cookies[name] = value
+            return cookies
+
+    def put(self, url: str, cookies: list[dict[str, Any]]) -> None:
+        with self._lock:
+            jar = self._hosts.setdefault(urlsplit(url).hostname or "", {})
+            for cookie in cookies:
+                expires = None if cookie.get("session", True) else cookie.get("expires")
+                jar[cookie["name"]] = (cookie["value"], expires)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hosts.clear()
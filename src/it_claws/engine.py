@@ -1,28 +1,51 @@
-import json
-import os
+import functools
+import hashlib
 import queue
 import re
 import sys
 import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
 from concurrent.futures import Future, as_completed
-from datetime import UTC, datetime
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 
 import httpx
-from fake_useragent import UserAgent
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.remote.webdriver import WebDriver
 from tqdm import tqdm
 
 from . import archive
+from .bandwidth import BandwidthLimiter
+from .browser import ChromeSession
+from .cookies import CookieCache
+from .httpcache import DEFAULT_MAX_BYTES, ResponseCache, RevalidatingCache, use_cache
+from .journal import Journal
 from .models import DownloadJob
+from .parsing import observe_parse
+from .replay import ResolveStore
+from .report import RunReport
 from .scrapers import (
     cleanup_empty_directories,
     download_file,
     extract_archive,
-    resolve_cookies,
+    fetch_cookies,
 )
+from .trace import Tracer
+from .validate import DownloadError, PayloadCheck, PayloadError
+from .watch import STATE_NAME
+from .writer import CHUNK_SIZE, TransferStats
+
+TRANSFER_ATTEMPTS = 3
+"""Transfers of one resolved URL before the job fails over to the next retry pass."""
+
+
+@functools.cache
+def _user_agents():
+    """Load the fake-useragent pool once per process; its data file is slow to parse."""
+    from fake_useragent import UserAgent
+
+    return UserAgent()
 
 
 def _normalise_source_path(source: str) -> str:
@@ -37,7 +60,6 @@ def _normalise_source_path(source: str) -> str:
 class DaemonThreadPool:
     def __init__(self, max_workers: int) -> None:
         self._work_queue: queue.Queue = queue.Queue()
-        self._futures: list[Future] = []
         self._shutdown = False
         self._threads = [
             threading.Thread(target=self._worker_loop, daemon=True) for _ in range(max_workers)
@@ -48,7 +70,6 @@ class DaemonThreadPool:
     def submit(self, fn, /, *args, **kwargs) -> Future:
         future: Future = Future()
         self._work_queue.put((fn, args, kwargs, future))
-        self._futures.append(future)
         return future
 
     def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
@@ -89,20 +110,97 @@ class DaemonThreadPool:
                 future.set_exception(e)
 
 
+class _SharedTransport(httpx.BaseTransport):
+    """Connection pool shared by per-job clients; closing a client leaves it open."""
+
+    def __init__(self) -> None:
+        self.pool = httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.pool.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _Batch:
+    """Jobs resolved together by one ``resolve_many`` call."""
+
+    def __init__(self, jobs: list[DownloadJob]) -> None:
+        self.jobs = jobs
+        self.lock = threading.Lock()
+        self.urls: dict[str, str | None] | None = None
+        self.error: Exception | None = None
+
+
 class ConcurrentPipeline:
+    """Resolve, download, extract and archive jobs on a pool of worker threads.
+
+    With ``keep_warm``, Chrome, the user agent and one HTTP connection pool
+    are kept across ``execute`` calls until ``close``, for long-running use,
+    and resolver pages are revalidated with conditional requests.
+    """
+
     def __init__(
         self,
         max_concurrent: int = 3,
         retries: int = 1,
         compress_level: int = 5,
+        tracer: Tracer | None = None,
+        resolve_store: ResolveStore | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        drop_cache: bool = False,
+        http_cache_size: int = DEFAULT_MAX_BYTES,
+        keep_warm: bool = False,
+        bandwidth: float | None = None,
+        archive_format: str = "zip",
+        volume_size: int | None = None,
     ) -> None:
         self._max_concurrent = max_concurrent
         self._retries = retries
         self._compress_level = compress_level
-        self._driver_lock = threading.Lock()
-        self._driver: WebDriver | None = None
+        self.archive_format = archive_format
+        """``archive.BACKENDS`` name of the format ``execute`` archives to."""
+        self._volume_size = volume_size
+        self._tracer = tracer
+        self._resolve_store = resolve_store
+        self._chunk_size = chunk_size
+        self._drop_cache = drop_cache
+        self._http_cache_size = http_cache_size
+        self._keep_warm = keep_warm
+        self._transport = _SharedTransport() if keep_warm else None
+        self._page_cache = RevalidatingCache() if keep_warm else None
+        self._revalidated = 0
+        self._http_cache: ResponseCache | None = None
+        self._batches: dict[str, _Batch] = {}
+        self._cookie_cache = CookieCache()
+        self._cookie_pool: DaemonThreadPool | None = None
+        self._cookie_prefetch: dict[str, Future] = {}
+        self._browser = ChromeSession()
+        if tracer is not None:
+            self._browser.on_launch = tracer.chrome_launch
         self._results: list[tuple[DownloadJob, bool, str]] = []
-        self._user_agent: str | None = None
+        self._user_agent: str | None = _user_agents().chrome if keep_warm else None
+        self._stats_lock = threading.Lock()
+        self._dynamic_resolves: Counter[str] = Counter()
+        self._report: RunReport | None = None
+        self._journal: Journal | None = None
+        self.bandwidth = BandwidthLimiter(bandwidth)
+        """Cap on the combined download rate, adjustable while running."""
+
+    @property
+    def dynamic_resolve_stats(self) -> dict[str, int]:
+        """Outcome counts of dynamic resolves in the last run.
+
+        ``static_fast_path`` resolved over HTTP, ``browser_fallback`` needed Chrome
+        after the fast path failed and ``browser`` had no fast path configured.
+        """
+        return dict(self._dynamic_resolves)
+
+    @property
+    def report(self) -> RunReport | None:
+        """Timing report of the last ``execute`` call; see ``report.RunReport``."""
+        return self._report
 
     def execute(
         self,
@@ -112,55 +210,39 @@ class ConcurrentPipeline:
         zip_prefix: str | None = None,
         zip_includes: list[str] | None = None,
         manifest: bool = False,
+        resume: bool = False,
     ) -> list[tuple[DownloadJob, bool, str]]:
-        output_root.mkdir(parents=True, exist_ok=True)
-        self._user_agent = UserAgent().chrome
-        self._results.clear()
+        """Run ``jobs`` into ``output_root``, journaling progress there.
 
-        pending = list(jobs)
-        succeeded: list = []
+        With ``resume``, jobs the previous run's journal shows finished are
+        skipped and partial downloads are continued.
+        """
+        output_root.mkdir(parents=True, exist_ok=True)
+        self._begin_run(jobs)
+        self._journal = Journal(output_root, resume)
+        pending = [job for job in jobs if not self._finished_before(job)]
+        if resume:
+            tqdm.write(f"Resuming: {len(jobs) - len(pending)} of {len(jobs)} job(s) already done")
         remaining_retries = self._retries
+        self._cookie_pool = DaemonThreadPool(max_workers=1)
 
         while pending:
-            scraped: list = []
+            if any(self._needs_browser(job) for job in pending):
+                self._browser.warm_up()
             tqdm.write("Resolving download URLs...")
-            for job in pending:
-                job.destination_directory.mkdir(parents=True, exist_ok=True)
-                try:
-                    download_url, headers = self._scrape(job)
-                    dest = self._build_dest_path(job, download_url)
-                    scraped.append((job, download_url, dest, headers))
-                except Exception as exc:
-                    tqdm.write(f"Failed to resolve {job.display_name}: {exc}")
+            self._batches = self._plan_batches(pending)
+            scraped = self._resolve_all(pending)
 
+            succeeded: list[DownloadJob] = []
             if scraped:
                 tqdm.write("Downloading...")
-                with DaemonThreadPool(max_workers=self._max_concurrent) as pool:
-                    futures: dict[Future, DownloadJob] = {
-                        pool.submit(self._download_job, *entry): entry[0] for entry in scraped
-                    }
-
-                    try:
-                        for future in as_completed(futures):
-                            job = futures[future]
-                            try:
-                                future.result()
-                                succeeded.append(job)
-                                self._results.append(
-                                    (job, True, f"Successfully downloaded {job.display_name}")
-                                )
-                                tqdm.write(f"Completed {job.display_name}")
-                            except Exception as exc:
-                                tqdm.write(f"Failed {job.display_name}: {exc}")
-                    except KeyboardInterrupt:
-                        pool.shutdown(wait=False, cancel_futures=True)
-                        self._destroy_driver()
-                        sys.exit(1)
+                succeeded = self._run_downloads(scraped)
 
             pending = [j for j in pending if j not in succeeded]
             if pending and remaining_retries > 0:
                 remaining_retries -= 1
-                self._destroy_driver()
+                self._browser.close()
+                self._cookie_cache.clear()
                 tqdm.write(
                     f"Retrying {len(pending)} failed job(s)... ({remaining_retries} retries left)"
                 )
@@ -169,81 +251,356 @@ class ConcurrentPipeline:
                     self._results.append(
                         (job, False, f"Failed {job.display_name}: retries exhausted")
                     )
+                    if not self._report.job(job.display_name).error:
+                        self._report.update_job(job.display_name, error="retries exhausted")
                 break
 
-        self._destroy_driver()
+        self._cookie_pool.shutdown(wait=False, cancel_futures=True)
+        self._cookie_pool = None
+        self._cookie_prefetch.clear()
+        self._end_run()
         cleanup_empty_directories(output_root)
 
-        if zip_path and all(s for _, s, _ in self._results):
-            manifest_path = output_root / "manifest.json"
-            if manifest:
-                manifest_path.write_text(
-                    json.dumps(
-                        {"format_version": 1, "exported_at": datetime.now(UTC).isoformat()},
-                        indent=2,
-                    )
-                    + "\n"
-                )
+        if self._dynamic_resolves:
+            tqdm.write(
+                "Dynamic resolves: "
+                f"{self._dynamic_resolves['static_fast_path']} via HTTP fast path, "
+                f"{self._dynamic_resolves['browser_fallback']} browser fallback(s), "
+                f"{self._dynamic_resolves['browser']} browser-only"
+            )
 
-            entries: list[tuple[Path, str]] = []
+        succeeded = all(s for _, s, _ in self._results)
+        if zip_path and succeeded:
+            with self._report.stage(None, "archive"):
+                self._archive(output_root, zip_path, zip_prefix, zip_includes, manifest, jobs)
+        self._report.mark_upload_ready()
+        self._journal.close(remove=succeeded)
+        self._journal = None
 
-            entries.extend(archive.walk(output_root, output_root, zip_prefix))
+        self._finish_report()
+        return self._results
 
-            if zip_includes:
-                for entry in zip_includes:
-                    raw_source, layout = entry.rsplit("=", 1) if "=" in entry else (entry, None)
+    def resolve(self, jobs: list[DownloadJob]) -> dict[str, str]:
+        """Resolve download URLs without downloading, by job name; failures are left out.
 
-                    if ".." in raw_source and layout is None:
-                        raise ValueError(
-                            f"Path traversal ('..') in zip-include source {raw_source!r} "
-                            f"without explicit layout is not allowed"
-                        )
+        Runs a single pass and produces its own ``report``.
+        """
+        self._begin_run(jobs)
+        try:
+            tqdm.write("Resolving download URLs...")
+            self._batches = self._plan_batches(jobs)
+            scraped = self._resolve_all(jobs)
+        finally:
+            self._end_run()
+            self._finish_report()
+        return {job.display_name: url for job, url, _, _ in scraped}
+
+    def probe(self, job: DownloadJob, url: str) -> dict[str, str] | None:
+        """``ETag``, ``Last-Modified`` and ``Content-Length`` of ``url`` from a HEAD request.
+
+        Empty when the server refuses the request, ``None`` when it cannot be
+        reached.
+        """
+        try:
+            with self._http_client(job) as client:
+                response = client.head(url, headers=job.target.request_headers)
+        except httpx.HTTPError as exc:
+            tqdm.write(f"Probe of {job.display_name} failed: {exc}")
+            return None
+        if response.status_code >= 400:
+            return {}
+        return {
+            name: response.headers[name]
+            for name in ("etag", "last-modified", "content-length")
+            if name in response.headers
+        }
+
+    def _begin_run(self, jobs: list[DownloadJob]) -> None:
+        if not (self._keep_warm and self._user_agent):
+            self._user_agent = _user_agents().chrome
+        self._browser.user_agent = self._user_agent
+        self._results.clear()
+        self._dynamic_resolves.clear()
+        self._report = RunReport(type(self).__name__, self._max_concurrent, self._tracer)
+        self.bandwidth.reset_stats()
+        self._http_cache = ResponseCache(self._http_cache_size) if self._http_cache_size else None
+        if self._page_cache is not None:
+            self._revalidated = self._page_cache.hits
+        for job in jobs:
+            self._report.add_job(job.display_name, job.target.name, job.target.resolver_type)
+
+    def _end_run(self) -> None:
+        if not self._keep_warm:
+            self._browser.close()
+        if self._http_cache is not None:
+            if self._http_cache.hits:
+                self._report.add_cache_hit("http", self._http_cache.hits)
+            self._http_cache = None
+        if self._page_cache is not None and self._page_cache.hits > self._revalidated:
+            self._report.add_cache_hit("revalidated", self._page_cache.hits - self._revalidated)
+
+    def _finish_report(self) -> None:
+        self._report.extra["browser"] = {
+            "launch_seconds": [round(s, 6) for s in self._browser.launch_seconds],
+            "dynamic_resolves": self.dynamic_resolve_stats,
+        }
+        self._report.extra["bandwidth"] = self.bandwidth.to_dict()
+        self._report.finish()
+
+    def _archive(
+        self,
+        output_root: Path,
+        zip_path: Path,
+        zip_prefix: str | None,
+        zip_includes: list[str] | None,
+        manifest: bool,
+        jobs: list[DownloadJob],
+    ) -> None:
+        manifest_path = output_root / "manifest.json"
+        if manifest:
+            manifest_path.write_text(archive.manifest_json())
 
-                    resolved = Path(raw_source).resolve()
-
-                    if resolved.is_dir():
-                        prefix = layout if layout else _normalise_source_path(raw_source)
-                        if layout is None and zip_prefix:
-                            prefix = f"{zip_prefix}/{prefix}"
-                        entries.extend(archive.walk(resolved, resolved, prefix))
-                    elif resolved.is_file():
-                        if layout is not None:
-                            arcname = f"{layout}{resolved.name}" if layout.endswith("/") else layout
-                        else:
-                            arcname = _normalise_source_path(raw_source)
-                            if zip_prefix:
-                                arcname = f"{zip_prefix}/{arcname}"
-                        entries.append((resolved, arcname))
-
-            if manifest and manifest_path.exists():
-                entries = [(fp, an) for fp, an in entries if an != "manifest.json"]
-                entries.append((manifest_path, "manifest.json"))
-
-            tqdm.write("Archiving...")
-            archive.zip(zip_path, entries, level=self._compress_level)
-            tqdm.write(f"Archive created: {zip_path}")
+        entries: list[tuple[Path, str]] = []
 
-        return self._results
+        entries.extend(
+            entry
+            for entry in archive.walk(output_root, output_root, zip_prefix)
+            if entry[0] not in (self._journal.path, output_root / STATE_NAME)
+        )
+
+        if zip_includes:
+            for entry in zip_includes:
+                raw_source, layout = entry.rsplit("=", 1) if "=" in entry else (entry, None)
+
+                if ".." in raw_source and layout is None:
+                    raise ValueError(
+                        f"Path traversal ('..') in zip-include source {raw_source!r} "
+                        f"without explicit layout is not allowed"
+                    )
+
+                resolved = Path(raw_source).resolve()
+
+                if resolved.is_dir():
+                    prefix = layout if layout else _normalise_source_path(raw_source)
+                    if layout is None and zip_prefix:
+                        prefix = f"{zip_prefix}/{prefix}"
+                    entries.extend(archive.walk(resolved, resolved, prefix))
+                elif resolved.is_file():
+                    if layout is not None:
+                        arcname = f"{layout}{resolved.name}" if layout.endswith("/") else layout
+                    else:
+                        arcname = _normalise_source_path(raw_source)
+                        if zip_prefix:
+                            arcname = f"{zip_prefix}/{arcname}"
+                    entries.append((resolved, arcname))
+
+        if manifest and manifest_path.exists():
+            entries = [(fp, an) for fp, an in entries if an != "manifest.json"]
+            entries.append((manifest_path, "manifest.json"))
+
+        tqdm.write("Archiving...")
+        if self._volume_size:
+            shared = [entry for entry in entries if entry[1] == "manifest.json"]
+            volumes = archive.write_volumes(
+                zip_path,
+                [entry for entry in entries if entry not in shared],
+                volume_size=self._volume_size,
+                format=self.archive_format,
+                level=self._compress_level,
+                shared=shared,
+                on_entry=self._archive_timer(jobs),
+                on_volume=self._volume_ready,
+            )
+            tqdm.write(f"Archive created: {len(volumes)} volume(s) of {zip_path}")
+            return
+        archive.create(
+            zip_path,
+            entries,
+            format=self.archive_format,
+            level=self._compress_level,
+            on_entry=self._archive_timer(jobs),
+        )
+        tqdm.write(f"Archive created: {zip_path}")
+
+    def _volume_ready(self, path: Path) -> None:
+        self._report.mark_volume_ready(path)
+        tqdm.write(f"Volume ready: {path}")
+
+    def _archive_timer(self, jobs: list[DownloadJob]) -> Callable[[Path, str, float], None]:
+        """Attribute per-entry compression time to the job owning the file.
+
+        Group members can share a directory, in which case the time is split.
+        """
+        owners: dict[Path, list[str]] = {}
+        for job in jobs:
+            owners.setdefault(job.destination_directory.resolve(), []).append(job.display_name)
+
+        def on_entry(filepath: Path, _arcname: str, seconds: float) -> None:
+            for parent in filepath.resolve().parents:
+                if names := owners.get(parent):
+                    for name in names:
+                        self._report.add_stage_time(name, "archive", seconds / len(names))
+                    return
+
+        return on_entry
+
+    def _plan_batches(self, jobs: list[DownloadJob]) -> dict[str, _Batch]:
+        """Group static jobs whose resolver can resolve them with one call."""
+        groups: dict[tuple, list[DownloadJob]] = {}
+        for job in jobs:
+            resolver = job.target.resolver
+            if job.target.resolver_type != "static" or not hasattr(resolver, "resolve_many"):
+                continue
+            key = (resolver, resolver.batch_key(**job.target.resolver_kwargs))
+            groups.setdefault(key, []).append(job)
+        batches = {}
+        for group in groups.values():
+            if len(group) > 1:
+                batch = _Batch(group)
+                batches.update((job.display_name, batch) for job in group)
+        return batches
+
+    def _resolve_batch(self, batch: _Batch, job: DownloadJob) -> str | None:
+        """URL for ``job``, resolving the whole batch on the first call."""
+        with batch.lock:
+            if batch.urls is None and batch.error is None:
+                names = [j.display_name for j in batch.jobs]
+                kwargs_list = [j.target.resolver_kwargs for j in batch.jobs]
+                try:
+                    with self._resolver_client(job) as client:
+                        urls = job.target.resolver.resolve_many(client, kwargs_list)
+                    batch.urls = dict(zip(names, urls, strict=True))
+                except Exception as exc:
+                    batch.error = exc
+                else:
+                    tqdm.write(f"Resolved {', '.join(names)} with one call")
+            if batch.error is not None:
+                raise batch.error
+            return batch.urls[job.display_name]
+
+    def _resolve_all(
+        self, pending: list[DownloadJob]
+    ) -> list[tuple[DownloadJob, str, Path, dict[str, str] | None]]:
+        scraped = []
+        for job in pending:
+            if entry := self._resolve_job(job):
+                scraped.append(entry)
+        return scraped
+
+    def _resolve_job(
+        self, job: DownloadJob
+    ) -> tuple[DownloadJob, str, Path, dict[str, str] | None] | None:
+        job.destination_directory.mkdir(parents=True, exist_ok=True)
+        self._report.add_attempt(job.display_name)
+        record_parse = functools.partial(self._report.add_stage_time, job.display_name, "parse")
+        try:
+            with (
+                self._report.stage(job.display_name, "resolve"),
+                observe_parse(record_parse),
+                use_cache(self._http_cache),
+            ):
+                download_url, headers = self._scrape(job)
+            dest = self._build_dest_path(job, download_url)
+        except Exception as exc:
+            tqdm.write(f"Failed to resolve {job.display_name}: {exc}")
+            self._report.update_job(job.display_name, error=f"resolve: {exc}")
+            return None
+        if job.target.include_cookies is not None and self._cookie_pool is not None:
+            self._cookie_prefetch[job.display_name] = self._cookie_pool.submit(
+                self._job_cookies, job, download_url
+            )
+        return job, download_url, dest, headers
+
+    def _run_downloads(
+        self, scraped: list[tuple[DownloadJob, str, Path, dict[str, str] | None]]
+    ) -> list[DownloadJob]:
+        succeeded: list[DownloadJob] = []
+        with DaemonThreadPool(max_workers=self._max_concurrent) as pool:
+            futures: dict[Future, DownloadJob] = {
+                pool.submit(self._download_job, *entry, queued_at=time.perf_counter()): entry[0]
+                for entry in scraped
+            }
+
+            try:
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        self._on_download_done(job, exc)
+                    else:
+                        self._on_download_done(job, None)
+                        succeeded.append(job)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._browser.close()
+                tqdm.write("Interrupted: run again with --resume to continue")
+                sys.exit(1)
+        return succeeded
+
+    def _finished_before(self, job: DownloadJob) -> bool:
+        """Whether the journal shows ``job`` finished by the run being resumed."""
+        if not self._journal.finished(job.display_name):
+            return False
+        self._report.update_job(job.display_name, succeeded=True, resolved_via="journal")
+        self._results.append((job, True, f"Already downloaded {job.display_name}"))
+        return True
+
+    def _on_download_done(self, job: DownloadJob, exc: BaseException | None) -> None:
+        if exc is not None:
+            tqdm.write(f"Failed {job.display_name}: {exc}")
+            self._report.update_job(job.display_name, error=str(exc))
+            return
+        self._report.update_job(job.display_name, succeeded=True, error=None)
+        self._results.append((job, True, f"Successfully downloaded {job.display_name}"))
+        tqdm.write(f"Completed {job.display_name}")
+
+    def close(self) -> None:
+        """Release Chrome and pooled connections; only needed with ``keep_warm``."""
+        self._browser.close()
+        if self._transport is not None:
+            self._transport.pool.close()
+
+    def _http_client(
+        self, job: DownloadJob, transport: httpx.BaseTransport | None = None
+    ) -> httpx.Client:
+        return httpx.Client(
+            follow_redirects=True,
+            timeout=120.0,
+            headers=self._ua_headers(job),
+            transport=transport or self._transport,
+        )
+
+    def _resolver_client(self, job: DownloadJob) -> httpx.Client:
+        """HTTP client for resolvers, through the run's response cache and resolve store."""
+        store = self._resolve_store
+        transport = store.transport(self._transport) if store else self._transport
+        if self._page_cache is not None:
+            transport = self._page_cache.transport(transport)
+        if self._http_cache is not None:
+            transport = self._http_cache.transport(transport)
+        return self._http_client(job, transport)
+
+    def _ua_headers(self, job: DownloadJob) -> dict[str, str] | None:
+        if job.target.random_ua and self._user_agent:
+            return {"User-Agent": self._user_agent}
+        return None
 
     def _scrape(self, job: DownloadJob) -> tuple[str, dict[str, str] | None]:
         if job.target.resolver_type == "static":
-            with httpx.Client(
-                follow_redirects=True,
-                timeout=120.0,
-                headers={"User-Agent": self._user_agent}
-                if job.target.random_ua and self._user_agent
-                else None,
-            ) as client:
-                download_url = job.target.resolver(
-                    client,
-                    **job.target.resolver_kwargs,
-                )
+            if batch := self._batches.get(job.display_name):
+                download_url = self._resolve_batch(batch, job)
+            else:
+                with self._resolver_client(job) as client:
+                    download_url = job.target.resolver(
+                        client,
+                        **job.target.resolver_kwargs,
+                    )
+            self._report.update_job(job.display_name, resolved_via="http")
         elif job.target.resolver_type == "dynamic":
-            driver = self._ensure_driver()
-            download_url = job.target.resolver(
-                driver,
-                **job.target.resolver_kwargs,
-            )
+            download_url = self._scrape_static_first(job)
+            if not download_url:
+                download_url = self._scrape_browser(job)
         else:
             raise RuntimeError(f"Unknown resolver type: {job.target.resolver_type}")
 
@@ -252,6 +609,49 @@ class ConcurrentPipeline:
 
         return download_url, job.target.request_headers
 
+    def _scrape_browser(self, job: DownloadJob) -> str | None:
+        store = self._resolve_store
+        if store is not None and store.replay:
+            return store.resolved_url(job.display_name)
+        with self._driver_lock(job):
+            driver = self._browser.ensure(job.target.browser_allow)
+            download_url = job.target.resolver(
+                driver,
+                **job.target.resolver_kwargs,
+            )
+        if store is not None and download_url:
+            store.record_resolved_url(job.display_name, download_url)
+        return download_url
+
+    def _needs_browser(self, job: DownloadJob) -> bool:
+        if self._resolve_store is not None and self._resolve_store.replay:
+            return False
+        if job.target.include_cookies is not None:
+            return True
+        return job.target.resolver_type == "dynamic" and job.target.static_resolver is None
+
+    def _scrape_static_first(self, job: DownloadJob) -> str | None:
+        """Try the target's HTTP-only resolver so Chrome is only launched when it fails."""
+        if job.target.static_resolver is None:
+            self._count_resolve(job, "browser")
+            return None
+        try:
+            with self._resolver_client(job) as client:
+                download_url = job.target.static_resolver(
+                    client,
+                    **{**job.target.resolver_kwargs, **job.target.static_resolver_kwargs},
+                )
+        except Exception as exc:
+            tqdm.write(f"HTTP fast path failed for {job.display_name}: {exc}")
+            download_url = None
+        self._count_resolve(job, "static_fast_path" if download_url else "browser_fallback")
+        return download_url
+
+    def _count_resolve(self, job: DownloadJob, outcome: str) -> None:
+        with self._stats_lock:
+            self._dynamic_resolves[outcome] += 1
+        self._report.update_job(job.display_name, resolved_via=outcome)
+
     def _build_dest_path(self, job: DownloadJob, download_url: str) -> Path:
         if job.target.file_type == "exe":
             name = job.target.rename_as or download_url.split("/")[-1].split("?")[0]
@@ -271,69 +671,180 @@ class ConcurrentPipeline:
         download_url: str,
         dest: Path,
         headers: dict[str, str] | None,
+        queued_at: float | None = None,
     ) -> None:
-        cookies = None
-        if job.target.include_cookies is not None:
-            with self._driver_lock:
-                driver = self._ensure_driver()
-                cookies = resolve_cookies(driver, download_url, job.target.include_cookies)
-
-        with httpx.Client(
-            follow_redirects=True,
-            timeout=120.0,
-            headers={"User-Agent": self._user_agent}
-            if job.target.random_ua and self._user_agent
-            else None,
-        ) as client:
-            download_file(
-                client,
-                download_url,
-                dest,
-                headers=headers,
-                cookies=cookies,
-            )
-
-        if job.target.file_type in ("zip", "zip/exe", "zip/folder", "sfx"):
-            extract_archive(
-                dest,
-                job.destination_directory,
-                job.target.file_type,
-                job.target.rename_as,
-            )
-
-    def _ensure_driver(self) -> WebDriver:
-        if self._driver is not None:
-            return self._driver
-        self._driver = self._create_driver()
-        return self._driver
-
-    def _destroy_driver(self) -> None:
-        if self._driver:
-            self._driver.quit()
-            self._driver = None
-
-    def _create_driver(self) -> WebDriver:
-        options = ChromeOptions()
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--window-size=1920,1080")
-
-        if os.environ.get("CHROME_NO_SANDBOX", "").lower() in ("1", "true", "yes", "y"):
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-
-        options.add_experimental_option(
-            "prefs",
-            {
-                "download.prompt_for_download": False,
-                "download.directory_upgrade": True,
-            },
+        if queued_at is not None:
+            self._report.add_span(job.display_name, "queue", queued_at, time.perf_counter())
+        resume = self._resume_point(job, dest)
+        if resume is None:
+            self._record_transfer(job, dest, TransferStats())
+            self._post_download(job, dest)
+            return
+        cookies = self._download_cookies(job, download_url)
+
+        for attempt in range(1, TRANSFER_ATTEMPTS + 1):
+            check = self._payload_check(job, download_url)
+            stats = TransferStats()
+            digest = hashlib.sha256()
+            try:
+                try:
+                    with (
+                        self._report.stage(job.display_name, "download"),
+                        self._http_client(job) as client,
+                    ):
+                        download_file(
+                            client,
+                            download_url,
+                            dest,
+                            headers=headers,
+                            cookies=cookies,
+                            progress=self._transfer_progress(job),
+                            chunk_size=self._chunk_size,
+                            drop_cache=self._drop_cache,
+                            stats=stats,
+                            offset=resume[0],
+                            if_range=resume[1],
+                            digest=digest,
+                            on_start=self._transfer_started(job, dest),
+                            limiter=self.bandwidth,
+                            priority=job.target.priority,
+                            check=check,
+                        )
+                finally:
+                    self._report.end_transfer(job.display_name)
+                self._record_transfer(job, dest, stats, digest, check)
+                break
+            except (DownloadError, httpx.TransportError) as exc:
+                resume = self._retry_point(job, dest, exc, attempt)
+
+        self._post_download(job, dest)
+
+    def _resume_point(self, job: DownloadJob, dest: Path) -> tuple[int, str | None] | None:
+        """``(offset, If-Range)`` to start ``job``'s transfer at, or None if ``dest`` is done."""
+        if self._journal.downloaded(job.display_name, dest):
+            tqdm.write(f"Reusing downloaded {dest.name}")
+            return None
+        return self._journal.partial(job.display_name, dest) or (0, None)
+
+    def _payload_check(self, job: DownloadJob, download_url: str) -> PayloadCheck:
+        return PayloadCheck(job.target.file_type, download_url, job.target.sha256)
+
+    def _retry_point(
+        self, job: DownloadJob, dest: Path, exc: Exception, attempt: int
+    ) -> tuple[int, str | None]:
+        """Where to pick a failed transfer up again; re-raises ``exc`` once attempts run out.
+
+        A wrong payload is deleted and fetched from the start. A cut-short one
+        is resumed from what reached the disk, when the server allows it.
+        """
+        if isinstance(exc, PayloadError):
+            dest.unlink(missing_ok=True)
+        if attempt == TRANSFER_ATTEMPTS:
+            raise exc
+        self._report.add_transfer_retry(job.display_name)
+        tqdm.write(f"{job.display_name}: {exc}; retrying transfer ({attempt})")
+        return self._journal.partial(job.display_name, dest) or (0, None)
+
+    def _transfer_started(
+        self, job: DownloadJob, dest: Path
+    ) -> Callable[[int, httpx.Headers], None]:
+        def on_start(offset: int, headers: httpx.Headers) -> None:
+            if offset:
+                tqdm.write(f"Resuming {job.display_name} at {offset} bytes")
+            etag = headers.get("etag")
+            validator = etag if etag and not etag.startswith("W/") else headers.get("last-modified")
+            self._journal.start(job.display_name, dest, validator, offset)
+
+        return on_start
+
+    def _download_cookies(self, job: DownloadJob, download_url: str) -> dict[str, str] | None:
+        """Cookies for the download, from the prefetch started after resolving if any."""
+        future = self._cookie_prefetch.pop(job.display_name, None)
+        if future is None:
+            return self._job_cookies(job, download_url)
+        return future.result()
+
+    def _job_cookies(self, job: DownloadJob, download_url: str) -> dict[str, str] | None:
+        names = job.target.include_cookies
+        if names is None:
+            return None
+        store = self._resolve_store
+        if store is not None and store.replay:
+            return store.cookies(job.display_name)
+        with self._report.stage(job.display_name, "cookies"):
+            cookies = self._cached_cookies(download_url, names)
+            if cookies is None:
+                with self._driver_lock(job):
+                    # Another job may have fetched them while this one waited.
+                    cookies = self._cached_cookies(download_url, names)
+                    if cookies is None:
+                        driver = self._browser.ensure(job.target.browser_allow)
+                        found = fetch_cookies(driver, download_url, names)
+                        self._cookie_cache.put(download_url, found)
+                        cookies = {c["name"]: c["value"] for c in found}
+        if store is not None:
+            store.record_cookies(job.display_name, cookies)
+        return cookies
+
+    def _cached_cookies(self, download_url: str, names: list[str]) -> dict[str, str] | None:
+        cookies = self._cookie_cache.get(download_url, names)
+        if cookies is not None:
+            self._report.add_cache_hit("cookies")
+        return cookies
+
+    def _record_transfer(
+        self,
+        job: DownloadJob,
+        dest: Path,
+        stats: TransferStats,
+        digest: Any | None = None,
+        check: PayloadCheck | None = None,
+    ) -> None:
+        if check is not None:
+            check.finish(dest, digest.hexdigest())
+        size = dest.stat().st_size
+        self._report.update_job(
+            job.display_name,
+            bytes=size,
+            first_byte_seconds=stats.first_byte_seconds,
+            stream_seconds=stats.stream_seconds,
         )
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-
-        if self._user_agent:
-            options.add_argument(f"--user-agent={self._user_agent}")
-
-        driver = webdriver.Chrome(options=options)
-        driver.execute_cdp_cmd("Page.setDownloadBehavior", {"behavior": "deny"})
-        return driver
+        if digest is not None:
+            self._journal.finish_download(job.display_name, size, digest.hexdigest())
+
+    @contextmanager
+    def _driver_lock(self, job: DownloadJob) -> Iterator[None]:
+        """Hold the browser lock, recording the wait and (when tracing) the hold."""
+        with self._report.stage(job.display_name, "driver_wait"):
+            self._browser.lock.acquire()
+        acquired = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._browser.lock.release()
+            if self._tracer is not None:
+                self._tracer.span(job.display_name, "driver_lock", acquired, time.perf_counter())
+
+    def _transfer_progress(self, job: DownloadJob) -> Callable[[int], None]:
+        name = job.display_name
+        if self._tracer is None:
+            return functools.partial(self._journal.advance, name)
+
+        def progress(nbytes: int) -> None:
+            self._report.add_transfer_bytes(name, nbytes)
+            self._journal.advance(name, nbytes)
+
+        return progress
+
+    def _post_download(self, job: DownloadJob, dest: Path) -> None:
+        files = [dest]
+        if job.target.file_type in ("zip", "zip/exe", "zip/folder", "sfx"):
+            with self._report.stage(job.display_name, "extract"):
+                extract_archive(
+                    dest,
+                    job.destination_directory,
+                    job.target.file_type,
+                    job.target.rename_as,
+                )
+            files = [path for path in job.destination_directory.rglob("*") if path.is_file()]
+        self._journal.done(job.display_name, files)
@@ -0,0 +1,287 @@
+"""Run-scoped, single-flight cache for the resolve phase.
+
+Presets often share pages and APIs, e.g. several Intel targets or the
+members of a group. ``ResponseCache`` collapses concurrent identical GETs
+into one request and keeps the responses, and the values resolvers derive
+from them (see ``parsing.first_match``), in memory for the rest of the run,
+evicting the least recently used entries beyond ``max_bytes``.
+
+``RevalidatingCache`` outlives runs in long-running modes: pages served
+with an ``ETag`` or ``Last-Modified`` are requested again conditionally, so
+an unchanged page costs a round trip but no transfer.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import httpx
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+FLIGHT_TIMEOUT = 120.0
+"""Seconds to wait on another caller's request before making it separately."""
+
+T = TypeVar("T")
+
+_current: ContextVar["ResponseCache | None"] = ContextVar("response_cache", default=None)
+
+
+@contextmanager
+def use_cache(cache: "ResponseCache | None") -> Iterator[None]:
+    """Make ``cache`` the one ``current_cache`` returns in this context."""
+    token = _current.set(cache)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_cache() -> "ResponseCache | None":
+    return _current.get()
+
+
+class ResponseCache:
+    """Size-bounded LRU of responses and derived values, with request coalescing.
+
+    The first caller for a key does the work while later callers wait for
+    its result. Failures, error responses and partially read bodies are not
+    cached; callers that were waiting on one do the work themselves.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._flights: dict[Hashable, threading.Event] = {}
+        self._size = 0
+
+    def transport(self, inner: httpx.BaseTransport | None = None) -> httpx.BaseTransport:
+        """Transport serving GETs through the cache and everything else via ``inner``."""
+        return _CachingTransport(self, inner or httpx.HTTPTransport())
+
+    def shared(self, key: Hashable, compute: Callable[[], tuple[T, int]]) -> T:
+        """Cached value for ``key``; ``compute`` returns the value and its size in bytes."""
+        state, value = self._begin(key)
+        if state == "hit":
+            return value
+        if state == "miss":
+            return compute()[0]
+        done = False
+        try:
+            value, size = compute()
+            self._finish(key, value, size)
+            done = True
+            return value
+        finally:
+            if not done:
+                self._finish(key)
+
+    def _begin(self, key: Hashable) -> tuple[str, Any]:
+        """``("hit", value)``, ``("lead", None)`` to do the work, or ``("miss", None)``."""
+        with self._lock:
+            if key in self._entries:
+                return "hit", self._hit(key)
+            event = self._flights.get(key)
+            if event is None:
+                self._flights[key] = threading.Event()
+                return "lead", None
+        event.wait(FLIGHT_TIMEOUT)
+        with self._lock:
+            if key in self._entries:
+                return "hit", self._hit(key)
+        return "miss", None
+
+    def _hit(self, key: Hashable) -> Any:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key][0]
+
+    def _finish(self, key: Hashable, value: Any = None, size: int | None = None) -> None:
+        """End the flight for ``key``, storing ``value`` unless ``size`` is None."""
+        with self._lock:
+            if size is not None and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._size += size
+                while self._size > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._size -= evicted
+            self._flights.pop(key).set()
+
+
+class RevalidatingCache:
+    """Bodies of GET responses that carry validators, kept until evicted.
+
+    Repeat requests are sent with ``If-None-Match``/``If-Modified-Since`` and
+    a 304 is answered with the stored body. ``hits`` counts those 304s.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[int, list[tuple[str, str]], bytes]] = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    def transport(self, inner: httpx.BaseTransport | None = None) -> httpx.BaseTransport:
+        return _RevalidatingTransport(self, inner or httpx.HTTPTransport())
+
+    def _get(self, key: Hashable) -> tuple[int, list[tuple[str, str]], bytes] | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            return self._entries.get(key)
+
+    def _put(self, key: Hashable, entry: tuple[int, list[tuple[str, str]], bytes]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key)[2])
+            self._entries[key] = entry
+            self._size += len(entry[2])
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[2])
+
+
+def _request_key(request: httpx.Request) -> tuple[str, str]:
+    headers = "\n".join(f"{k}: {v}" for k, v in sorted(request.headers.multi_items()))
+    return str(request.url), hashlib.sha256(headers.encode()).hexdigest()
+
+
+class _CachingTransport(httpx.BaseTransport):
+    def __init__(self, cache: ResponseCache, inner: httpx.BaseTransport) -> None:
+        self._cache = cache
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return self._inner.handle_request(request)
+        key = _request_key(request)
+        state, entry = self._cache._begin(key)
+        if state == "hit":
+            status, headers, body = entry
+            return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+        if state == "miss":
+            return self._inner.handle_request(request)
+
+        try:
+            response = self._inner.handle_request(request)
+        except BaseException:
+            self._cache._finish(key)
+            raise
+        if response.status_code >= 400:
+            self._cache._finish(key)
+            return response
+
+        headers = response.headers.multi_items()
+
+        def on_close(body: bytes | None) -> None:
+            if body is None:
+                self._cache._finish(key)
+            else:
+                self._cache._finish(key, (response.status_code, headers, body), len(body))
+
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            stream=_TeeStream(response.stream, self._cache.max_bytes, on_close),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class _TeeStream(httpx.SyncByteStream):
+    """Pass a response body through, keeping a copy of up to ``limit`` bytes.
+
+    ``on_close`` gets the body if it was read to the end within the limit,
+    otherwise None.
+    """
+
+    def __init__(
+        self,
+        stream: httpx.SyncByteStream,
+        limit: int,
+        on_close: Callable[[bytes | None], None],
+    ) -> None:
+        self._stream = stream
+        self._limit = limit
+        self._on_close = on_close
+        self._chunks: list[bytes] | None = []
+        self._size = 0
+        self._complete = False
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            if self._chunks is not None:
+                self._size += len(chunk)
+                if self._size <= self._limit:
+                    self._chunks.append(chunk)
+                else:
+                    self._chunks = None
+            yield chunk
+        self._complete = True
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._stream.close()
+        finally:
+            cached = self._complete and self._chunks is not None
+            self._on_close(b"".join(self._chunks) if cached else None)
+
+
+class _RevalidatingTransport(httpx.BaseTransport):
+    def __init__(self, cache: RevalidatingCache, inner: httpx.BaseTransport) -> None:
+        self._cache = cache
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return self._inner.handle_request(request)
+        key = _request_key(request)
+        entry = self._cache._get(key)
+        if entry is not None:
+            stored = httpx.Headers(entry[1])
+            if etag := stored.get("etag"):
+                request.headers["If-None-Match"] = etag
+            if last_modified := stored.get("last-modified"):
+                request.headers["If-Modified-Since"] = last_modified
+
+        response = self._inner.handle_request(request)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            with self._cache._lock:
+                self._cache.hits += 1
+            status, headers, body = entry
+            return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+        validated = "etag" in response.headers or "last-modified" in response.headers
+        if response.status_code != 200 or not validated:
+            return response
+
+        headers = response.headers.multi_items()
+
+        def on_close(body: bytes | None) -> None:
+            if body is not None:
+                self._cache._put(key, (200, headers, body))
+
+        return httpx.Response(
+            200,
+            headers=headers,
+            stream=_TeeStream(response.stream, self._cache.max_bytes, on_close),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        self._inner.close()
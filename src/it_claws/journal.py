@@ -0,0 +1,162 @@
+"""Append-only journal of a run's progress, for ``--resume``.
+
+One JSON object per line in ``<output>/.it-claws-journal.jsonl``:
+
+- ``start``: a transfer began at ``offset`` bytes into ``dest``, with the
+  ``validator`` (strong ETag or Last-Modified) a resume must match.
+- ``offset``: bytes of ``dest`` written so far, every ``CHECKPOINT_EVERY``.
+- ``downloaded``: the transfer finished, with the file's size and SHA-256.
+- ``done``: extraction finished; ``files`` are the job's outputs and sizes.
+
+Lines are flushed as they are written, so the journal survives the process
+being killed; a torn last line is ignored. Paths are relative to the
+output directory. The journal is removed when a run succeeds completely.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+JOURNAL_NAME = ".it-claws-journal.jsonl"
+
+CHECKPOINT_EVERY = 8 * 1024 * 1024
+"""Bytes of a transfer between ``offset`` records."""
+
+
+@dataclass
+class JobState:
+    dest: str
+    validator: str | None = None
+    offset: int = 0
+    size: int | None = None
+    sha256: str | None = None
+    files: dict[str, int] | None = None
+    checkpointed: int = field(default=0, repr=False)
+
+
+class Journal:
+    """Progress of the jobs of one output directory.
+
+    With ``resume``, the states recorded by the previous run are loaded;
+    otherwise the journal starts empty.
+    """
+
+    def __init__(self, output_root: Path, resume: bool = False) -> None:
+        self.root = output_root
+        self.path = output_root / JOURNAL_NAME
+        self.jobs: dict[str, JobState] = {}
+        self._lock = threading.Lock()
+        if resume and self.path.exists():
+            self._load()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def _load(self) -> None:
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            name, event = record["job"], record["event"]
+            if event == "start":
+                self.jobs[name] = JobState(record["dest"], record["validator"], record["offset"])
+            elif (state := self.jobs.get(name)) is None:
+                continue
+            elif event == "offset":
+                state.offset = record["offset"]
+            elif event == "downloaded":
+                state.size, state.sha256 = record["size"], record["sha256"]
+            elif event == "done":
+                state.files = record["files"]
+
+    def finished(self, name: str) -> bool:
+        """Whether ``name`` completed and all its files are still in place."""
+        state = self.jobs.get(name)
+        if state is None or state.files is None:
+            return False
+        for rel, size in state.files.items():
+            try:
+                if (self.root / rel).stat().st_size != size:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def downloaded(self, name: str, dest: Path) -> bool:
+        """Whether ``dest`` is ``name``'s complete, unchanged download."""
+        state = self.jobs.get(name)
+        if state is None or state.sha256 is None or state.dest != self._rel(dest):
+            return False
+        try:
+            if dest.stat().st_size != state.size:
+                return False
+            with open(dest, "rb") as f:
+                return hashlib.file_digest(f, "sha256").hexdigest() == state.sha256
+        except OSError:
+            return False
+
+    def partial(self, name: str, dest: Path) -> tuple[int, str] | None:
+        """``(offset, validator)`` to continue ``name``'s transfer into ``dest``, if any."""
+        state = self.jobs.get(name)
+        if state is None or not state.validator or state.dest != self._rel(dest):
+            return None
+        try:
+            size = dest.stat().st_size
+        except OSError:
+            return None
+        offset = min(state.offset, size)
+        return (offset, state.validator) if offset else None
+
+    def start(self, name: str, dest: Path, validator: str | None, offset: int) -> None:
+        rel = self._rel(dest)
+        with self._lock:
+            self.jobs[name] = JobState(rel, validator, offset, checkpointed=offset)
+            self._write(
+                {
+                    "event": "start",
+                    "job": name,
+                    "dest": rel,
+                    "validator": validator,
+                    "offset": offset,
+                }
+            )
+
+    def advance(self, name: str, nbytes: int) -> None:
+        """Count ``nbytes`` more written, recording an ``offset`` every ``CHECKPOINT_EVERY``."""
+        with self._lock:
+            state = self.jobs[name]
+            state.offset += nbytes
+            if state.offset - state.checkpointed >= CHECKPOINT_EVERY:
+                state.checkpointed = state.offset
+                self._write({"event": "offset", "job": name, "offset": state.offset})
+
+    def finish_download(self, name: str, size: int, sha256: str) -> None:
+        with self._lock:
+            state = self.jobs[name]
+            state.offset, state.size, state.sha256 = size, size, sha256
+            self._write({"event": "downloaded", "job": name, "size": size, "sha256": sha256})
+
+    def done(self, name: str, files: list[Path]) -> None:
+        sizes = {self._rel(path): path.stat().st_size for path in files}
+        with self._lock:
+            if (state := self.jobs.get(name)) is not None:
+                state.files = sizes
+            self._write({"event": "done", "job": name, "files": sizes}, sync=True)
+
+    def close(self, remove: bool = False) -> None:
+        with self._lock:
+            self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
+
+    def _rel(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def _write(self, record: dict[str, Any], sync: bool = False) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
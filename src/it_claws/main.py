@@ -2,16 +2,26 @@ import argparse
 import sys
 from pathlib import Path
 
-import inquirer
 from tqdm import tqdm
 
-from .engine import ConcurrentPipeline
+from .archive import backend_error
+from .bandwidth import PRIORITIES, parse_rate, parse_size
 from .models import DownloadJob, ScrapeTarget
-from .presets import expand_selection, get_selection_choices
+from .presets import REGISTRY, add_catalog, expand_selection, get_selection_choices
+from .shard import parse_shard
+from .watch import parse_interval
+from .writer import CHUNK_SIZE
+
+# The engines, Selenium, inquirer and the optional outputs are imported in
+# run() when needed, so --help and argument errors return quickly.
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(prog="it-claws")
+    parser = argparse.ArgumentParser(
+        prog="it-claws",
+        epilog="Run 'it-claws serve --help' for the long-running build service and "
+        "'it-claws merge --help' to combine sharded runs.",
+    )
     dl = parser.add_argument_group("Download Options")
     dl.add_argument("-o", "--output", type=Path, default=Path.cwd() / "downloads")
     dl.add_argument(
@@ -20,11 +30,39 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Remove output directory before starting",
     )
+    dl.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE // 1024,
+        metavar="KIB",
+        help=f"Read size per download stream in KiB (default: {CHUNK_SIZE // 1024})",
+    )
+    dl.add_argument(
+        "--drop-cache",
+        action="store_true",
+        help="Flush downloads to disk and drop them from the page cache (disk output, not tmpfs)",
+    )
+    dl.add_argument(
+        "--http-cache",
+        type=int,
+        default=64,
+        metavar="MIB",
+        help="Memory for sharing resolver pages and API responses within a run "
+        "(default: 64, 0 = off)",
+    )
 
     tg = parser.add_argument_group("Target Options")
     mexcl = tg.add_mutually_exclusive_group()
-    mexcl.add_argument("-t", "--targets", nargs="+", choices=get_selection_choices())
+    mexcl.add_argument(
+        "-t", "--targets", nargs="+", metavar="NAME", help="Targets or groups to download"
+    )
     mexcl.add_argument("--all", action="store_true", help="Select all available targets")
+    mexcl.add_argument(
+        "--select",
+        type=_parse_query,
+        metavar="QUERY",
+        help="Select targets by catalog fields, e.g. vendor=intel,tag=lan or path=display/*",
+    )
     mexcl.add_argument(
         "--target-from",
         type=Path,
@@ -32,6 +70,19 @@ def build_parser() -> argparse.ArgumentParser:
         help="Read target names from a text file (one per line, # for comments)",
     )
     tg.add_argument("-i", "--interactive", action="store_true")
+    tg.add_argument(
+        "--catalog",
+        action="append",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Load extra targets from a TOML/JSON catalog (repeatable; later files win)",
+    )
+    tg.add_argument(
+        "--list-targets",
+        action="store_true",
+        help="Print the selectable (or --select-ed) targets with vendor and tags, then exit",
+    )
 
     rs = parser.add_argument_group("Resilience Options")
     rs.add_argument(
@@ -46,10 +97,52 @@ def build_parser() -> argparse.ArgumentParser:
         default=1,
         help="Full re-scrape passes for failed entries (0 = run once, no retry)",
     )
+    rs.add_argument(
+        "--bandwidth",
+        type=parse_rate,
+        default=None,
+        metavar="RATE",
+        help="Cap the combined download rate in bytes/s, e.g. 750k, 5M; decimal units, "
+        "1M = 1,000,000 (SIGUSR1 halves it, SIGUSR2 restores it)",
+    )
+    rs.add_argument(
+        "--priority",
+        action="append",
+        type=_parse_priority,
+        default=None,
+        metavar="NAME=CLASS",
+        help="Bandwidth class (high, normal, low) of a target or group (repeatable)",
+    )
+    rs.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted or partly failed run in the existing output directory",
+    )
+    rs.add_argument(
+        "--engine",
+        choices=("threads", "async"),
+        default="threads",
+        help="Download engine: worker threads or an asyncio event loop (default: threads)",
+    )
 
     ar = parser.add_argument_group("Archiving Options")
     ar.add_argument(
-        "-z", "--zip", type=Path, default=None, metavar="PATH", help="Zip archive output path"
+        "-z", "--zip", type=Path, default=None, metavar="PATH", help="Archive output path"
+    )
+    ar.add_argument(
+        "--archive-format",
+        choices=("zip", "tar.zst", "7z"),
+        default=None,
+        help="Archive format (default: from the --zip extension, else zip). "
+        "tar.zst and 7z compress on all cores",
+    )
+    ar.add_argument(
+        "--volume-size",
+        type=parse_size,
+        default=None,
+        metavar="SIZE",
+        help="Split the archive into independently readable volumes of at most SIZE "
+        "before compression (e.g. 700M, 4G; decimal units, 1M = 1,000,000), written in parallel",
     )
     ar.add_argument(
         "-l",
@@ -82,10 +175,156 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Generate manifest.json inside the archive (required by install-it)",
     )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write a JSON timing report of the run (per-job stage durations, bytes, retries)",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write Prometheus metrics for the node-exporter textfile collector (*.prom)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="K/N",
+        help="Run only the K-th of N parts of the selection (combine with 'it-claws merge')",
+    )
+    parser.add_argument(
+        "--shard-weights",
+        type=Path,
+        default=None,
+        metavar="REPORT",
+        help="Balance shards by the downloaded bytes in a previous --report",
+    )
+    parser.add_argument(
+        "--watch",
+        type=parse_interval,
+        default=None,
+        metavar="INTERVAL",
+        help="Keep running and rebuild only targets whose download changed, checking "
+        "every INTERVAL (seconds, or with an s/m/h suffix)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Serve live Prometheus metrics on 127.0.0.1:PORT/metrics while running",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Sample per-stage CPU profiles into DIR (collapsed stacks, pstats, summary)",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write a Chrome trace-event timeline of the run (open in ui.perfetto.dev)",
+    )
+    rr = parser.add_mutually_exclusive_group()
+    rr.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Record resolver HTTP responses, browser-resolved URLs and cookies into DIR",
+    )
+    rr.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Resolve offline from a --record store in DIR (downloads still go to the network)",
+    )
     parser.add_argument("-v", "--verbose", action="store_true")
     return parser
 
 
+def _parse_query(value: str) -> dict[str, str]:
+    query = {}
+    for part in value.split(","):
+        key, sep, val = part.partition("=")
+        if not sep or key.strip() not in ("vendor", "tag", "path"):
+            raise argparse.ArgumentTypeError(f"expected vendor=, tag= or path= terms, got {part!r}")
+        query[key.strip()] = val.strip()
+    return query
+
+
+def _parse_priority(value: str) -> tuple[str, str]:
+    name, sep, priority = value.rpartition("=")
+    if not sep or priority not in PRIORITIES:
+        raise argparse.ArgumentTypeError(f"expected NAME={'|'.join(PRIORITIES)}, got {value!r}")
+    return name, priority
+
+
+def _apply_priorities(
+    targets: list[tuple[ScrapeTarget, str | None]], overrides: list[tuple[str, str]]
+) -> list[tuple[ScrapeTarget, str | None]]:
+    """Set the priority of targets named in ``overrides``, or belonging to a named group."""
+    from dataclasses import replace
+
+    result = []
+    for target, name in targets:
+        for key, priority in overrides:
+            if key in (target.name, name) or (name or "").startswith(f"{key} "):
+                target = replace(target, priority=priority)
+        result.append((target, name))
+    return result
+
+
+def _bandwidth_signals(limiter) -> None:
+    """SIGUSR1 halves the bandwidth cap (or the current rate if uncapped), SIGUSR2 restores it.
+
+    Handlers run on the main thread, which may be holding the limiter's or
+    tqdm's lock at the time, so they only queue the change; a daemon thread
+    applies and logs it.
+    """
+    import queue
+    import signal
+    import threading
+
+    from .bandwidth import format_rate
+
+    if not hasattr(signal, "SIGUSR1"):
+        return
+
+    def slower() -> None:
+        limiter.set_rate((limiter.rate or max(limiter.throughput(), 1024.0)) / 2)
+
+    def restore() -> None:
+        limiter.set_rate(limiter.configured)
+
+    requests: queue.SimpleQueue = queue.SimpleQueue()
+
+    def apply() -> None:
+        while True:
+            requests.get()()
+            tqdm.write(f"Bandwidth cap: {format_rate(limiter.rate)}")
+
+    threading.Thread(target=apply, daemon=True).start()
+    signal.signal(signal.SIGUSR1, lambda *_: requests.put(slower))
+    signal.signal(signal.SIGUSR2, lambda *_: requests.put(restore))
+
+
+def _list_targets(names: list[str]) -> None:
+    for name in names:
+        entry = REGISTRY.get(name)
+        vendor = ",".join(REGISTRY.vendors_of(name)) or "-"
+        tags = ",".join(entry.tags) or "-"
+        print(f"{name}\t{vendor}\t{tags}\t{entry.path.format(name=name)}")
+
+
 def _parse_target_file(path: Path) -> list[str]:
     names = []
     for line in path.read_text().splitlines():
@@ -96,6 +335,24 @@ def _parse_target_file(path: Path) -> list[str]:
     return names
 
 
+def _prompt_targets(choices: list) -> list[tuple[ScrapeTarget, str | None]]:
+    import inquirer
+
+    answers = inquirer.prompt(
+        [
+            inquirer.Checkbox(
+                "targets",
+                message="Select drivers and utilities to download",
+                choices=choices,
+            ),
+        ]
+    )
+    if not answers or not answers.get("targets"):
+        tqdm.write("No targets selected interactively")
+        return []
+    return expand_selection(answers["targets"])
+
+
 def resolve_selected_targets(
     target_names: list[str] | None,
     interactive: bool,
@@ -104,55 +361,19 @@ def resolve_selected_targets(
 ) -> list[tuple[ScrapeTarget, str | None]]:
     if target_from and interactive:
         names = _parse_target_file(target_from)
-        answers = inquirer.prompt(
-            [
-                inquirer.Checkbox(
-                    "targets",
-                    message="Select drivers and utilities to download",
-                    choices=[(n, n, True) for n in names],
-                ),
-            ]
-        )
-        if not answers or not answers.get("targets"):
-            tqdm.write("No targets selected interactively")
-            return []
-        return expand_selection(answers["targets"])
+        return _prompt_targets([(n, n, True) for n in names])
 
     if target_from:
         return expand_selection(_parse_target_file(target_from))
 
     if all_targets and interactive:
-        answers = inquirer.prompt(
-            [
-                inquirer.Checkbox(
-                    "targets",
-                    message="Select drivers and utilities to download",
-                    choices=[(n, n, True) for n in get_selection_choices()],
-                ),
-            ]
-        )
-        if not answers or not answers.get("targets"):
-            tqdm.write("No targets selected interactively")
-            return []
-        return expand_selection(answers["targets"])
+        return _prompt_targets([(n, n, True) for n in get_selection_choices()])
 
     if all_targets:
         return expand_selection(get_selection_choices())
 
     if interactive:
-        answers = inquirer.prompt(
-            [
-                inquirer.Checkbox(
-                    "targets",
-                    message="Select drivers and utilities to download",
-                    choices=get_selection_choices(),
-                ),
-            ]
-        )
-        if not answers or not answers.get("targets"):
-            tqdm.write("No targets selected interactively")
-            return []
-        return expand_selection(answers["targets"])
+        return _prompt_targets(get_selection_choices())
 
     if target_names:
         return expand_selection(target_names)
@@ -160,11 +381,64 @@ def resolve_selected_targets(
     return expand_selection(get_selection_choices())
 
 
+def _archive_format(path: Path | None) -> str:
+    """Archive format named by ``path``'s extension, zip if it names none."""
+    if path is not None:
+        for name in ("tar.zst", "7z"):
+            if path.name.endswith(f".{name}"):
+                return name
+    return "zip"
+
+
+def _write_outputs(args: argparse.Namespace, pipeline) -> None:
+    """Write the report and metrics files of the last run, if requested."""
+    if args.report:
+        pipeline.report.write(args.report)
+        tqdm.write(f"Report written: {args.report}")
+
+    if args.metrics_textfile:
+        from .metrics import write_textfile
+
+        write_textfile(pipeline.report, args.metrics_textfile)
+
+
 def run() -> None:
+    if sys.argv[1:2] == ["serve"]:
+        from .server import main as serve
+
+        serve(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["merge"]:
+        from .shard import main as merge
+
+        merge(sys.argv[2:])
+        return
+
     parser = build_parser()
     args = parser.parse_args()
 
-    if args.output.exists() and not args.clear_output:
+    for catalog in args.catalog or []:
+        add_catalog(catalog)
+    if args.targets:
+        known = set(get_selection_choices())
+        if unknown := [name for name in args.targets if name not in known]:
+            parser.error(f"unknown target(s): {', '.join(unknown)} (see --list-targets)")
+    if args.select:
+        args.targets = REGISTRY.query(**args.select)
+        if not args.targets:
+            parser.error(f"no targets match --select {args.select}")
+    if args.list_targets:
+        _list_targets(args.targets or get_selection_choices())
+        return
+
+    if args.resume and args.clear_output:
+        parser.error("--resume and -c/--clear-output cannot be combined")
+    if args.chunk_size <= 0:
+        parser.error(f"--chunk-size must be positive, got {args.chunk_size}")
+    archive_format = args.archive_format or _archive_format(args.zip)
+    if args.zip and (problem := backend_error(archive_format)):
+        parser.error(problem)
+    if args.output.exists() and not (args.clear_output or args.resume or args.watch is not None):
         tqdm.write(
             f"Output directory {args.output} already exists. "
             "Use -c, --clear-output to clear it, or remove it manually.",
@@ -180,23 +454,112 @@ def run() -> None:
     if not targets:
         tqdm.write("No valid targets to process")
         sys.exit(1)
+    if args.priority:
+        targets = _apply_priorities(targets, args.priority)
 
     if args.zip_include and not args.zip:
         tqdm.write("error: --zip-include requires --zip")
         sys.exit(1)
 
-    results = ConcurrentPipeline(
+    if args.volume_size and not args.zip:
+        tqdm.write("error: --volume-size requires --zip")
+        sys.exit(1)
+
+    if args.shard_weights and args.shard is None:
+        tqdm.write("error: --shard-weights requires --shard")
+        sys.exit(1)
+
+    jobs = [DownloadJob(target=t, output_root=args.output, name=name) for t, name in targets]
+    if args.shard is not None:
+        from .shard import load_weights, partition
+
+        index, count = args.shard
+        weights = load_weights(args.shard_weights) if args.shard_weights else None
+        total = len(jobs)
+        jobs = partition(jobs, count, weights)[index]
+        tqdm.write(f"Shard {index + 1}/{count}: {len(jobs)} of {total} jobs")
+
+    tracer = None
+    if args.trace:
+        from .trace import Tracer
+
+        tracer = Tracer()
+    resolve_store = None
+    if args.record or args.replay:
+        from .replay import ResolveStore
+
+        resolve_store = ResolveStore(args.record or args.replay, replay=bool(args.replay))
+    if args.engine == "async":
+        from .async_engine import AsyncPipeline as pipeline_cls
+    else:
+        from .engine import ConcurrentPipeline as pipeline_cls
+    pipeline = pipeline_cls(
         max_concurrent=args.max_concurrent,
         retries=args.retries,
         compress_level=args.compress_level,
-    ).execute(
-        [DownloadJob(target=t, output_root=args.output, name=name) for t, name in targets],
-        args.output,
-        args.zip,
-        zip_prefix=args.zip_prefix,
-        zip_includes=args.zip_include,
-        manifest=args.manifest,
+        tracer=tracer,
+        resolve_store=resolve_store,
+        chunk_size=args.chunk_size * 1024,
+        drop_cache=args.drop_cache,
+        http_cache_size=args.http_cache * 1024 * 1024,
+        keep_warm=args.watch is not None,
+        bandwidth=args.bandwidth,
+        archive_format=archive_format,
+        volume_size=args.volume_size,
     )
+    _bandwidth_signals(pipeline.bandwidth)
+    metrics_server = None
+    if args.metrics_port is not None:
+        from .metrics import MetricsServer
+
+        metrics_server = MetricsServer(args.metrics_port, lambda: pipeline.report).start()
+        tqdm.write(f"Serving metrics on http://127.0.0.1:{metrics_server.port}/metrics")
+
+    profiler = None
+    if args.profile:
+        from .profiling import StageProfiler
+
+        profiler = StageProfiler(lambda: pipeline.report).start()
+
+    def build(selected: list[DownloadJob]) -> list[tuple[DownloadJob, bool, str]]:
+        results = pipeline.execute(
+            selected,
+            args.output,
+            args.zip,
+            zip_prefix=args.zip_prefix,
+            zip_includes=args.zip_include,
+            manifest=args.manifest,
+            resume=args.resume,
+        )
+        _write_outputs(args, pipeline)
+        return results
+
+    try:
+        if args.watch is not None:
+            from .watch import Watcher
+
+            try:
+                Watcher(pipeline, jobs, args.output, build).run(args.watch)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                pipeline.close()
+            return
+        results = build(jobs)
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(args.profile)
+            tqdm.write(profiler.summary())
+            tqdm.write(f"Profiles written to {args.profile}")
+        if tracer is not None:
+            tracer.write(args.trace)
+            tqdm.write(f"Trace written: {args.trace}")
+        if args.record:
+            resolve_store.save()
+            tqdm.write(f"Resolver traffic recorded to {args.record}")
 
     if failed := [msg for _, success, msg in results if not success]:
         for msg in failed:
@@ -0,0 +1,162 @@
+"""Prometheus text-format export of a RunReport.
+
+The output follows the node-exporter textfile collector conventions, so a
+scheduled container can drop a ``.prom`` file next to node-exporter, or expose
+the same text on ``/metrics`` while the run is in progress.
+"""
+
+import os
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from .report import STAGES, RunReport
+
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _family(lines: list[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: list[str], name: str, values: list[float], **labels: str) -> None:
+    for bound in STAGE_BUCKETS:
+        count = sum(1 for v in values if v <= bound)
+        lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {count}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {len(values)}")
+    lines.append(f"{name}_sum{_labels(**labels)} {sum(values):.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {len(values)}")
+
+
+def render(report: RunReport) -> str:
+    data: dict[str, Any] = report.to_dict()
+    totals = data["totals"]
+    lines: list[str] = []
+
+    _family(lines, "it_claws_jobs_total", "counter", "Jobs processed, by outcome.")
+    lines.append(f"it_claws_jobs_total{_labels(outcome='succeeded')} {totals['succeeded']}")
+    lines.append(f"it_claws_jobs_total{_labels(outcome='failed')} {totals['failed']}")
+
+    _family(lines, "it_claws_job_retries_total", "counter", "Retry passes across all jobs.")
+    lines.append(f"it_claws_job_retries_total {totals['retries']}")
+
+    _family(lines, "it_claws_downloaded_bytes_total", "counter", "Bytes downloaded.")
+    lines.append(f"it_claws_downloaded_bytes_total {totals['bytes']}")
+
+    _family(lines, "it_claws_cache_hits_total", "counter", "Cache hits, by cache.")
+    for cache, hits in sorted(data["cache_hits"].items()):
+        lines.append(f"it_claws_cache_hits_total{_labels(cache=cache)} {hits}")
+
+    _family(
+        lines,
+        "it_claws_stage_duration_seconds",
+        "histogram",
+        "Per-job time spent in each pipeline stage.",
+    )
+    for stage in STAGES:
+        values = [job["stages"][stage] for job in data["jobs"] if stage in job["stages"]]
+        if values:
+            _histogram(lines, "it_claws_stage_duration_seconds", values, stage=stage)
+
+    _family(
+        lines,
+        "it_claws_stage_peak_concurrency",
+        "gauge",
+        "Highest number of jobs in a stage at once.",
+    )
+    for stage, stats in totals["stages"].items():
+        lines.append(
+            f"it_claws_stage_peak_concurrency{_labels(stage=stage)} {stats['peak_concurrency']}"
+        )
+
+    if totals["download_throughput_bps"] is not None:
+        _family(
+            lines,
+            "it_claws_download_throughput_bytes_per_second",
+            "gauge",
+            "Bytes downloaded divided by summed download time.",
+        )
+        lines.append(
+            f"it_claws_download_throughput_bytes_per_second {totals['download_throughput_bps']:.3f}"
+        )
+
+    if data["upload_ready_seconds"] is not None:
+        _family(
+            lines,
+            "it_claws_upload_ready_seconds",
+            "gauge",
+            "Seconds from run start until the archive was ready for upload.",
+        )
+        lines.append(f"it_claws_upload_ready_seconds {data['upload_ready_seconds']:.6f}")
+
+    if data["wall_seconds"] is not None:
+        _family(lines, "it_claws_run_duration_seconds", "gauge", "Wall time of the run.")
+        lines.append(f"it_claws_run_duration_seconds {data['wall_seconds']:.6f}")
+        _family(
+            lines,
+            "it_claws_last_run_timestamp_seconds",
+            "gauge",
+            "Unix time the run finished.",
+        )
+        lines.append(f"it_claws_last_run_timestamp_seconds {report.finished_at.timestamp():.3f}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(report: RunReport, path: Path) -> None:
+    """Atomically write metrics so node-exporter never reads a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render(report))
+    os.replace(tmp, path)
+
+
+class MetricsServer:
+    """Serve the live report of a running pipeline on ``/metrics``."""
+
+    def __init__(self, port: int, report: Callable[[], RunReport | None], host: str = "127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                current = report()
+                if self.path.split("?")[0] != "/metrics" or current is None:
+                    self.send_error(404)
+                    return
+                body = render(current).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
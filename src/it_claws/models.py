@@ -16,6 +16,14 @@ class ScrapeTarget:
     request_headers: dict[str, str] | None = None
     rename_as: str | None = None
     random_ua: bool = True
+    static_resolver: Callable[..., Any] | None = None
+    static_resolver_kwargs: dict[str, Any] = field(default_factory=dict)
+    browser_allow: list[str] | None = None
+    vendor: str | None = None
+    tags: tuple[str, ...] = ()
+    priority: Literal["high", "normal", "low"] = "normal"
+    sha256: str | None = None
+    """Expected digest of the downloaded file, for vendors that publish one."""
 
 
 @dataclass(frozen=True)
@@ -23,6 +31,10 @@ class TargetGroup:
     name: str
     path: str
     members: list[ScrapeTarget]
+    vendor: str | None = None
+    tags: tuple[str, ...] = ()
+    priority: Literal["high", "normal", "low"] | None = None
+    """Bandwidth priority for all members, overriding their own."""
 
 
 @dataclass
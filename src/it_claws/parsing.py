@@ -0,0 +1,140 @@
+"""HTML helpers shared by the static resolvers.
+
+Selectors are compiled once per process. ``first_match`` parses a response
+incrementally while it downloads and stops at the first node the selector
+finds, so a download link near the top of a multi-megabyte vendor page does
+not pay for parsing (or fetching) the rest. Time spent in lxml is reported
+to the callback installed with ``observe_parse``. Within a run, results are
+shared through the current ``httpcache.ResponseCache``.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    from lxml.etree import XPath, _Element
+
+FIRST_CHECK = 64 * 1024
+"""Bytes fed before the selector is first tried on the partial tree.
+
+Later checks happen each time the fed size quadruples, so on a page where
+the match is at the end, the early checks add at most a third of the cost
+of the final full-page check.
+"""
+
+_observer: ContextVar[Callable[[float], None] | None] = ContextVar("parse_observer", default=None)
+
+
+@contextmanager
+def observe_parse(callback: Callable[[float], None]) -> Iterator[None]:
+    """Report seconds spent parsing and matching in this context to ``callback``."""
+    token = _observer.set(callback)
+    try:
+        yield
+    finally:
+        _observer.reset(token)
+
+
+def _report(seconds: float) -> None:
+    if (callback := _observer.get()) is not None:
+        callback(seconds)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_selector(selector: str, selector_type: str = "css") -> XPath:
+    """Compile a CSS or XPath selector once; the result is callable on any element."""
+    from lxml.etree import XPath
+
+    if selector_type == "xpath":
+        return XPath(selector)
+    from lxml.cssselect import CSSSelector
+
+    return CSSSelector(selector, translator="html")
+
+
+def first_match(
+    client: httpx.Client,
+    url: str,
+    selectors: list[tuple[str, str]],
+) -> _Element | None:
+    """GET ``url`` and return the first node matched by ``selectors``.
+
+    ``selectors`` are ``(selector, selector_type)`` pairs in priority order.
+    The transfer stops early only when the first selector matches, since a
+    lower-priority match could still be overtaken further down the page.
+    Early matches assume the selector cannot stop matching as more of the
+    page arrives, which holds unless it uses ``not()``, ``last()`` or
+    ``:last-child``-style tests.
+    """
+    from .httpcache import current_cache
+
+    cache = current_cache()
+    if cache is None:
+        return _first_match(client, url, selectors)[0]
+    request = client.build_request("GET", url)
+    key = ("first_match", str(request.url), tuple(selectors), tuple(request.headers.multi_items()))
+    return cache.shared(key, lambda: _first_match(client, url, selectors))
+
+
+def _first_match(
+    client: httpx.Client,
+    url: str,
+    selectors: list[tuple[str, str]],
+) -> tuple[_Element | None, int]:
+    """``first_match`` without the cache; also returns the bytes parsed."""
+    from lxml import etree
+
+    compiled = [compile_selector(s, t) for s, t in selectors]
+    elapsed = 0.0
+    with client.stream("GET", url) as response:
+        response.raise_for_status()
+        parser = etree.HTMLPullParser(
+            events=("start",), tag="html", encoding=response.charset_encoding
+        )
+        # Data is fed in batches ending at each check point, since libxml2 is
+        # slower fed many small chunks. A batch is checked only once more data
+        # arrives, so the last one is never matched twice.
+        pending = bytearray()
+        root = None
+        fed = 0
+        next_check = FIRST_CHECK
+        for chunk in response.iter_bytes():
+            if fed + len(pending) >= next_check:
+                started = time.perf_counter()
+                parser.feed(bytes(pending))
+                fed += len(pending)
+                pending.clear()
+                next_check = fed * 4
+                for _, element in parser.read_events():
+                    root = element
+                nodes = compiled[0](root) if root is not None else None
+                elapsed += time.perf_counter() - started
+                if nodes:
+                    _report(elapsed)
+                    return nodes[0], fed
+            pending += chunk
+        if pending:
+            started = time.perf_counter()
+            parser.feed(bytes(pending))
+            fed += len(pending)
+            elapsed += time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            return None, fed
+        for selector in compiled:
+            if nodes := selector(root):
+                return nodes[0], fed
+        return None, fed
+    finally:
+        _report(elapsed + time.perf_counter() - started)
@@ -1,6 +1,7 @@
-from dataclasses import replace
+from pathlib import Path
 
 from .models import ScrapeTarget, TargetGroup
+from .registry import Registry
 from .scrapers import (
     resolve_asus_static,
     resolve_direct_url,
@@ -8,7 +9,9 @@ from .scrapers import (
     resolve_gigabyte_dynamic,
     resolve_intel_static,
     resolve_msi_dynamic,
+    resolve_msi_static,
     resolve_nvidia_grd,
+    resolve_nvidia_static,
     resolve_sourceforge_static,
     resolve_static_download,
 )
@@ -68,6 +71,7 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
         path="display/{name}",
         resolver_type="dynamic",
         resolver=resolve_nvidia_grd,
+        static_resolver=resolve_nvidia_static,
         resolver_kwargs={"url": "https://www.nvidia.com/zh-tw/geforce/game-ready-drivers/"},
         file_type="exe",
         rename_as="desktop-win10-win11-64bit-international-dch-whql",
@@ -138,6 +142,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/Motherboard/B850M-FORCE-WIFI6E-rev-10/support",
                     "selector": (
@@ -153,6 +159,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/Motherboard/B850M-FORCE-WIFI6E-rev-10/support",
                     "selector": (
@@ -174,6 +182,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/PC-Accessory/GC-WIFI7-rev-11/support",
                     "selector": (
@@ -189,6 +199,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/PC-Accessory/GC-WIFI7-rev-11/support",
                     "selector": (
@@ -206,6 +218,7 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
         path="miscellaneous/{name}",
         resolver_type="dynamic",
         resolver=resolve_msi_dynamic,
+        static_resolver=resolve_msi_static,
         resolver_kwargs={
             "url": "https://msi.com/Motherboard/MAG-X870-TOMAHAWK-WIFI/support#driver",
             "driver_type": "On-Board Audio Drivers",
@@ -250,6 +263,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/Motherboard/B860M-AORUS-ELITE-WIFI6E/support#support-dl-driver-wlanbt",
                     "selector": (
@@ -265,6 +280,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/Motherboard/B860M-AORUS-ELITE-WIFI6E/support#support-dl-driver-wlanbt",
                     "selector": (
@@ -314,6 +331,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/PC-Accessory/GC-WIFI7-rev-10/support",
                     "selector": (
@@ -329,6 +348,8 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
                 path="",
                 resolver_type="dynamic",
                 resolver=resolve_gigabyte_dynamic,
+                static_resolver=resolve_static_download,
+                static_resolver_kwargs={"selector_type": "xpath"},
                 resolver_kwargs={
                     "url": "https://www.gigabyte.com/PC-Accessory/GC-WIFI7-rev-10/support",
                     "selector": (
@@ -370,6 +391,7 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
         path="network/{name}",
         resolver_type="dynamic",
         resolver=resolve_msi_dynamic,
+        static_resolver=resolve_msi_static,
         resolver_kwargs={
             "url": "https://msi.com/Motherboard/MAG-X870-TOMAHAWK-WIFI/support#driver",
             "driver_type": "LAN Drivers",
@@ -549,35 +571,22 @@ TARGETS: list[ScrapeTarget | TargetGroup] = [
 ]
 
 
+REGISTRY = Registry([lambda: TARGETS])
+"""Built-in ``TARGETS`` plus any catalogs added with ``add_catalog``."""
+
+
+def add_catalog(path: Path) -> None:
+    """Load targets from a TOML/JSON catalog on next lookup; see ``registry``."""
+    REGISTRY.add_source(path)
+
+
 def get_target_by_name(name: str) -> ScrapeTarget | None:
-    for t in TARGETS:
-        if isinstance(t, ScrapeTarget) and t.name == name:
-            return t
-        if isinstance(t, TargetGroup):
-            for m in t.members:
-                if m.name == name:
-                    return m
-    return None
+    return REGISTRY.target(name)
 
 
 def get_selection_choices() -> list[str]:
-    return [t.name for t in TARGETS]
+    return REGISTRY.names()
 
 
 def expand_selection(names: list[str]) -> list[tuple[ScrapeTarget, str | None]]:
-    group_map = {t.name: t for t in TARGETS if isinstance(t, TargetGroup)}
-    result: list[tuple[ScrapeTarget, str | None]] = []
-    for name in names:
-        if name in group_map:
-            group = group_map[name]
-            group_path = group.path.format(name=group.name)
-            for member in group.members:
-                full_path = f"{group_path}/{member.path}"
-                result.append((replace(member, path=full_path), f"{group.name} {member.name}"))
-        else:
-            target = next(
-                (t for t in TARGETS if isinstance(t, ScrapeTarget) and t.name == name), None
-            )
-            if target:
-                result.append((target, None))
-    return result
+    return REGISTRY.expand(names)
@@ -0,0 +1,167 @@
+"""Per-stage CPU profiling of a pipeline run.
+
+cProfile cannot run one profiler per worker thread on Python 3.12+, where it
+is built on the process-wide ``sys.monitoring`` API. ``StageProfiler`` instead
+samples every thread's stack on a background thread and attributes each
+sample to the stage the thread is in according to ``RunReport``. Where the
+platform supports per-thread CPU clocks, samples are weighted by the CPU time
+the thread used since the previous sample, so idle waits on sockets or the
+driver lock do not show up as hot code.
+"""
+
+import marshal
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+
+from .report import RunReport
+
+SAMPLE_INTERVAL = 0.005
+
+FuncKey = tuple[str, int, str]
+
+
+def _func_key(frame: FrameType) -> FuncKey:
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_qualname)
+
+
+def _label(key: FuncKey) -> str:
+    return f"{Path(key[0]).stem}.{key[2]}"
+
+
+def _thread_cpu_time(thread: int) -> float | None:
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread))
+    except (AttributeError, OSError):
+        return None
+
+
+class StageProfiler:
+    """Sampling profiler that splits samples by pipeline stage."""
+
+    def __init__(
+        self, report: Callable[[], RunReport | None], interval: float = SAMPLE_INTERVAL
+    ) -> None:
+        self._report = report
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._cpu: dict[int, float] = {}
+        # stage -> stack (root first) -> weight in seconds
+        self._stacks: dict[str, dict[tuple[FuncKey, ...], float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def start(self) -> "StageProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self._interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            report = self._report()
+            if report is None:
+                continue
+            active = report.active_stages()
+            frames = sys._current_frames()
+            # Forget CPU baselines of threads that left their stage, otherwise time
+            # spent idle between jobs lands on the next stage they enter.
+            self._cpu = {t: cpu for t, cpu in self._cpu.items() if t in active}
+            for thread, stage in active.items():
+                frame = frames.get(thread)
+                if frame is None or thread == own:
+                    continue
+                weight = self._weight(thread, elapsed)
+                if weight <= 0:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_func_key(frame))
+                    frame = frame.f_back
+                self._stacks[stage][tuple(reversed(stack))] += weight
+
+    def _weight(self, thread: int, elapsed: float) -> float:
+        cpu = _thread_cpu_time(thread)
+        if cpu is None:
+            return elapsed
+        previous = self._cpu.get(thread)
+        self._cpu[thread] = cpu
+        return cpu - previous if previous is not None else 0.0
+
+    def stages(self) -> list[str]:
+        return sorted(self._stacks)
+
+    def write(self, directory: Path) -> list[Path]:
+        """Write ``<stage>.collapsed`` and ``<stage>.pstats`` for every sampled stage."""
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for stage in self.stages():
+            collapsed = directory / f"{stage}.collapsed"
+            with collapsed.open("w") as f:
+                for stack, weight in sorted(self._stacks[stage].items()):
+                    micros = round(weight * 1_000_000)
+                    if micros:
+                        f.write(";".join(_label(k) for k in stack) + f" {micros}\n")
+            pstats_path = directory / f"{stage}.pstats"
+            with pstats_path.open("wb") as f:
+                marshal.dump(self._pstats(stage), f)
+            written += [collapsed, pstats_path]
+        summary = directory / "summary.txt"
+        summary.write_text(self.summary())
+        written.append(summary)
+        return written
+
+    def _pstats(self, stage: str) -> dict:
+        """Build the dict ``pstats.Stats`` loads, using sample weights as times.
+
+        Call counts are sample counts, so only the times are meaningful.
+        """
+        stats: dict[FuncKey, list] = {}
+        callers: dict[FuncKey, dict[FuncKey, list]] = defaultdict(dict)
+        for stack, weight in self._stacks[stage].items():
+            seen = set()
+            for depth, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0])
+                if key not in seen:
+                    entry[0] += 1
+                    entry[1] += 1
+                    entry[3] += weight
+                    seen.add(key)
+                if depth:
+                    edge = callers[key].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                    edge[0] += 1
+                    edge[1] += 1
+                    edge[3] += weight
+                    if depth == len(stack) - 1:
+                        edge[2] += weight
+            stats[stack[-1]][2] += weight
+        return {
+            key: (cc, nc, tt, ct, {c: tuple(v) for c, v in callers[key].items()})
+            for key, (cc, nc, tt, ct) in stats.items()
+        }
+
+    def summary(self, top: int = 10) -> str:
+        lines = []
+        for stage in self.stages():
+            self_time: dict[FuncKey, float] = defaultdict(float)
+            total = 0.0
+            for stack, weight in self._stacks[stage].items():
+                self_time[stack[-1]] += weight
+                total += weight
+            lines.append(f"== {stage}: {total:.3f}s sampled CPU ==")
+            for key, seconds in sorted(self_time.items(), key=lambda kv: -kv[1])[:top]:
+                share = seconds / total * 100 if total else 0.0
+                lines.append(f"  {seconds:8.3f}s {share:5.1f}%  {_label(key)} ({key[0]}:{key[1]})")
+        return "\n".join(lines) + "\n"
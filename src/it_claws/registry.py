@@ -0,0 +1,264 @@
+"""Indexed registry of scrape targets, loaded lazily from presets and catalog files.
+
+A catalog is a TOML or JSON file with a ``targets`` array. Each entry holds
+``ScrapeTarget`` fields. Resolvers are given by name: either a function in
+``it_claws.scrapers`` or ``package.module:function``. An entry with
+``members`` is a ``TargetGroup``::
+
+    [[targets]]
+    name = "gigabyte-b850m-lan"
+    path = "network/{name}"
+    vendor = "gigabyte"
+    tags = ["lan", "b850m"]
+    resolver_type = "static"
+    resolver = "resolve_static_download"
+    file_type = "zip/exe"
+    resolver_kwargs = { url = "https://...", selector = "a.download" }
+
+``priority`` (``high``, ``normal`` or ``low``) is the target's bandwidth
+class; set on a group, it applies to all members. ``sha256`` pins the
+expected digest of a target's download.
+
+Parsed catalogs are pickled under the user cache directory, keyed by path,
+size and mtime, so large catalogs are only parsed after they change.
+"""
+
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import re
+import threading
+import tomllib
+from collections.abc import Callable, Iterable
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from .bandwidth import PRIORITIES
+from .models import ScrapeTarget, TargetGroup
+
+CACHE_VERSION = 3
+
+Entry = ScrapeTarget | TargetGroup
+
+
+def cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "it-claws" / "catalogs"
+
+
+def _resolve_callable(ref: str) -> Callable[..., Any]:
+    module_name, _, attr = ref.rpartition(":")
+    module = importlib.import_module(module_name or "it_claws.scrapers")
+    try:
+        return getattr(module, attr)
+    except AttributeError:
+        raise ValueError(f"Unknown resolver {ref!r}") from None
+
+
+def _check_priority(data: dict[str, Any]) -> None:
+    if (data.get("priority") or "normal") not in PRIORITIES:
+        raise ValueError(f"Unknown priority {data['priority']!r} for {data.get('name')!r}")
+
+
+def _check_sha256(data: dict[str, Any]) -> None:
+    if data.get("sha256") and not re.fullmatch(r"[0-9a-fA-F]{64}", data["sha256"]):
+        raise ValueError(f"Invalid sha256 {data['sha256']!r} for {data.get('name')!r}")
+
+
+def _target_from_dict(data: dict[str, Any]) -> ScrapeTarget:
+    _check_priority(data)
+    _check_sha256(data)
+    fields = dict(data)
+    fields["resolver"] = _resolve_callable(fields["resolver"])
+    if fields.get("static_resolver"):
+        fields["static_resolver"] = _resolve_callable(fields["static_resolver"])
+    fields["tags"] = tuple(fields.get("tags", ()))
+    return ScrapeTarget(**fields)
+
+
+def _entry_from_dict(data: dict[str, Any]) -> Entry:
+    if "members" not in data:
+        return _target_from_dict(data)
+    _check_priority(data)
+    members = [_target_from_dict({"path": "", **m}) for m in data["members"]]
+    return TargetGroup(
+        name=data["name"],
+        path=data["path"],
+        members=members,
+        vendor=data.get("vendor"),
+        tags=tuple(data.get("tags", ())),
+        priority=data.get("priority"),
+    )
+
+
+def parse_catalog(path: Path) -> list[Entry]:
+    """Parse a ``.toml`` or ``.json`` catalog file into targets and groups."""
+    if path.suffix == ".toml":
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+    else:
+        data = json.loads(path.read_text())
+    entries = []
+    for i, item in enumerate(data.get("targets", [])):
+        try:
+            entries.append(_entry_from_dict(item))
+        except (KeyError, TypeError, ValueError) as exc:
+            name = item.get("name", f"#{i}")
+            raise ValueError(f"{path}: invalid target {name}: {exc}") from exc
+    return entries
+
+
+def load_catalog(path: Path) -> list[Entry]:
+    """``parse_catalog`` through the compiled cache."""
+    stat = path.stat()
+    key = f"{CACHE_VERSION}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    cached = cache_dir() / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.pickle"
+    try:
+        with cached.open("rb") as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+    entries = parse_catalog(path)
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp, cached)
+    except OSError:
+        pass
+    return entries
+
+
+def _vendor_of(target: ScrapeTarget) -> str | None:
+    """Explicit vendor, else the second-level domain of the resolver URL."""
+    if target.vendor:
+        return target.vendor
+    url = target.resolver_kwargs.get("url")
+    if not url:
+        return None
+    labels = (urlsplit(url).hostname or "").split(".")
+    return labels[-2] if len(labels) >= 2 else None
+
+
+class Registry:
+    """Targets by name, with vendor, tag and path lookups.
+
+    Sources are loaded in order on first use and later definitions of a
+    name replace earlier ones in place.
+    """
+
+    def __init__(self, sources: Iterable[Callable[[], list[Entry]] | Path] = ()) -> None:
+        self._sources = list(sources)
+        self._lock = threading.Lock()
+        self._entries: dict[str, Entry] | None = None
+        self._targets: dict[str, ScrapeTarget] = {}
+        self._vendors: dict[str, list[str]] = {}
+        self._tags: dict[str, list[str]] = {}
+        self._entry_vendors: dict[str, list[str]] = {}
+
+    def add_source(self, source: Callable[[], list[Entry]] | Path) -> None:
+        with self._lock:
+            self._sources.append(source)
+            self._entries = None
+
+    def _index(self) -> dict[str, Entry]:
+        with self._lock:
+            if self._entries is None:
+                self._build()
+            return self._entries
+
+    def _build(self) -> None:
+        entries: dict[str, Entry] = {}
+        for source in self._sources:
+            loaded = load_catalog(source) if isinstance(source, Path) else source()
+            for entry in loaded:
+                entries[entry.name] = entry
+
+        targets: dict[str, ScrapeTarget] = {}
+        vendors: dict[str, list[str]] = {}
+        tags: dict[str, list[str]] = {}
+        entry_vendors: dict[str, list[str]] = {}
+        for name, entry in entries.items():
+            members = entry.members if isinstance(entry, TargetGroup) else [entry]
+            if isinstance(entry, ScrapeTarget):
+                targets.setdefault(name, entry)
+            else:
+                for member in members:
+                    targets.setdefault(member.name, member)
+            found = {entry.vendor} if entry.vendor else {_vendor_of(m) for m in members}
+            entry_vendors[name] = sorted(v for v in found if v)
+            for vendor in entry_vendors[name]:
+                vendors.setdefault(vendor, []).append(name)
+            for tag in sorted({*entry.tags, *(t for m in members for t in m.tags)}):
+                tags.setdefault(tag, []).append(name)
+
+        self._entries = entries
+        self._targets = targets
+        self._vendors = vendors
+        self._tags = tags
+        self._entry_vendors = entry_vendors
+
+    def names(self) -> list[str]:
+        """Selectable names (targets and groups) in catalog order."""
+        return list(self._index())
+
+    def get(self, name: str) -> Entry | None:
+        return self._index().get(name)
+
+    def target(self, name: str) -> ScrapeTarget | None:
+        """A top-level target, or the first group member, called ``name``."""
+        self._index()
+        return self._targets.get(name)
+
+    def vendors_of(self, name: str) -> list[str]:
+        """Vendors of a target or group, from ``vendor`` fields or resolver URLs."""
+        self._index()
+        return self._entry_vendors.get(name, [])
+
+    def vendors(self) -> list[str]:
+        self._index()
+        return sorted(self._vendors)
+
+    def tags(self) -> list[str]:
+        self._index()
+        return sorted(self._tags)
+
+    def query(
+        self,
+        vendor: str | None = None,
+        tag: str | None = None,
+        path: str | None = None,
+    ) -> list[str]:
+        """Selectable names matching all given filters; ``path`` is a glob."""
+        entries = self._index()
+        names: Iterable[str] = entries
+        if vendor is not None:
+            names = self._vendors.get(vendor, [])
+        if tag is not None:
+            tagged = set(self._tags.get(tag, []))
+            names = [n for n in names if n in tagged]
+        if path is not None:
+            names = [n for n in names if fnmatch.fnmatch(entries[n].path.format(name=n), path)]
+        return list(names)
+
+    def expand(self, names: list[str]) -> list[tuple[ScrapeTarget, str | None]]:
+        """Turn selected names into targets; group members get the group's path and priority."""
+        entries = self._index()
+        result: list[tuple[ScrapeTarget, str | None]] = []
+        for name in names:
+            entry = entries.get(name)
+            if isinstance(entry, TargetGroup):
+                group_path = entry.path.format(name=entry.name)
+                priority = {"priority": entry.priority} if entry.priority else {}
+                for member in entry.members:
+                    full_path = f"{group_path}/{member.path}"
+                    member = replace(member, path=full_path, **priority)
+                    result.append((member, f"{entry.name} {member.name}"))
+            elif entry is not None:
+                result.append((entry, None))
+        return result
@@ -0,0 +1,152 @@
+"""Record and replay of the resolve phase.
+
+In record mode every HTTP response a resolver receives is stored, along with
+the URLs dynamic resolvers found in Chrome and the cookies taken from it. In
+replay mode the same lookups are answered from the store, so resolving needs
+neither the network nor a browser and is repeatable.
+
+Layout of the store directory::
+
+    index.json          request keys -> status, headers and body digest
+    bodies/<sha256>.z   zlib-compressed response bodies, deduplicated
+"""
+
+import hashlib
+import json
+import threading
+import zlib
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+FORMAT_VERSION = 1
+
+# Bodies are stored decoded, so headers describing the wire encoding no longer apply.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def request_key(request: httpx.Request) -> str:
+    key = f"{request.method} {request.url}"
+    if request.method not in ("GET", "HEAD"):
+        key += " " + hashlib.sha256(request.read()).hexdigest()[:16]
+    return key
+
+
+class ResolveStore:
+    """On-disk store of resolver traffic, fully loaded into memory for replay."""
+
+    def __init__(self, directory: Path, replay: bool = False) -> None:
+        self.directory = directory
+        self.replay = replay
+        self._lock = threading.Lock()
+        self._bodies: dict[str, bytes] = {}
+        self._index: dict[str, Any] = {
+            "format_version": FORMAT_VERSION,
+            "http": {},
+            "resolved": {},
+            "cookies": {},
+        }
+        index_path = directory / "index.json"
+        if index_path.exists():
+            self._index.update(json.loads(index_path.read_text()))
+        elif replay:
+            raise FileNotFoundError(f"No recording found in {directory}")
+        if replay:
+            for entry in self._index["http"].values():
+                digest = entry["body"]
+                if digest not in self._bodies:
+                    compressed = (directory / "bodies" / f"{digest}.z").read_bytes()
+                    self._bodies[digest] = zlib.decompress(compressed)
+
+    def transport(self, inner: httpx.BaseTransport | None = None) -> httpx.BaseTransport:
+        """Transport for resolver clients: records through ``inner``, or replays."""
+        if self.replay:
+            return _ReplayTransport(self)
+        return _RecordingTransport(self, inner or httpx.HTTPTransport())
+
+    def resolved_url(self, name: str) -> str:
+        return self._lookup("resolved", name)
+
+    def record_resolved_url(self, name: str, url: str) -> None:
+        with self._lock:
+            self._index["resolved"][name] = url
+
+    def cookies(self, name: str) -> dict[str, str]:
+        return self._lookup("cookies", name)
+
+    def record_cookies(self, name: str, cookies: dict[str, str]) -> None:
+        with self._lock:
+            self._index["cookies"][name] = cookies
+
+    def _lookup(self, section: str, name: str) -> Any:
+        try:
+            return self._index[section][name]
+        except KeyError:
+            raise RuntimeError(f"No recorded {section} entry for {name}") from None
+
+    def record_response(self, key: str, response: httpx.Response) -> None:
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        headers = [
+            [name, value]
+            for name, value in response.headers.multi_items()
+            if name.lower() not in _DROPPED_HEADERS
+        ]
+        with self._lock:
+            if digest not in self._bodies:
+                path = self.directory / "bodies" / f"{digest}.z"
+                if not path.exists():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(zlib.compress(body, 6))
+                self._bodies[digest] = body
+            self._index["http"][key] = {
+                "status": response.status_code,
+                "headers": headers,
+                "body": digest,
+            }
+
+    def response(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        entry = self._index["http"].get(key)
+        if entry is None:
+            raise RuntimeError(f"No recorded response for {key}")
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=self._bodies[entry["body"]],
+            request=request,
+        )
+
+    def save(self) -> None:
+        """Write the index; bodies are written as they are recorded."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self._index, indent=1, sort_keys=True)
+        (self.directory / "index.json").write_text(data + "\n")
+
+
+class _RecordingTransport(httpx.BaseTransport):
+    def __init__(self, store: ResolveStore, inner: httpx.BaseTransport) -> None:
+        self._store = store
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._inner.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        self._store.record_response(request_key(request), response)
+        return self._store.response(request)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class _ReplayTransport(httpx.BaseTransport):
+    def __init__(self, store: ResolveStore) -> None:
+        self._store = store
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._store.response(request)
@@ -0,0 +1,236 @@
+"""Machine-readable timing report of a pipeline run."""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .trace import Tracer
+
+STAGES = ("queue", "resolve", "parse", "driver_wait", "cookies", "download", "extract", "archive")
+
+
+@dataclass
+class JobReport:
+    name: str
+    target: str
+    resolver_type: str
+    resolved_via: str | None = None
+    attempts: int = 0
+    succeeded: bool = False
+    error: str | None = None
+    bytes: int = 0
+    first_byte_seconds: float | None = None
+    stream_seconds: float | None = None
+    transfer_retries: int = 0
+    stages: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float | None:
+        seconds = self.stages.get("download")
+        return self.bytes / seconds if seconds else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "target": self.target,
+            "resolver_type": self.resolver_type,
+            "resolved_via": self.resolved_via,
+            "attempts": self.attempts,
+            "retries": max(self.attempts - 1, 0),
+            "transfer_retries": self.transfer_retries,
+            "succeeded": self.succeeded,
+            "error": self.error,
+            "bytes": self.bytes,
+            "throughput_bps": self.throughput,
+            "first_byte_seconds": _round(self.first_byte_seconds),
+            "stream_throughput_bps": self.bytes / self.stream_seconds
+            if self.stream_seconds
+            else None,
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+        }
+
+
+def _round(seconds: float | None) -> float | None:
+    return round(seconds, 6) if seconds is not None else None
+
+
+class RunReport:
+    """Collects per-job stage timings while a pipeline runs.
+
+    All methods are thread-safe. Stage time accumulates across retry passes,
+    so a job resolved twice reports the sum of both resolves.
+    """
+
+    def __init__(self, engine: str, max_concurrent: int, tracer: Tracer | None = None) -> None:
+        self.engine = engine
+        self.max_concurrent = max_concurrent
+        self.tracer = tracer
+        self.started_at = datetime.now(UTC)
+        self.finished_at: datetime | None = None
+        self.extra: dict[str, Any] = {}
+        self._started = time.perf_counter()
+        self._wall_seconds: float | None = None
+        self._upload_ready_seconds: float | None = None
+        self._cache_hits: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._jobs: dict[str, JobReport] = {}
+        self._stage_seconds: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+        self._peak: dict[str, int] = {}
+        self._active: dict[int, list[str]] = {}
+        self._transfer_bytes: dict[str, int] = {}
+        self._completed_bytes = 0
+
+    def add_job(self, name: str, target: str, resolver_type: str) -> None:
+        with self._lock:
+            self._jobs.setdefault(name, JobReport(name, target, resolver_type))
+
+    def job(self, name: str) -> JobReport:
+        return self._jobs[name]
+
+    def update_job(self, name: str, **values: Any) -> None:
+        with self._lock:
+            job = self._jobs[name]
+            for key, value in values.items():
+                setattr(job, key, value)
+
+    def add_attempt(self, name: str) -> None:
+        with self._lock:
+            self._jobs[name].attempts += 1
+
+    def add_transfer_retry(self, name: str) -> None:
+        with self._lock:
+            self._jobs[name].transfer_retries += 1
+
+    def add_stage_time(self, name: str | None, stage: str, seconds: float) -> None:
+        with self._lock:
+            if name is not None:
+                stages = self._jobs[name].stages
+                stages[stage] = stages.get(stage, 0.0) + seconds
+            else:
+                self._stage_seconds[stage] = self._stage_seconds.get(stage, 0.0) + seconds
+
+    def add_span(self, name: str | None, stage: str, started: float, ended: float) -> None:
+        """Record a stage measured by the caller from ``time.perf_counter`` readings."""
+        self.add_stage_time(name, stage, ended - started)
+        if self.tracer is not None:
+            self.tracer.span(name, stage, started, ended)
+
+    @contextmanager
+    def stage(self, name: str | None, stage: str) -> Iterator[None]:
+        """Time ``stage`` for job ``name``; ``None`` records a run-level stage."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+            self._peak[stage] = max(self._peak.get(stage, 0), self._in_flight[stage])
+            self._active.setdefault(thread, []).append(stage)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self._in_flight[stage] -= 1
+                self._active[thread].remove(stage)
+                if not self._active[thread]:
+                    del self._active[thread]
+            self.add_span(name, stage, started, ended)
+
+    def active_stages(self) -> dict[int, str]:
+        """Map thread idents to the innermost stage each is currently in."""
+        with self._lock:
+            return {thread: stages[-1] for thread, stages in self._active.items()}
+
+    def add_transfer_bytes(self, name: str, nbytes: int) -> None:
+        """Count bytes received by a running transfer; only sampled when tracing."""
+        if self.tracer is None:
+            return
+        with self._lock:
+            self._transfer_bytes[name] = self._transfer_bytes.get(name, 0) + nbytes
+            in_flight = sum(self._transfer_bytes.values())
+            completed = self._completed_bytes
+        self.tracer.counter("bytes", {"in_flight": in_flight, "completed": completed})
+
+    def end_transfer(self, name: str) -> None:
+        if self.tracer is None:
+            return
+        with self._lock:
+            self._completed_bytes += self._transfer_bytes.pop(name, 0)
+            in_flight = sum(self._transfer_bytes.values())
+            completed = self._completed_bytes
+        self.tracer.counter("bytes", {"in_flight": in_flight, "completed": completed}, force=True)
+
+    def add_cache_hit(self, cache: str, hits: int = 1) -> None:
+        with self._lock:
+            self._cache_hits[cache] = self._cache_hits.get(cache, 0) + hits
+
+    def mark_upload_ready(self) -> None:
+        """Record that the output (archive or directory) is complete."""
+        self._upload_ready_seconds = time.perf_counter() - self._started
+
+    def mark_volume_ready(self, path: Path) -> None:
+        """Record that archive volume ``path`` is complete, under ``volumes``."""
+        volume = {
+            "name": path.name,
+            "bytes": path.stat().st_size,
+            "ready_seconds": round(time.perf_counter() - self._started, 6),
+        }
+        with self._lock:
+            self.extra.setdefault("volumes", []).append(volume)
+
+    def finish(self) -> None:
+        self.finished_at = datetime.now(UTC)
+        self._wall_seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            jobs = [job.to_dict() for job in self._jobs.values()]
+            cache_hits = dict(self._cache_hits)
+            stage_totals = {}
+            for stage in STAGES:
+                job_seconds = sum(job["stages"].get(stage, 0.0) for job in jobs)
+                seconds = self._stage_seconds.get(stage, job_seconds)
+                if not seconds and stage not in self._peak:
+                    continue
+                stage_totals[stage] = {
+                    "seconds": round(seconds, 6),
+                    "peak_concurrency": self._peak.get(stage, 0),
+                }
+
+        total_bytes = sum(job["bytes"] for job in jobs)
+        download_seconds = sum(job["stages"].get("download", 0.0) for job in jobs)
+        wall = self._wall_seconds
+        upload_ready = self._upload_ready_seconds
+        return {
+            "format_version": 1,
+            "engine": self.engine,
+            "max_concurrent": self.max_concurrent,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "wall_seconds": round(wall, 6) if wall is not None else None,
+            "upload_ready_seconds": round(upload_ready, 6) if upload_ready is not None else None,
+            "totals": {
+                "jobs": len(jobs),
+                "succeeded": sum(1 for job in jobs if job["succeeded"]),
+                "failed": sum(1 for job in jobs if not job["succeeded"]),
+                "retries": sum(job["retries"] for job in jobs),
+                "bytes": total_bytes,
+                "download_throughput_bps": total_bytes / download_seconds
+                if download_seconds
+                else None,
+                "stages": stage_totals,
+            },
+            "cache_hits": cache_hits,
+            **self.extra,
+            "jobs": jobs,
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
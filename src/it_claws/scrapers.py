@@ -1,20 +1,29 @@
+"""Resolvers, downloads and extraction.
+
+lxml and Selenium are imported where they are used, so loading the preset
+catalog (which references these functions) stays cheap.
+"""
+
+from __future__ import annotations
+
+import re
 import shutil
-import sys
 import tempfile
 import time
+from collections.abc import Callable, Hashable
 from pathlib import Path
-from typing import Any
-from urllib.parse import urljoin
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urljoin, urlsplit
 
-import httpx
-import lxml.html as lh
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from tqdm import tqdm
+from .parsing import first_match
+from .validate import PayloadCheck, PayloadError, TruncatedError
+from .writer import CHUNK_SIZE, StreamWriter, TransferStats
 
-from .archive import unzip
+if TYPE_CHECKING:
+    import httpx
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    from .bandwidth import BandwidthLimiter
 
 
 def resolve_direct_url(_client: Any, url: str, **_: Any) -> str:
@@ -29,16 +38,10 @@ def resolve_static_download(
     selector_type: str = "css",
     **_: Any,
 ) -> str | None:
-    response = client.get(url)
-    response.raise_for_status()
-    tree = lh.fromstring(response.text)
-    if selector_type == "xpath":
-        nodes = tree.xpath(selector)
-    else:
-        nodes = tree.cssselect(selector)
-    if not nodes:
+    node = first_match(client, url, [(selector, selector_type)])
+    if node is None:
         return None
-    link = nodes[0].get(attribute)
+    link = node.get(attribute)
     if not link:
         return None
     return urljoin(url, link)
@@ -47,6 +50,10 @@ def resolve_static_download(
 def resolve_gigabyte_dynamic(driver: WebDriver, url: str, selector: str, **_: Any) -> str | None:
     if driver.current_url == url:
         driver.get("about:blank")
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     driver.get(url)
     try:
         el = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.XPATH, selector)))
@@ -60,17 +67,22 @@ def resolve_intel_static(
     url: str,
     **_: Any,
 ) -> str | None:
-    tree = lh.fromstring(client.get(url).content)
-    for path, attr in (
-        ('//meta[@name="RecommendedDownloadUrl"]', "content"),
-        ('//button[contains(@class, "dc-page-available-downloads-hero-button_cta")]', "data-href"),
-    ):
-        node = tree.xpath(path)
-        if node:
-            return node[0].get(attr)
+    node = first_match(
+        client,
+        url,
+        [
+            ('//meta[@name="RecommendedDownloadUrl"]', "xpath"),
+            ('//button[contains(@class, "dc-page-available-downloads-hero-button_cta")]', "xpath"),
+        ],
+    )
+    if node is None:
+        return None
+    return node.get("content" if node.tag == "meta" else "data-href")
 
 
 def resolve_nvidia_grd(driver: WebDriver, url: str) -> str | None:
+    from selenium.webdriver.common.by import By
+
     driver.get(url)
     try:
         landing_url = driver.find_element(By.XPATH, '//a[@id="DsktpGrdDwnldBtn"]').get_attribute(
@@ -84,9 +96,51 @@ def resolve_nvidia_grd(driver: WebDriver, url: str) -> str | None:
         return None
 
 
+def resolve_nvidia_static(client: httpx.Client, url: str, **_: Any) -> str | None:
+    """HTTP-only counterpart of ``resolve_nvidia_grd``: both links are server-rendered."""
+    node = first_match(client, url, [('//a[@id="DsktpGrdDwnldBtn"]', "xpath")])
+    if node is None or not node.get("href"):
+        return None
+    landing_url = urljoin(url, node.get("href"))
+
+    node = first_match(client, landing_url, [('//a[contains(@id, "agreeDownload")]', "xpath")])
+    if node is None or not node.get("href"):
+        return None
+    return urljoin(landing_url, node.get("href"))
+
+
+def resolve_msi_static(
+    client: httpx.Client, url: str, driver_type: str, driver_name: str, **_: Any
+) -> str | None:
+    """Resolve an MSI support download from the JSON API behind the support page.
+
+    The product slug is taken from the support page URL, e.g.
+    ``https://msi.com/Motherboard/MAG-X870-TOMAHAWK-WIFI/support``.
+    """
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    if "support" not in parts or parts.index("support") == 0:
+        return None
+    product = parts[parts.index("support") - 1]
+
+    response = client.get(
+        "https://www.msi.com/api/v1/product/support/panel",
+        params={"product": product, "type": "driver"},
+    )
+    response.raise_for_status()
+    downloads = response.json().get("result", {}).get("downloads", {})
+    for item in downloads.get(driver_type) or []:
+        if driver_name in item.get("download_title", ""):
+            return item.get("download_url") or None
+    return None
+
+
 def resolve_msi_dynamic(
     driver: WebDriver, url: str, driver_type: str, driver_name: str
 ) -> str | None:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     driver.get(url)
     wait = WebDriverWait(driver, 3)
 
@@ -115,18 +169,70 @@ def resolve_sourceforge_static(
     client: httpx.Client,
     project_name: str,
 ) -> str | None:
-    response = client.get(
+    node = first_match(
+        client,
         f"https://sourceforge.net/projects/{project_name}/files/",
+        [('//a[contains(., "Download Latest Version")]', "xpath")],
     )
-    response.raise_for_status()
-    tree = lh.fromstring(response.text)
-    el = tree.xpath('//a[contains(., "Download Latest Version")]')
-    if not el:
+    if node is None:
         return None
-    version = el[0].get("title", "").split(":")[0]
+    version = node.get("title", "").split(":")[0]
     return f"https://download.sourceforge.net/{project_name}{version}"
 
 
+def batch_resolver(
+    resolve_many: Callable[[httpx.Client, list[dict[str, Any]]], list[str | None]],
+    key: Callable[..., Hashable],
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Declare that ``resolve_many`` can resolve several targets of a static resolver at once.
+
+    Jobs whose ``resolver_kwargs`` give the same ``key(**kwargs)`` are
+    resolved by the engine with one ``resolve_many(client, [kwargs, ...])``
+    call, which returns a URL (or None) per entry.
+    """
+
+    def decorate(resolver: Callable[..., Any]) -> Callable[..., Any]:
+        resolver.resolve_many = resolve_many
+        resolver.batch_key = key
+        return resolver
+
+    return decorate
+
+
+def _asus_drivers(client: httpx.Client, model: str, osid: int, website: str) -> list[dict]:
+    response = client.get(
+        "https://rog.asus.com/support/webapi/product/GetPDDrivers",
+        params={"website": website, "model": model, "osid": osid},
+    )
+    response.raise_for_status()
+    return response.json().get("Result", {}).get("Obj", [])
+
+
+def _asus_pick(groups: list[dict], category: str) -> str | None:
+    for group in groups:
+        if group.get("Name") != category:
+            continue
+        files = group.get("Files", [])
+        if not files:
+            return None
+        url = files[0].get("DownloadUrl", {}).get("Global")
+        if url:
+            return url
+    return None
+
+
+def _asus_batch_key(model: str, osid: int = 52, website: str = "global", **_: Any) -> Hashable:
+    return model, osid, website
+
+
+def resolve_asus_many(client: httpx.Client, kwargs_list: list[dict[str, Any]]) -> list[str | None]:
+    """Resolve several categories of one ASUS model from a single ``GetPDDrivers`` call."""
+    model, osid, website = _asus_batch_key(**kwargs_list[0])
+    groups = _asus_drivers(client, model, osid, website)
+    return [_asus_pick(groups, kwargs["category"]) for kwargs in kwargs_list]
+
+
+@batch_resolver(resolve_asus_many, key=_asus_batch_key)
 def resolve_asus_static(
     client: httpx.Client,
     model: str,
@@ -143,64 +249,93 @@ def resolve_asus_static(
         osid: OS identifier (52 = Windows 11 64-bit, 45 = Windows 10 64-bit).
         website: Regional website code (default "global").
     """
-    api_url = "https://rog.asus.com/support/webapi/product/GetPDDrivers"
-    response = client.get(api_url, params={
-        "website": website,
-        "model": model,
-        "osid": osid,
-    })
-    response.raise_for_status()
-    data = response.json()
-
-    for group in data.get("Result", {}).get("Obj", []):
-        if group.get("Name") != category:
-            continue
-        files = group.get("Files", [])
-        if not files:
-            return None
-        url = files[0].get("DownloadUrl", {}).get("Global")
-        if url:
-            return url
-
-    return None
+    return _asus_pick(_asus_drivers(client, model, osid, website), category)
 
 
 def resolve_furmark_static(client: httpx.Client, url: str, variant: str = "win64") -> str | None:
-    response = client.get(url)
-    response.raise_for_status()
-    tree = lh.fromstring(response.text)
     xpath = f'//a[contains(., "{variant} - (ZIP)") or contains(., "{variant} - (7ZIP)")]'
-    nodes = tree.xpath(xpath)
-    if not nodes:
+    node = first_match(client, url, [(xpath, "xpath")])
+    if node is None:
         return None
-    show_path = nodes[0].get("href")
+    show_path = node.get("href")
     if not show_path:
         return None
     get_path = show_path.replace("/dl/show/", "/dl/get/")
     return f"https://www.geeks3d.com{get_path}"
 
 
-def resolve_cookies(
+COOKIE_POLL_INTERVAL = 0.1
+"""Seconds between asking Chrome for cookies while waiting for them to be set."""
+
+
+def browser_cookies(driver: WebDriver, url: str) -> list[dict[str, Any]]:
+    """Chrome's cookies for ``url`` over CDP, including HttpOnly ones and their expiry."""
+    return driver.execute_cdp_cmd("Network.getCookies", {"urls": [url]})["cookies"]
+
+
+def fetch_cookies(
     driver: WebDriver,
     url: str,
     required_cookies: list[str],
-    timeout: int = 3,
-    fail_on_missing: bool = False,
-) -> dict[str, str]:
+    timeout: float = 3,
+) -> list[dict[str, Any]]:
+    """Load ``url`` with a clean jar and return the CDP cookies once all required are set.
+
+    Returns an empty list if they are not all set within ``timeout`` seconds.
+    """
     driver.delete_all_cookies()
     driver.get(url)
     deadline = time.monotonic() + timeout
-    while time.monotonic() < deadline:
-        time.sleep(1)
-        cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+    while True:
+        cookies = {c["name"]: c for c in browser_cookies(driver, url)}
         if all(name in cookies for name in required_cookies):
-            return {name: cookies[name] for name in required_cookies}
+            return [cookies[name] for name in required_cookies]
+        if time.monotonic() >= deadline:
+            return []
+        time.sleep(COOKIE_POLL_INTERVAL)
 
-    if fail_on_missing:
-        raise RuntimeError(
-            f"Required cookies {required_cookies} not set within {timeout}s for {url}"
-        )
-    return {}
+
+def _range_headers(
+    headers: dict[str, str] | None, offset: int, if_range: str | None
+) -> dict[str, str] | None:
+    """``headers`` plus a request for the bytes from ``offset`` on, if still ``if_range``."""
+    if not offset:
+        return headers
+    ranged = {**(headers or {}), "Range": f"bytes={offset}-"}
+    if if_range:
+        ranged["If-Range"] = if_range
+    return ranged
+
+
+def _stream_start(response: httpx.Response, url: str, offset: int) -> tuple[int, int]:
+    """Offset the response body starts at and the file's full size (0 if unknown).
+
+    A server that ignores the range, or whose file changed since ``If-Range``,
+    answers 200 with the whole file, which then starts at 0.
+    """
+    response.raise_for_status()
+    if "text/html" in response.headers.get("content-type", ""):
+        raise PayloadError(f"Expected binary stream but received HTML from {url}")
+    if response.status_code != 206:
+        return 0, int(response.headers.get("content-length", 0))
+    match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("content-range", ""))
+    if match is None or int(match[1]) != offset:
+        raise RuntimeError(f"Unexpected Content-Range from {url}")
+    return offset, 0 if match[2] == "*" else int(match[2])
+
+
+def _check_length(response: httpx.Response, url: str, writer: StreamWriter) -> None:
+    """Raise if the body's length does not match its announced size.
+
+    Decoded bodies are skipped, since ``Content-Length`` counts encoded bytes.
+    """
+    received = writer.offset + writer.stats.bytes
+    if not writer.total or response.headers.get("content-encoding", "identity") != "identity":
+        return
+    if received < writer.total:
+        raise TruncatedError(f"Download from {url} ended at {received} of {writer.total} bytes")
+    if received > writer.total:
+        raise PayloadError(f"Download from {url} is {received} bytes, not {writer.total}")
 
 
 def download_file(
@@ -210,25 +345,105 @@ def download_file(
     *,
     headers: dict[str, str] | None = None,
     cookies: dict[str, str] | None = None,
+    progress: Callable[[int], None] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    drop_cache: bool = False,
+    stats: TransferStats | None = None,
+    offset: int = 0,
+    if_range: str | None = None,
+    digest: Any | None = None,
+    on_start: Callable[[int, httpx.Headers], None] | None = None,
+    limiter: BandwidthLimiter | None = None,
+    priority: str = "normal",
+    check: PayloadCheck | None = None,
+) -> Path:
+    """Stream ``url`` to ``destination``.
+
+    With ``offset``, only the rest of a partial file is requested; see
+    ``StreamWriter`` for ``digest``. ``on_start`` gets the offset the
+    transfer actually starts at and the response headers. With ``limiter``,
+    reading pauses as needed to keep within its cap for ``priority``.
+    ``check`` validates the payload as it streams, and ``TruncatedError`` is
+    raised if the body is shorter than announced.
+    """
+    started = time.perf_counter()
+    request_headers = _range_headers(headers, offset, if_range)
+    with client.stream("GET", url, headers=request_headers, cookies=cookies) as response:
+        offset, total = _stream_start(response, url, offset)
+        if on_start is not None:
+            on_start(offset, response.headers)
+        with StreamWriter(
+            destination,
+            total,
+            started=started,
+            progress=progress,
+            drop_cache=drop_cache,
+            stats=stats,
+            offset=offset,
+            digest=digest,
+            check=check,
+        ) as writer:
+            if limiter is None:
+                for chunk in response.iter_bytes(chunk_size):
+                    writer.write(chunk)
+            else:
+                with limiter.stream(priority):
+                    for chunk in response.iter_bytes(chunk_size):
+                        writer.write(chunk)
+                        if delay := limiter.reserve(len(chunk), priority):
+                            time.sleep(delay)
+        _check_length(response, url, writer)
+    return destination
+
+
+async def download_file_async(
+    client: httpx.AsyncClient,
+    url: str,
+    destination: Path,
+    *,
+    headers: dict[str, str] | None = None,
+    cookies: dict[str, str] | None = None,
+    progress: Callable[[int], None] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    drop_cache: bool = False,
+    stats: TransferStats | None = None,
+    offset: int = 0,
+    if_range: str | None = None,
+    digest: Any | None = None,
+    on_start: Callable[[int, httpx.Headers], None] | None = None,
+    limiter: BandwidthLimiter | None = None,
+    priority: str = "normal",
+    check: PayloadCheck | None = None,
 ) -> Path:
-    with client.stream("GET", url, headers=headers, cookies=cookies) as response:
-        response.raise_for_status()
-        if "text/html" in response.headers.get("content-type", ""):
-            raise RuntimeError(f"Expected binary stream but received HTML from {url}")
-        total = int(response.headers.get("content-length", 0))
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        with open(destination, "wb") as f:
-            with tqdm(
-                total=total,
-                unit="B",
-                unit_scale=True,
-                desc=destination.name,
-                leave=False,
-                disable=not sys.stderr.isatty(),
-            ) as pbar:
-                for chunk in response.iter_bytes():
-                    f.write(chunk)
-                    pbar.update(len(chunk))
+    import asyncio
+
+    started = time.perf_counter()
+    request_headers = _range_headers(headers, offset, if_range)
+    async with client.stream("GET", url, headers=request_headers, cookies=cookies) as response:
+        offset, total = _stream_start(response, url, offset)
+        if on_start is not None:
+            on_start(offset, response.headers)
+        with StreamWriter(
+            destination,
+            total,
+            started=started,
+            progress=progress,
+            drop_cache=drop_cache,
+            stats=stats,
+            offset=offset,
+            digest=digest,
+            check=check,
+        ) as writer:
+            if limiter is None:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    writer.write(chunk)
+            else:
+                with limiter.stream(priority):
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        writer.write(chunk)
+                        if delay := limiter.reserve(len(chunk), priority):
+                            await asyncio.sleep(delay)
+        _check_length(response, url, writer)
     return destination
 
 
@@ -238,6 +453,8 @@ def extract_archive(
     file_type: str,
     rename_as: str | None = None,
 ) -> Path:
+    from .archive import unzip
+
     target_dir.mkdir(parents=True, exist_ok=True)
     with tempfile.TemporaryDirectory() as tmp:
         tmp_path = Path(tmp)
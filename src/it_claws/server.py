@@ -0,0 +1,402 @@
+"""``it-claws serve``: a long-running build service on a local HTTP API.
+
+One pipeline is created at startup and kept warm between builds (Chrome,
+the user agent, HTTP connections and cookies), so each build only pays for
+resolving and downloading. Builds run one at a time in submission order; a
+request identical to a queued or running build joins it instead of being
+queued again.
+
+Endpoints::
+
+    POST /builds              {"targets": [...]} or {"select": {...}} or {"all": true},
+                              plus optional "zip", "zip_prefix" and "manifest";
+                              archives use the service's --archive-format
+    GET  /builds              all builds
+    GET  /builds/<id>         one build, with per-job results when finished
+    GET  /builds/<id>/events  newline-delimited JSON progress until the build ends
+    GET  /bandwidth           download cap, current rate and per-class accounting
+    PUT  /bandwidth           {"limit": "5M"} or {"limit": null} to change the cap
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from tqdm import tqdm
+
+from . import archive
+from .bandwidth import format_rate, parse_rate
+from .models import DownloadJob
+from .presets import REGISTRY, add_catalog, expand_selection, get_selection_choices
+
+EVENT_INTERVAL = 0.5
+"""Seconds between progress checks on an events stream."""
+
+FINISHED = ("succeeded", "failed")
+
+
+class BuildError(ValueError):
+    """A build request that cannot be accepted."""
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+class Build:
+    def __init__(self, build_id: str, names: list[str], options: dict[str, Any], key: str):
+        self.id = build_id
+        self.names = names
+        self.options = options
+        self.key = key
+        self.status = "queued"
+        self.created_at = datetime.now(UTC)
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.output: Path | None = None
+        self.archive: Path | None = None
+        self.results: list[dict[str, Any]] = []
+        self.report: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    def to_dict(self, results: bool = True) -> dict[str, Any]:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "targets": self.names,
+            **self.options,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "output": str(self.output) if self.output else None,
+            "archive": str(self.archive) if self.archive else None,
+            "error": self.error,
+        }
+        if results:
+            data["results"] = self.results
+        return data
+
+
+def parse_request(body: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+    """Selected target names and archive options of a build request."""
+    if not isinstance(body, dict):
+        raise BuildError("request body must be a JSON object")
+    choices = get_selection_choices()
+    if body.get("all"):
+        names = choices
+    elif "select" in body:
+        select = body["select"]
+        if not isinstance(select, dict) or not set(select) <= {"vendor", "tag", "path"}:
+            raise BuildError("select takes vendor, tag and path")
+        names = REGISTRY.query(**select)
+    elif "targets" in body:
+        names = body["targets"]
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+            raise BuildError("targets must be a list of names")
+        known = set(choices)
+        if unknown := [n for n in names if n not in known]:
+            raise BuildError(f"unknown target(s): {', '.join(unknown)}")
+    else:
+        raise BuildError("give targets, select or all")
+    if not names:
+        raise BuildError("no targets selected")
+    options = {
+        "zip": bool(body.get("zip", False)),
+        "zip_prefix": body.get("zip_prefix"),
+        "manifest": bool(body.get("manifest", False)),
+    }
+    return list(dict.fromkeys(names)), options
+
+
+class BuildService:
+    """Queue of builds run one at a time on a warm pipeline."""
+
+    def __init__(self, pipeline: Any, output_root: Path) -> None:
+        self.pipeline = pipeline
+        self.output_root = output_root
+        self._lock = threading.Lock()
+        self._builds: dict[str, Build] = {}
+        self._active: dict[str, Build] = {}
+        self._queue: queue.Queue[Build | None] = queue.Queue()
+        self._ids = itertools.count(1)
+        self._worker = threading.Thread(target=self._work, daemon=True)
+
+    def start(self) -> "BuildService":
+        self._worker.start()
+        return self
+
+    def stop(self) -> None:
+        self._queue.put(None)
+
+    def submit(self, body: dict[str, Any]) -> tuple[Build, bool]:
+        """Queue a build; returns it and whether an identical active build was reused."""
+        names, options = parse_request(body)
+        key = json.dumps([sorted(names), options], sort_keys=True)
+        with self._lock:
+            if build := self._active.get(key):
+                return build, True
+            build = Build(
+                f"{datetime.now(UTC):%Y%m%d%H%M%S}-{next(self._ids)}", names, options, key
+            )
+            self._builds[build.id] = build
+            self._active[key] = build
+        self._queue.put(build)
+        return build, False
+
+    def bandwidth(self) -> dict[str, Any]:
+        limiter = self.pipeline.bandwidth
+        return {**limiter.to_dict(), "throughput_bps": limiter.throughput()}
+
+    def set_bandwidth(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Apply ``{"limit": RATE}``: a number of bytes/s, a string like ``5M``, or null."""
+        if not isinstance(body, dict) or "limit" not in body:
+            raise BuildError('give {"limit": RATE} or {"limit": null}')
+        limit = body["limit"]
+        try:
+            if isinstance(limit, str):
+                limit = parse_rate(limit)
+            elif limit is not None and (isinstance(limit, bool) or not limit > 0):
+                raise ValueError(f"rate must be positive, got {limit!r}")
+        except (TypeError, ValueError) as exc:
+            raise BuildError(str(exc)) from None
+        self.pipeline.bandwidth.set_rate(limit)
+        tqdm.write(f"Bandwidth cap: {format_rate(limit)}")
+        return self.bandwidth()
+
+    def get(self, build_id: str) -> Build | None:
+        return self._builds.get(build_id)
+
+    def builds(self) -> list[Build]:
+        return list(self._builds.values())
+
+    def live_jobs(self, build: Build) -> list[dict[str, Any]]:
+        """Per-job state of ``build``: from the live report while running."""
+        if build.report is not None:
+            return build.report["jobs"]
+        report = self.pipeline.report
+        if build.status != "running" or report is None or report.started_at < build.started_at:
+            return []
+        return report.to_dict()["jobs"]
+
+    def _work(self) -> None:
+        while (build := self._queue.get()) is not None:
+            try:
+                status = self._run(build)
+            except BaseException as exc:
+                status = "failed"
+                build.error = str(exc) or type(exc).__name__
+            build.finished_at = datetime.now(UTC)
+            with self._lock:
+                self._active.pop(build.key, None)
+            build.status = status
+            tqdm.write(f"Build {build.id} {status}")
+
+    def _run(self, build: Build) -> str:
+        build.output = self.output_root / build.id
+        if build.options["zip"]:
+            extension = archive.EXTENSIONS[self.pipeline.archive_format]
+            build.archive = self.output_root / f"{build.id}{extension}"
+        build.started_at = datetime.now(UTC)
+        build.status = "running"
+        tqdm.write(f"Build {build.id} started: {', '.join(build.names)}")
+        jobs = [
+            DownloadJob(target=t, output_root=build.output, name=name)
+            for t, name in expand_selection(build.names)
+        ]
+        results = self.pipeline.execute(
+            jobs,
+            build.output,
+            build.archive,
+            zip_prefix=build.options["zip_prefix"],
+            manifest=build.options["manifest"],
+        )
+        build.results = [
+            {"name": job.display_name, "succeeded": ok, "message": msg} for job, ok, msg in results
+        ]
+        build.report = self.pipeline.report.to_dict()
+        return "succeeded" if results and all(ok for _, ok, _ in results) else "failed"
+
+
+class BuildServer:
+    """HTTP front end of a ``BuildService``."""
+
+    def __init__(self, service: BuildService, port: int, host: str = "127.0.0.1") -> None:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parts = [p for p in self.path.split("?")[0].split("/") if p]
+                if parts == ["builds"]:
+                    self._json(200, [b.to_dict(results=False) for b in service.builds()])
+                    return
+                if parts == ["bandwidth"]:
+                    self._json(200, service.bandwidth())
+                    return
+                build = service.get(parts[1]) if len(parts) in (2, 3) else None
+                if parts[:1] != ["builds"] or build is None:
+                    self._json(404, {"error": "not found"})
+                elif len(parts) == 2:
+                    self._json(200, build.to_dict())
+                elif parts[2] == "events":
+                    self._events(build)
+                else:
+                    self._json(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                if self.path.split("?")[0].rstrip("/") != "/builds":
+                    self._json(404, {"error": "not found"})
+                    return
+                try:
+                    build, joined = service.submit(self._body())
+                except (BuildError, json.JSONDecodeError) as exc:
+                    self._json(400, {"error": str(exc)})
+                    return
+                self._json(200 if joined else 202, {**build.to_dict(), "deduplicated": joined})
+
+            def do_PUT(self) -> None:
+                if self.path.split("?")[0].rstrip("/") != "/bandwidth":
+                    self._json(404, {"error": "not found"})
+                    return
+                try:
+                    self._json(200, service.set_bandwidth(self._body()))
+                except (BuildError, json.JSONDecodeError) as exc:
+                    self._json(400, {"error": str(exc)})
+
+            def _body(self) -> Any:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _json(self, status: int, data: Any) -> None:
+                body = json.dumps(data, indent=1).encode() + b"\n"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _events(self, build: Build) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                status = None
+                outcomes: dict[str, Any] = {}
+                try:
+                    while True:
+                        current = build.status
+                        for job in service.live_jobs(build):
+                            outcome = (job["succeeded"], job["error"])
+                            if outcomes.get(job["name"]) != outcome and any(outcome):
+                                outcomes[job["name"]] = outcome
+                                self._event({"event": "job", **job})
+                        if current != status:
+                            status = current
+                            self._event({"event": "status", "status": status})
+                        if status in FINISHED:
+                            self._event({"event": "result", **build.to_dict()})
+                            return
+                        time.sleep(EVENT_INTERVAL)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _event(self, data: dict[str, Any]) -> None:
+                self.wfile.write(json.dumps(data).encode() + b"\n")
+                self.wfile.flush()
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="it-claws serve", description="Run builds requested over a local HTTP API."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind (default: 8765)")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path.cwd() / "builds",
+        help="Directory for build outputs and archives (default: ./builds)",
+    )
+    parser.add_argument("--max-concurrent", type=int, default=3)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("-l", "--compress-level", type=int, choices=range(10), default=5)
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    parser.add_argument(
+        "--archive-format",
+        choices=("zip", "tar.zst", "7z"),
+        default="zip",
+        help="Format of build archives (default: zip)",
+    )
+    parser.add_argument(
+        "--bandwidth",
+        type=parse_rate,
+        default=None,
+        metavar="RATE",
+        help="Cap the combined download rate in bytes/s, e.g. 5M = 5,000,000 "
+        "(change with PUT /bandwidth)",
+    )
+    parser.add_argument(
+        "--catalog",
+        action="append",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Load extra targets from a TOML/JSON catalog (repeatable)",
+    )
+    return parser
+
+
+def main(argv: list[str]) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if problem := archive.backend_error(args.archive_format):
+        parser.error(problem)
+    for catalog in args.catalog or []:
+        add_catalog(catalog)
+    get_selection_choices()
+
+    if args.engine == "async":
+        from .async_engine import AsyncPipeline as pipeline_cls
+    else:
+        from .engine import ConcurrentPipeline as pipeline_cls
+    pipeline = pipeline_cls(
+        max_concurrent=args.max_concurrent,
+        retries=args.retries,
+        compress_level=args.compress_level,
+        keep_warm=True,
+        archive_format=args.archive_format,
+        bandwidth=args.bandwidth,
+    )
+    args.output.mkdir(parents=True, exist_ok=True)
+    service = BuildService(pipeline, args.output).start()
+    server = BuildServer(service, args.port, args.host)
+    tqdm.write(f"Serving builds on http://{args.host}:{server.port}/builds")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        service.stop()
+        pipeline.close()
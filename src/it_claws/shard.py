@@ -0,0 +1,107 @@
+"""Split a run across machines with ``--shard K/N`` and combine the results.
+
+Every shard expands the same selection and keeps its own part of it, so the
+shards need no coordination beyond being given the same arguments. Jobs
+sharing an output directory (group members) stay on one shard. Parts are
+balanced by expected download size, taken from the ``bytes`` of a previous
+run report when ``--shard-weights`` is given, and by job count otherwise.
+
+``it-claws merge`` then combines the shard archives (or output directories)
+into the final archive, copying zip members without recompressing them.
+The shards' manifests are dropped and, with ``--manifest``, replaced by
+a fresh one.
+"""
+
+import argparse
+import json
+import statistics
+from pathlib import Path
+
+from tqdm import tqdm
+
+from . import archive
+from .models import DownloadJob
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``(index, count)`` from ``K/N``, with a zero-based index."""
+    try:
+        k, n = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"expected K/N, got {value!r}") from None
+    if not 1 <= k <= n:
+        raise ValueError(f"shard {k} is not between 1 and {n}")
+    return k - 1, n
+
+
+def load_weights(report: Path) -> dict[str, int]:
+    """Downloaded bytes by job name from a ``--report`` file."""
+    jobs = json.loads(report.read_text())["jobs"]
+    return {job["name"]: job["bytes"] for job in jobs if job["bytes"]}
+
+
+def partition(
+    jobs: list[DownloadJob], count: int, weights: dict[str, int] | None = None
+) -> list[list[DownloadJob]]:
+    """Deterministically split ``jobs`` into ``count`` parts of similar weight.
+
+    Jobs without a weight count as the median known weight. Each part keeps
+    the jobs in their original order.
+    """
+    weights = weights or {}
+    known = [weights[job.display_name] for job in jobs if job.display_name in weights]
+    default = statistics.median(known) if known else 1
+
+    units: dict[Path, list[DownloadJob]] = {}
+    for job in jobs:
+        units.setdefault(job.destination_directory, []).append(job)
+
+    def unit_weight(unit: list[DownloadJob]) -> float:
+        return sum(weights.get(job.display_name, default) for job in unit)
+
+    loads = [0.0] * count
+    shard_of: dict[str, int] = {}
+    for unit in sorted(units.values(), key=lambda u: (-unit_weight(u), u[0].display_name)):
+        shard = loads.index(min(loads))
+        loads[shard] += unit_weight(unit)
+        shard_of.update((job.display_name, shard) for job in unit)
+    return [[job for job in jobs if shard_of[job.display_name] == i] for i in range(count)]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="it-claws merge",
+        description="Combine shard archives or output directories into one archive.",
+    )
+    parser.add_argument("shards", nargs="+", type=Path, metavar="SHARD", help="Zip or directory")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Archive to write")
+    parser.add_argument(
+        "--zip-prefix",
+        default=None,
+        help="The shards' --zip-prefix, applied to files taken from shard directories",
+    )
+    parser.add_argument("--manifest", action="store_true", help="Write a fresh manifest.json")
+    parser.add_argument("-l", "--compress-level", type=int, choices=range(10), default=5)
+    return parser
+
+
+def main(argv: list[str]) -> None:
+    args = build_parser().parse_args(argv)
+    if missing := [str(shard) for shard in args.shards if not shard.exists()]:
+        raise SystemExit(f"error: shard not found: {', '.join(missing)}")
+    manifests = {"manifest.json"}
+    if args.zip_prefix:
+        manifests.add(f"{args.zip_prefix}/manifest.json")
+    try:
+        count = archive.merge(
+            args.output,
+            args.shards,
+            prefix=args.zip_prefix,
+            level=args.compress_level,
+            exclude=manifests,
+            extra={"manifest.json": archive.manifest_json()} if args.manifest else None,
+        )
+    except archive.MergeConflict as exc:
+        args.output.unlink(missing_ok=True)
+        raise SystemExit(f"error: {exc}") from None
+    tqdm.write(f"Merged {len(args.shards)} shard(s), {count} entries: {args.output}")
@@ -0,0 +1,152 @@
+"""Chrome trace-event export of a pipeline run, viewable in Perfetto.
+
+Every job gets its own track with nested spans for the stages it went
+through (queue, resolve, driver_wait, cookies, download, extract). Threads
+that ran stages one at a time also get per-thread spans, which shows idle
+workers and serialization on the Chrome driver lock. Byte counters are
+sampled while transfers are running.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+COUNTER_INTERVAL = 0.05
+
+_CHROME_TID = 0
+
+
+@dataclass
+class _Span:
+    job: str | None
+    stage: str
+    start: float
+    end: float
+    thread: int
+
+
+class Tracer:
+    """Collects spans and counters; ``write`` renders them as trace events."""
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: list[_Span] = []
+        self._counters: list[tuple[float, str, dict[str, float]]] = []
+        self._last_counter: dict[str, float] = {}
+        self._threads: dict[int, str] = {}
+        self._chrome: list[tuple[float, float]] = []
+
+    def span(self, job: str | None, stage: str, start: float, end: float) -> None:
+        """Record ``stage`` of ``job`` (``None`` for run-level work) on the calling thread."""
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._spans.append(_Span(job, stage, start, end, thread.ident))
+
+    def counter(self, name: str, values: dict[str, float], force: bool = False) -> None:
+        """Sample a counter track, at most every ``COUNTER_INTERVAL`` unless forced."""
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_counter.get(name, 0.0) < COUNTER_INTERVAL:
+                return
+            self._last_counter[name] = now
+            self._counters.append((now, name, dict(values)))
+
+    def chrome_launch(self, start: float, end: float) -> None:
+        with self._lock:
+            self._chrome.append((start, end))
+
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1_000_000, 3)
+
+    def events(self) -> list[dict[str, Any]]:
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            counters = list(self._counters)
+            threads = dict(self._threads)
+            chrome = list(self._chrome)
+
+        events: list[dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": pid, "args": {"name": "it-claws"}},
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": _CHROME_TID,
+             "args": {"name": "chrome"}},
+        ]  # fmt: skip
+        for tid, name in threads.items():
+            events.append(
+                {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+            )
+
+        jobs: dict[str, list[_Span]] = {}
+        for span in spans:
+            if span.job is not None:
+                jobs.setdefault(span.job, []).append(span)
+        for index, (job, job_spans) in enumerate(jobs.items(), start=1):
+            common = {"cat": "job", "id": index, "pid": pid}
+            start = min(s.start for s in job_spans)
+            end = max(s.end for s in job_spans)
+            events.append({**common, "ph": "b", "name": job, "ts": self._us(start)})
+            for span in sorted(job_spans, key=lambda s: (s.start, -s.end)):
+                args = {"job": job}
+                events.append(
+                    {**common, "ph": "b", "name": span.stage, "ts": self._us(span.start),
+                     "args": args}
+                )  # fmt: skip
+                events.append({**common, "ph": "e", "name": span.stage, "ts": self._us(span.end)})
+            events.append({**common, "ph": "e", "name": job, "ts": self._us(end)})
+
+        by_thread: dict[int, list[_Span]] = {}
+        for span in spans:
+            by_thread.setdefault(span.thread, []).append(span)
+        for tid, thread_spans in by_thread.items():
+            if not _properly_nested(thread_spans):
+                continue
+            for span in thread_spans:
+                events.append(
+                    {
+                        "ph": "X",
+                        "cat": "stage",
+                        "name": span.stage,
+                        "pid": pid,
+                        "tid": tid,
+                        "ts": self._us(span.start),
+                        "dur": round((span.end - span.start) * 1_000_000, 3),
+                        "args": {"job": span.job} if span.job else {},
+                    }
+                )
+
+        for start, end in chrome:
+            events.append(
+                {"ph": "X", "cat": "browser", "name": "chrome launch", "pid": pid,
+                 "tid": _CHROME_TID, "ts": self._us(start),
+                 "dur": round((end - start) * 1_000_000, 3)}
+            )  # fmt: skip
+
+        for ts, name, values in counters:
+            events.append({"ph": "C", "name": name, "pid": pid, "ts": self._us(ts), "args": values})
+        return events
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": self.events(), "displayTimeUnit": "ms"}))
+
+
+def _properly_nested(spans: list[_Span]) -> bool:
+    """Whether spans on one thread form a strict nesting (no partial overlaps).
+
+    The asyncio engine runs many jobs' stages on the loop thread at once;
+    those interleave and are only shown on the per-job tracks.
+    """
+    open_ends: list[float] = []
+    for span in sorted(spans, key=lambda s: (s.start, -s.end)):
+        while open_ends and open_ends[-1] <= span.start:
+            open_ends.pop()
+        if open_ends and span.end > open_ends[-1]:
+            return False
+        open_ends.append(span.end)
+    return True
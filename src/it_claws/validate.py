@@ -0,0 +1,88 @@
+"""Checks on download payloads, run while and right after they stream.
+
+A bad payload is caught before extraction, so the engine can fetch it
+again straight away instead of failing the job for a whole retry pass.
+``TruncatedError`` means the data so far is good and the transfer can be
+resumed; ``PayloadError`` means the file is wrong and must start over.
+"""
+
+import zipfile
+from pathlib import Path
+
+PE = b"MZ"
+OLE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+ZIP = (b"PK\x03\x04", b"PK\x05\x06")
+SEVEN_ZIP = b"7z\xbc\xaf\x27\x1c"
+RAR = b"Rar!\x1a\x07"
+
+EXPECTED = {
+    "exe": (PE, OLE),
+    "sfx": (PE,),
+    "zip": (*ZIP, SEVEN_ZIP, RAR),
+    "zip/exe": (*ZIP, SEVEN_ZIP, RAR),
+    "zip/folder": (*ZIP, SEVEN_ZIP, RAR),
+}
+"""Leading bytes accepted for each file type.
+
+``exe`` installers are PE files or MSI packages (OLE compound files); the
+archive types are extracted by 7z.
+"""
+
+HEAD = 8
+
+
+class DownloadError(RuntimeError):
+    """A download that finished but cannot be used."""
+
+
+class TruncatedError(DownloadError):
+    """The body ended before the announced length."""
+
+
+class PayloadError(DownloadError):
+    """The body is not the file the target expects."""
+
+
+class PayloadCheck:
+    """Validate a download of ``file_type`` as it streams and once it is written.
+
+    ``feed`` sniffs the first bytes, so an error page or wrong file fails on
+    its first chunk. ``finish`` checks a resumed file's head the same way and
+    a zip's central directory, which is at the end and missing if the
+    transfer was cut short, plus ``sha256`` when the target pins one.
+    """
+
+    def __init__(self, file_type: str, url: str, sha256: str | None = None) -> None:
+        self.expected = EXPECTED.get(file_type, ())
+        self.url = url
+        self.sha256 = sha256.lower() if sha256 else None
+        self._head = b""
+        self._sniffed = False
+
+    def feed(self, chunk: bytes) -> None:
+        if self._sniffed:
+            return
+        self._head += chunk[: HEAD - len(self._head)]
+        if len(self._head) >= HEAD:
+            self._sniff(self._head)
+
+    def finish(self, path: Path, sha256: str) -> None:
+        if not self._sniffed:
+            with open(path, "rb") as f:
+                self._sniff(f.read(HEAD))
+        if self._head.startswith(ZIP):
+            try:
+                zipfile.ZipFile(path).close()
+            except zipfile.BadZipFile as exc:
+                raise PayloadError(f"Corrupt zip from {self.url}: {exc}") from None
+        if self.sha256 and sha256 != self.sha256:
+            raise PayloadError(f"SHA-256 mismatch for {self.url}: got {sha256}")
+
+    def _sniff(self, head: bytes) -> None:
+        self._head = head
+        self._sniffed = True
+        if not self.expected or head.startswith(self.expected):
+            return
+        if head.lstrip().lower().startswith((b"<!doc", b"<html", b"<?xml", b"{")):
+            raise PayloadError(f"Expected a file but received a page from {self.url}")
+        raise PayloadError(f"Unexpected file signature {head[:4]!r} from {self.url}")
@@ -0,0 +1,179 @@
+"""``--watch``: rebuild the output only when upstream changes.
+
+Each cycle re-resolves every target and sends one HEAD request per
+download URL. On a warm pipeline, resolver pages are revalidated with
+conditional requests, so an unchanged cycle costs a few round trips per
+target and transfers almost nothing. A target counts as changed when its
+URL differs from the last build, when the URL's ``ETag``,
+``Last-Modified`` or ``Content-Length`` differ, or when its output
+directory has gone missing. A target whose HEAD request fails counts as
+unresolved and is checked again next cycle. Only changed targets are
+downloaded again, together with any targets sharing their output
+directory. The archive is then rebuilt from the whole output directory.
+
+The URLs and validators of the last build are kept in
+``<output>/.it-claws-watch.json``, so a restarted watch picks up where it
+left off, whichever directory it is started from. The file is never
+archived.
+"""
+
+import json
+import os
+import shutil
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tqdm import tqdm
+
+from .models import DownloadJob
+
+STATE_VERSION = 1
+STATE_NAME = ".it-claws-watch.json"
+
+
+def state_path(output_root: Path) -> Path:
+    return output_root / STATE_NAME
+
+
+def parse_interval(value: str) -> float:
+    """Seconds from ``90``, ``90s``, ``15m`` or ``2h``."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    number, unit = (value[:-1], units[value[-1]]) if value[-1:] in units else (value, 1)
+    seconds = float(number) * unit
+    if seconds <= 0:
+        raise ValueError(f"interval must be positive, got {value!r}")
+    return seconds
+
+
+@dataclass
+class CycleSummary:
+    cycle: int
+    changed: dict[str, str] = field(default_factory=dict)
+    """Job name -> what changed (``new``, ``url`` or the validator names)."""
+    unchanged: list[str] = field(default_factory=list)
+    unresolved: list[str] = field(default_factory=list)
+    rebuilt: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    def format(self) -> str:
+        lines = [
+            f"Cycle {self.cycle}: {len(self.changed)} changed, "
+            f"{len(self.unchanged)} unchanged, {len(self.unresolved)} unresolved"
+        ]
+        lines += [f"  changed {name}: {reason}" for name, reason in self.changed.items()]
+        lines += [f"  unresolved {name}" for name in self.unresolved]
+        if self.rebuilt:
+            lines.append(f"  rebuilt {len(self.rebuilt)} target(s), {len(self.failed)} failed")
+        lines += [f"  failed {name}" for name in self.failed]
+        return "\n".join(lines)
+
+
+class Watcher:
+    """Poll ``jobs`` and rebuild ``output_root`` (and the archive) when they change."""
+
+    def __init__(
+        self,
+        pipeline: Any,
+        jobs: list[DownloadJob],
+        output_root: Path,
+        build: Callable[[list[DownloadJob]], list[tuple[DownloadJob, bool, str]]],
+        state_file: Path | None = None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.jobs = jobs
+        self.output_root = output_root
+        self._build = build
+        self.state_file = state_file or state_path(output_root)
+        self.state: dict[str, dict[str, Any]] = {}
+        self.cycles = 0
+        if self.state_file.exists():
+            data = json.loads(self.state_file.read_text())
+            if data.get("format_version") == STATE_VERSION:
+                self.state = data["targets"]
+
+    def run(self, interval: float, cycles: int | None = None) -> None:
+        """Cycle every ``interval`` seconds, ``cycles`` times or until interrupted."""
+        while True:
+            started = time.monotonic()
+            tqdm.write(self.cycle().format())
+            if cycles is not None and self.cycles >= cycles:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def cycle(self) -> CycleSummary:
+        self.cycles += 1
+        summary = CycleSummary(self.cycles)
+        urls = self.pipeline.resolve(self.jobs)
+        current: dict[str, dict[str, Any]] = {}
+        for job in self.jobs:
+            name = job.display_name
+            url = urls.get(name)
+            if url is None:
+                summary.unresolved.append(name)
+                continue
+            validators = self.pipeline.probe(job, url)
+            if validators is None:
+                summary.unresolved.append(name)
+                continue
+            current[name] = {"url": url, **validators}
+            reason = _change(self.state.get(name), current[name])
+            if reason is None and not job.destination_directory.exists():
+                reason = "missing"
+            if reason:
+                summary.changed[name] = reason
+            else:
+                summary.unchanged.append(name)
+
+        if summary.changed:
+            affected = self._affected([j for j in self.jobs if j.display_name in summary.changed])
+            for directory in {job.destination_directory for job in affected}:
+                shutil.rmtree(directory, ignore_errors=True)
+            results = self._build(affected)
+            for job, ok, _ in results:
+                name = job.display_name
+                summary.rebuilt.append(name)
+                if ok and name in current:
+                    self.state[name] = current[name]
+                elif not ok:
+                    summary.failed.append(name)
+                    self.state.pop(name, None)
+            self._save()
+        return summary
+
+    def _affected(self, changed: list[DownloadJob]) -> list[DownloadJob]:
+        """``changed`` plus jobs writing into, above or below their directories."""
+        dirs = [job.destination_directory for job in changed]
+        return [
+            job
+            for job in self.jobs
+            if job in changed
+            or any(_overlaps(job.destination_directory, directory) for directory in dirs)
+        ]
+
+    def _save(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {"format_version": STATE_VERSION, "targets": self.state}
+        tmp = self.state_file.with_name(f".{self.state_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n")
+        os.replace(tmp, self.state_file)
+
+
+def _overlaps(a: Path, b: Path) -> bool:
+    return a == b or a.is_relative_to(b) or b.is_relative_to(a)
+
+
+def _change(previous: dict[str, Any] | None, current: dict[str, Any]) -> str | None:
+    """What changed between two probes, or None; validators missing on either side are skipped."""
+    if previous is None:
+        return "new"
+    if previous["url"] != current["url"]:
+        return "url"
+    changed = [
+        name
+        for name in ("etag", "last-modified", "content-length")
+        if name in previous and name in current and previous[name] != current[name]
+    ]
+    return ", ".join(changed) or None
@@ -0,0 +1,159 @@
+"""Write path for streamed downloads, shared by the thread and asyncio engines."""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from tqdm import tqdm
+
+from .validate import PayloadCheck
+
+CHUNK_SIZE = 1024 * 1024
+"""Bytes per read from the response; larger chunks mean fewer Python-level writes."""
+
+PROGRESS_INTERVAL = 0.25
+"""Seconds between progress bar and callback updates."""
+
+DROP_CACHE_EVERY = 32 * 1024 * 1024
+"""With ``drop_cache``, flush and evict written pages after this many bytes."""
+
+
+@dataclass
+class TransferStats:
+    """Timing of one download stream, measured from the request being sent."""
+
+    bytes: int = 0
+    first_byte_seconds: float | None = None
+    stream_seconds: float | None = None
+
+    @property
+    def throughput(self) -> float | None:
+        """Body bytes per second between the response headers and the last byte."""
+        return self.bytes / self.stream_seconds if self.stream_seconds else None
+
+
+class StreamWriter:
+    """Write response chunks to ``destination``.
+
+    The file is preallocated from ``Content-Length`` where the platform has
+    ``posix_fallocate``, so large parallel downloads do not fragment and a full
+    disk or tmpfs fails before the transfer instead of midway. Progress is
+    batched and reported at most every ``PROGRESS_INTERVAL`` seconds.
+
+    ``drop_cache`` is meant for disk-backed output: written data is flushed
+    and dropped from the page cache as it goes, so multi-GB downloads do not
+    evict the files extraction and archiving are about to read. Leave it off
+    on tmpfs, where the page cache is the storage.
+
+    With ``offset``, the first ``offset`` bytes of an existing file are kept
+    and writing continues after them; ``total`` is still the full size.
+    ``digest``, a hashlib object, is fed the whole file including that prefix.
+    ``check`` sees each chunk of a download from the start before it is
+    written, so a wrong payload is rejected from its first bytes.
+    """
+
+    def __init__(
+        self,
+        destination: Path,
+        total: int,
+        *,
+        started: float,
+        progress: Callable[[int], None] | None = None,
+        drop_cache: bool = False,
+        stats: TransferStats | None = None,
+        offset: int = 0,
+        digest: Any | None = None,
+        check: PayloadCheck | None = None,
+    ) -> None:
+        self.destination = destination
+        self.total = total
+        self.offset = offset
+        self.digest = digest
+        self.check = None if offset else check
+        self.stats = stats if stats is not None else TransferStats()
+        self._started = started
+        self._progress = progress
+        self._drop_cache = drop_cache and hasattr(os, "posix_fadvise")
+        self._headers_at = time.perf_counter()
+        self._pending = 0
+        self._last_report = self._headers_at
+        self._dropped_to = 0
+        self._preallocated = False
+
+    def __enter__(self) -> "StreamWriter":
+        self.destination.parent.mkdir(parents=True, exist_ok=True)
+        if self.offset:
+            self._file = open(self.destination, "r+b", buffering=0)
+            self._file.truncate(self.offset)
+            if self.digest is not None:
+                while chunk := self._file.read(CHUNK_SIZE):
+                    self.digest.update(chunk)
+            self._file.seek(self.offset)
+        else:
+            self._file = open(self.destination, "wb", buffering=0)
+        if self.total > self.offset and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self._file.fileno(), self.offset, self.total - self.offset)
+                self._preallocated = True
+            except OSError:
+                pass
+        self._bar = tqdm(
+            total=self.total,
+            initial=self.offset,
+            unit="B",
+            unit_scale=True,
+            desc=self.destination.name,
+            leave=False,
+            disable=not sys.stderr.isatty(),
+        )
+        return self
+
+    def write(self, chunk: bytes) -> None:
+        if self.stats.first_byte_seconds is None:
+            self.stats.first_byte_seconds = time.perf_counter() - self._started
+        if self.check is not None:
+            self.check.feed(chunk)
+        if self.digest is not None:
+            self.digest.update(chunk)
+        view = memoryview(chunk)
+        while view:
+            view = view[self._file.write(view) :]
+        self.stats.bytes += len(chunk)
+        self._pending += len(chunk)
+
+        if self._drop_cache and self.stats.bytes - self._dropped_to >= DROP_CACHE_EVERY:
+            self._evict()
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self._flush_progress()
+
+    def _flush_progress(self) -> None:
+        if not self._pending:
+            return
+        self._bar.update(self._pending)
+        if self._progress is not None:
+            self._progress(self._pending)
+        self._pending = 0
+
+    def _evict(self) -> None:
+        fd = self._file.fileno()
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, self.offset + self.stats.bytes, os.POSIX_FADV_DONTNEED)
+        self._dropped_to = self.stats.bytes
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            self._flush_progress()
+            self.stats.stream_seconds = time.perf_counter() - self._headers_at
+            if self._preallocated and self.offset + self.stats.bytes != self.total:
+                self._file.truncate(self.offset + self.stats.bytes)
+            if self._drop_cache:
+                self._evict()
+        finally:
+            self._bar.close()
+            self._file.close()
@@ -1,10 +1,14 @@
 """Tests for archive.py."""
 
+import json
 import subprocess
+import tarfile
 import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from it_claws import archive
 from it_claws.archive import _find_7z, unzip
 
@@ -118,6 +122,20 @@ class TestZip:
             called_target = mock_zf_cls.call_args[0][0]
             assert isinstance(called_target, Path)
 
+    def test_on_entry_called_per_write(self):
+        """on_entry receives (filepath, arcname, seconds) for every written entry."""
+        with patch("it_claws.archive.zipfile.ZipFile") as mock_zf_cls:
+            mock_zf_cls.return_value.__enter__.return_value = MagicMock()
+            mock_zf_cls.return_value.__exit__.return_value = False
+
+            seen = []
+            archive.zip(
+                Path("out.zip"),
+                [(Path("a.txt"), "a.txt"), (Path("b.txt"), "x/b.txt")],
+                on_entry=lambda fp, an, secs: seen.append((fp, an, secs >= 0)),
+            )
+            assert seen == [(Path("a.txt"), "a.txt", True), (Path("b.txt"), "x/b.txt", True)]
+
 
 class TestWalk:
     """Tests for walk()."""
@@ -158,3 +176,197 @@ class TestFind7z:
         result = _find_7z()
         assert isinstance(result, str)
         assert len(result) > 0
+
+
+def _tree(tmp_path):
+    root = tmp_path / "out"
+    (root / "net").mkdir(parents=True)
+    (root / "net" / "a.exe").write_bytes(b"MZ" * 1000)
+    (root / "gpu").mkdir()
+    (root / "gpu" / "b.exe").write_bytes(b"MZ")
+    return list(archive.walk(root, root, "drv"))
+
+
+class TestTarZst:
+    """Tests for tar_zst()."""
+
+    def test_same_layout_as_walk(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        entries = _tree(tmp_path)
+        timed = []
+        archive.tar_zst(
+            tmp_path / "out.tar.zst", entries, on_entry=lambda fp, an, s: timed.append(an)
+        )
+        with (
+            open(tmp_path / "out.tar.zst", "rb") as raw,
+            zstandard.ZstdDecompressor().stream_reader(raw) as stream,
+            tarfile.open(fileobj=stream, mode="r|") as tar,
+        ):
+            members = {m.name: tar.extractfile(m).read() for m in tar}
+        assert members == {arcname: path.read_bytes() for path, arcname in entries}
+        assert timed == [arcname for _, arcname in entries]
+
+
+class TestSevenzip:
+    """Tests for sevenzip()."""
+
+    def test_stages_entries_under_arcnames(self, tmp_path):
+        entries = _tree(tmp_path)
+        staged = {}
+
+        def fake_run(args, cwd, **_):
+            staged.update(
+                (p.relative_to(cwd).as_posix(), p.read_bytes())
+                for p in Path(cwd).rglob("*")
+                if p.is_file()
+            )
+            return subprocess.CompletedProcess(args, 0, stderr="")
+
+        timed = {}
+        with patch("it_claws.archive.subprocess.run", side_effect=fake_run) as mock_run:
+            archive.sevenzip(
+                tmp_path / "out.7z",
+                entries,
+                level=9,
+                on_entry=lambda fp, an, s: timed.setdefault(an, s),
+            )
+        args = mock_run.call_args[0][0]
+        assert args[1:6] == ["a", "-t7z", "-mx=9", "-mmt=on", "-y"]
+        assert args[-2:] == [str((tmp_path / "out.7z").resolve()), "."]
+        assert staged == {arcname: path.read_bytes() for path, arcname in entries}
+        assert timed["drv/net/a.exe"] > timed["drv/gpu/b.exe"]
+        assert [p.name for p in tmp_path.iterdir()] == ["out"]
+
+    def test_failure_raises(self, tmp_path):
+        with patch("it_claws.archive.subprocess.run") as mock_run:
+            mock_run.return_value = subprocess.CompletedProcess([], 2, stderr="disk full")
+            with pytest.raises(RuntimeError, match="disk full"):
+                archive.sevenzip(tmp_path / "out.7z", _tree(tmp_path))
+
+
+class TestBackendError:
+    """Tests for backend_error()."""
+
+    def test_zip_always_available(self):
+        assert archive.backend_error("zip") is None
+
+    def test_missing_zstandard(self, monkeypatch):
+        monkeypatch.setattr(archive.importlib.util, "find_spec", lambda name: None)
+        assert "zstandard" in archive.backend_error("tar.zst")
+
+    def test_missing_7z(self, monkeypatch):
+        monkeypatch.setattr(archive.shutil, "which", lambda name: None)
+        assert "7z" in archive.backend_error("7z")
+
+
+class TestCreate:
+    """Tests for create()."""
+
+    def test_dispatches_on_format(self, tmp_path):
+        backend = MagicMock()
+        with patch.dict(archive.BACKENDS, {"7z": backend}):
+            archive.create(tmp_path / "out.7z", [], format="7z", level=3)
+        backend.assert_called_once_with(tmp_path / "out.7z", [], level=3, on_entry=None)
+
+
+class TestWriteVolumes:
+    """Tests for write_volumes()."""
+
+    def _entries(self, tmp_path, sizes):
+        root = tmp_path / "out"
+        root.mkdir()
+        for i, size in enumerate(sizes):
+            (root / f"{i}.exe").write_bytes(bytes([i]) * size)
+        return list(archive.walk(root, root, None))
+
+    def test_plan_keeps_order_and_oversized_files(self, tmp_path):
+        entries = self._entries(tmp_path, [40, 40, 30, 500, 10])
+        plan = archive.plan_volumes(entries, 100)
+        assert [[an for _, an in group] for group in plan] == [
+            ["0.exe", "1.exe"],
+            ["2.exe"],
+            ["3.exe"],
+            ["4.exe"],
+        ]
+
+    def test_volumes_are_complete_zips(self, tmp_path):
+        entries = self._entries(tmp_path, [60, 60, 60])
+        manifest = tmp_path / "manifest.json"
+        manifest.write_text("{}")
+        ready = []
+        paths = archive.write_volumes(
+            tmp_path / "pack.zip",
+            entries,
+            volume_size=100,
+            shared=[(manifest, "manifest.json")],
+            on_volume=ready.append,
+        )
+        assert [p.name for p in paths] == ["pack.001.zip", "pack.002.zip", "pack.003.zip"]
+        assert sorted(ready) == paths
+        index = json.loads((tmp_path / "pack.index.json").read_text())
+        assert [v["files"] for v in index["volumes"]] == [["0.exe"], ["1.exe"], ["2.exe"]]
+        for number, path in enumerate(paths):
+            with zipfile.ZipFile(path) as zf:
+                assert zf.testzip() is None
+                assert zf.namelist() == ["manifest.json", f"{number}.exe", archive.INDEX_NAME]
+                assert json.loads(zf.read(archive.INDEX_NAME)) == index
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_removes_stale_volumes(self, tmp_path):
+        (tmp_path / "pack.002.zip").write_bytes(b"old")
+        (tmp_path / "pack.003.zip").write_bytes(b"old")
+        archive.write_volumes(tmp_path / "pack.zip", self._entries(tmp_path, [10]), volume_size=100)
+        assert sorted(p.name for p in tmp_path.glob("pack.*.zip")) == ["pack.001.zip"]
+
+    def test_volume_path_keeps_compound_extension(self):
+        assert archive.volume_path(Path("d/p.tar.zst"), "tar.zst", 2) == Path("d/p.002.tar.zst")
+
+
+class TestMerge:
+    """Tests for merge()."""
+
+    def _zip(self, path, members, **kwargs):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for name, data in members.items():
+                with zf.open(name, "w", **kwargs) as f:
+                    f.write(data)
+        return path
+
+    def test_copies_members_without_recompressing(self, tmp_path):
+        data = b"driver " * 10000
+        a = self._zip(tmp_path / "a.zip", {"net/a.exe": data, "conf/c.txt": b"same"})
+        b = self._zip(tmp_path / "b.zip", {"gpu/b.exe": data[:999], "conf/c.txt": b"same"})
+        count = archive.merge(tmp_path / "out.zip", [a, b], level=9)
+        assert count == 3
+        with zipfile.ZipFile(a) as src, zipfile.ZipFile(tmp_path / "out.zip") as out:
+            assert out.testzip() is None
+            assert out.read("net/a.exe") == data
+            assert out.getinfo("net/a.exe").compress_size == src.getinfo("net/a.exe").compress_size
+
+    def test_zip64_members(self, tmp_path):
+        source = self._zip(tmp_path / "a.zip", {"big.bin": b"x" * 5000}, force_zip64=True)
+        archive.merge(tmp_path / "out.zip", [source])
+        with zipfile.ZipFile(tmp_path / "out.zip") as out:
+            assert out.read("big.bin") == b"x" * 5000
+
+    def test_conflicting_member(self, tmp_path):
+        a = self._zip(tmp_path / "a.zip", {"x.txt": b"one"})
+        b = self._zip(tmp_path / "b.zip", {"x.txt": b"two"})
+        with pytest.raises(archive.MergeConflict):
+            archive.merge(tmp_path / "out.zip", [a, b])
+
+    def test_directories_exclude_and_extra(self, tmp_path):
+        shard = tmp_path / "shard"
+        (shard / "net").mkdir(parents=True)
+        (shard / "net" / "a.exe").write_bytes(b"MZ")
+        (shard / "manifest.json").write_text("{}")
+        zipped = self._zip(tmp_path / "a.zip", {"drv/net/a.exe": b"MZ"})
+        archive.merge(
+            tmp_path / "out.zip",
+            [shard, zipped],
+            prefix="drv",
+            exclude={"drv/manifest.json"},
+            extra={"manifest.json": "{}"},
+        )
+        with zipfile.ZipFile(tmp_path / "out.zip") as out:
+            assert out.namelist() == ["drv/net/a.exe", "manifest.json"]
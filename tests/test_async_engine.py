@@ -0,0 +1,96 @@
+"""Tests for async_engine.py."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from it_claws.async_engine import AsyncPipeline
+from it_claws.engine import ConcurrentPipeline
+from it_claws.models import DownloadJob, ScrapeTarget
+from it_claws.scrapers import resolve_direct_url
+
+
+class _Server(ThreadingHTTPServer):
+    """Serves ``MZ``-prefixed bodies slowly and records the peak of requests in flight."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        body = b"MZ" + self.path.encode() * 1000
+        time.sleep(0.05)
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = _Server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _jobs(server, output_root, count=5):
+    host, port = server.server_address
+    return [
+        DownloadJob(
+            target=ScrapeTarget(
+                name=f"tool-{i}",
+                path="software/{name}",
+                resolver_type="static",
+                resolver=resolve_direct_url,
+                file_type="exe",
+                resolver_kwargs={"url": f"http://{host}:{port}/tool-{i}.exe"},
+            ),
+            output_root=output_root,
+        )
+        for i in range(count)
+    ]
+
+
+class TestAsyncPipeline:
+    """Tests for AsyncPipeline.execute()."""
+
+    def _run(self, engine, server, output_root):
+        server.peak = 0
+        pipeline = engine(max_concurrent=2)
+        results = pipeline.execute(_jobs(server, output_root), output_root)
+        files = {
+            path.relative_to(output_root).as_posix(): path.read_bytes()
+            for path in output_root.rglob("*")
+            if path.is_file() and not path.name.startswith(".")
+        }
+        return results, files, pipeline.report.to_dict(), server.peak
+
+    def test_matches_concurrent_pipeline(self, server, tmp_path):
+        threaded = self._run(ConcurrentPipeline, server, tmp_path / "threads")
+        results, files, report, peak = self._run(AsyncPipeline, server, tmp_path / "async")
+
+        assert all(ok for _, ok, _ in results)
+        assert len(files) == 5
+        assert files == threaded[1]
+        assert report["engine"] == "AsyncPipeline"
+        assert report["totals"]["bytes"] == threaded[2]["totals"]["bytes"]
+        assert all("download" in job["stages"] for job in report["jobs"])
+        assert report["totals"]["stages"]["download"]["peak_concurrency"] == 2
+        assert peak == threaded[3] == 2
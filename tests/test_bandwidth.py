@@ -0,0 +1,71 @@
+"""Tests for bandwidth.py."""
+
+import pytest
+
+from it_claws.bandwidth import BandwidthLimiter, format_rate, parse_rate, parse_size
+
+
+class TestBandwidthLimiter:
+    """Tests for BandwidthLimiter()."""
+
+    def test_unlimited_never_waits(self):
+        limiter = BandwidthLimiter()
+        assert limiter.reserve(10**9) == 0.0
+        assert limiter.to_dict()["classes"]["normal"]["bytes"] == 10**9
+
+    def test_single_class_gets_full_rate(self):
+        limiter = BandwidthLimiter(1000)
+        with limiter.stream("low"):
+            assert limiter.reserve(500, "low") == pytest.approx(0.5, abs=0.05)
+            assert limiter.reserve(500, "low") == pytest.approx(1.0, abs=0.05)
+
+    def test_shares_follow_priority(self):
+        limiter = BandwidthLimiter(1000)
+        with limiter.stream("high"), limiter.stream("low"):
+            high = limiter.reserve(400, "high")
+            low = limiter.reserve(400, "low")
+        assert high == pytest.approx(0.5, abs=0.05)
+        assert low == pytest.approx(2.0, abs=0.05)
+
+    def test_set_rate_recorded(self):
+        limiter = BandwidthLimiter(1000)
+        limiter.set_rate(None)
+        assert limiter.reserve(10**6) == 0.0
+        report = limiter.to_dict()
+        assert report["limit_bps"] is None
+        assert report["configured_bps"] == 1000
+        assert [c["limit_bps"] for c in report["changes"]] == [None]
+
+
+class TestParseRate:
+    """Tests for parse_rate()."""
+
+    @pytest.mark.parametrize(
+        ("value", "rate"), [("750k", 750e3), ("5M", 5e6), ("1.5G", 1.5e9), ("10MB/s", 1e7)]
+    )
+    def test_units(self, value, rate):
+        assert parse_rate(value) == rate
+        assert format_rate(rate).endswith("B/s")
+
+    def test_off(self):
+        assert parse_rate("off") is None
+
+    @pytest.mark.parametrize("value", ["fast", "-5M", "5T"])
+    def test_rejected(self, value):
+        with pytest.raises(ValueError):
+            parse_rate(value)
+
+
+class TestParseSize:
+    """Tests for parse_size()."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"), [("512k", 512_000), ("700M", 700_000_000), ("1.5GB", 1_500_000_000)]
+    )
+    def test_decimal_units(self, value, expected):
+        assert parse_size(value) == expected
+
+    @pytest.mark.parametrize("value", ["0", "big", "-1M", "1.5GiB", "5M/s"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_size(value)
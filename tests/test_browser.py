@@ -0,0 +1,64 @@
+"""Tests for browser.py."""
+
+import pytest
+
+from it_claws.browser import BLOCKED_RESOURCES, ChromeSession
+
+
+class _StubDriver:
+    """Records ``execute_cdp_cmd`` calls instead of driving Chrome."""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = ChromeSession()
+    monkeypatch.setattr(session, "_create", _StubDriver)
+    return session
+
+
+def _blocked(driver):
+    ((cmd, params),) = driver.commands[-1:]
+    assert cmd == "Network.setBlockedURLs"
+    return params["urls"]
+
+
+class TestResourcePolicy:
+    """Tests for the blocked URLs ChromeSession.ensure() sends."""
+
+    def test_default_blocks_everything_listed(self, session):
+        assert _blocked(session.ensure()) == list(BLOCKED_RESOURCES)
+
+    def test_allowed_patterns_are_removed(self, session):
+        urls = _blocked(session.ensure(["*.css", "*.woff2"]))
+        assert "*.css" not in urls
+        assert "*.woff2" not in urls
+        assert len(urls) == len(BLOCKED_RESOURCES) - 2
+
+    def test_star_disables_blocking(self, session):
+        assert _blocked(session.ensure(["*"])) == []
+
+    def test_sent_only_when_policy_changes(self, session):
+        driver = session.ensure()
+        session.ensure(None)
+        session.ensure([])
+        assert len(driver.commands) == 1
+        session.ensure(["*.css"])
+        session.ensure(["*.css"])
+        session.ensure()
+        assert len(driver.commands) == 3
+
+    def test_resent_after_relaunch(self, session):
+        first = session.ensure()
+        session.close()
+        second = session.ensure()
+        assert second is not first
+        assert _blocked(second) == list(BLOCKED_RESOURCES)
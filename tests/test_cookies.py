@@ -0,0 +1,35 @@
+"""Tests for cookies.py."""
+
+import time
+
+from it_claws import cookies
+from it_claws.cookies import CookieCache
+
+
+def _cookie(name: str, value: str, expires: float | None = None) -> dict:
+    if expires is None:
+        return {"name": name, "value": value, "expires": -1, "session": True}
+    return {"name": name, "value": value, "expires": expires, "session": False}
+
+
+class TestCookieCache:
+    """Tests for CookieCache()."""
+
+    def test_shared_per_host(self):
+        cache = CookieCache()
+        cache.put("https://downloadmirror.intel.com/1/a.exe", [_cookie("tok", "v")])
+        assert cache.get("https://downloadmirror.intel.com/2/b.exe", ["tok"]) == {"tok": "v"}
+        assert cache.get("https://other.test/b.exe", ["tok"]) is None
+
+    def test_all_names_required(self):
+        cache = CookieCache()
+        cache.put("https://h.test/", [_cookie("a", "1")])
+        assert cache.get("https://h.test/", ["a", "b"]) is None
+
+    def test_expired_not_returned(self, monkeypatch):
+        monkeypatch.setattr(cookies, "EXPIRY_MARGIN", 0)
+        cache = CookieCache()
+        cache.put("https://h.test/", [_cookie("old", "1", time.time() - 1)])
+        cache.put("https://h.test/", [_cookie("new", "2", time.time() + 600)])
+        assert cache.get("https://h.test/", ["old"]) is None
+        assert cache.get("https://h.test/", ["new"]) == {"new": "2"}
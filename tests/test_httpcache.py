@@ -0,0 +1,133 @@
+"""Tests for httpcache.py."""
+
+import threading
+
+import httpx
+
+from it_claws.httpcache import ResponseCache, RevalidatingCache, use_cache
+from it_claws.parsing import first_match
+
+
+def _counting_transport(body: bytes, status: int = 200, delay: threading.Event | None = None):
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        if delay is not None:
+            delay.wait(5)
+        return httpx.Response(status, content=body, headers={"content-type": "text/html"})
+
+    return httpx.MockTransport(handler), calls
+
+
+class TestResponseCache:
+    """Tests for ResponseCache()."""
+
+    def test_repeated_get_served_from_cache(self):
+        cache = ResponseCache()
+        inner, calls = _counting_transport(b'{"ok": true}')
+        for _ in range(3):
+            with httpx.Client(transport=cache.transport(inner)) as client:
+                assert client.get("https://vendor.test/api").json() == {"ok": True}
+        assert len(calls) == 1
+        assert cache.hits == 2
+
+    def test_concurrent_gets_coalesce(self):
+        cache = ResponseCache()
+        release = threading.Event()
+        inner, calls = _counting_transport(b"page", delay=release)
+        results = []
+
+        def fetch():
+            with httpx.Client(transport=cache.transport(inner)) as client:
+                results.append(client.get("https://vendor.test/p").text)
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+        assert results == ["page"] * 4
+        assert len(calls) == 1
+
+    def test_errors_not_cached(self):
+        cache = ResponseCache()
+        inner, calls = _counting_transport(b"gone", status=503)
+        with httpx.Client(transport=cache.transport(inner)) as client:
+            client.get("https://vendor.test/p")
+            client.get("https://vendor.test/p")
+        assert len(calls) == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.shared("a", lambda: ("a", 6))
+        cache.shared("b", lambda: ("b", 6))
+        assert cache.shared("a", lambda: ("recomputed", 6)) == "recomputed"
+        assert cache.hits == 0
+
+    def test_failed_compute_not_cached(self):
+        cache = ResponseCache()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        try:
+            cache.shared("k", fail)
+        except RuntimeError:
+            pass
+        assert cache.shared("k", lambda: ("ok", 1)) == "ok"
+
+    def test_first_match_result_shared(self):
+        cache = ResponseCache()
+        inner, calls = _counting_transport(b'<html><a id="dl" href="/f.exe">x</a></html>')
+        with use_cache(cache), httpx.Client(transport=cache.transport(inner)) as client:
+            first = first_match(client, "https://vendor.test/", [("a#dl", "css")])
+            second = first_match(client, "https://vendor.test/", [("a#dl", "css")])
+        assert first is second
+        assert len(calls) == 1
+
+
+class TestRevalidatingCache:
+    """Tests for RevalidatingCache()."""
+
+    def _transport(self, etag: str):
+        seen: list[str | None] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == etag:
+                return httpx.Response(304, headers={"etag": etag})
+            return httpx.Response(200, content=f"body {etag}".encode(), headers={"etag": etag})
+
+        return httpx.MockTransport(handler), seen
+
+    def test_unchanged_page_served_from_304(self):
+        cache = RevalidatingCache()
+        inner, seen = self._transport('"v1"')
+        with httpx.Client(transport=cache.transport(inner)) as client:
+            assert client.get("https://vendor.test/p").text == 'body "v1"'
+            assert client.get("https://vendor.test/p").text == 'body "v1"'
+        assert seen == [None, '"v1"']
+        assert cache.hits == 1
+
+    def test_changed_page_replaces_entry(self):
+        cache = RevalidatingCache()
+        inner, _ = self._transport('"v1"')
+        with httpx.Client(transport=cache.transport(inner)) as client:
+            client.get("https://vendor.test/p")
+        inner, seen = self._transport('"v2"')
+        with httpx.Client(transport=cache.transport(inner)) as client:
+            assert client.get("https://vendor.test/p").text == 'body "v2"'
+            assert client.get("https://vendor.test/p").text == 'body "v2"'
+        assert seen == ['"v1"', '"v2"']
+        assert cache.hits == 1
+
+    def test_pages_without_validators_not_stored(self):
+        cache = RevalidatingCache()
+        inner, calls = _counting_transport(b"page")
+        with httpx.Client(transport=cache.transport(inner)) as client:
+            client.get("https://vendor.test/p")
+            client.get("https://vendor.test/p")
+        assert len(calls) == 2
+        assert cache.hits == 0
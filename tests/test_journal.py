@@ -0,0 +1,54 @@
+"""Tests for journal.py."""
+
+import hashlib
+
+from it_claws.journal import JOURNAL_NAME, Journal
+
+
+class TestJournal:
+    """Tests for Journal()."""
+
+    def test_finished_job_survives_reload(self, tmp_path):
+        out = tmp_path / "f.exe"
+        out.write_bytes(b"MZ")
+        journal = Journal(tmp_path)
+        journal.start("a", out, '"v1"', 0)
+        journal.done("a", [out])
+        journal.close()
+        assert Journal(tmp_path, resume=True).finished("a")
+        out.write_bytes(b"MZ!")
+        assert not Journal(tmp_path, resume=True).finished("a")
+
+    def test_partial_offset_from_last_checkpoint(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("it_claws.journal.CHECKPOINT_EVERY", 4)
+        dest = tmp_path / "f.exe"
+        dest.write_bytes(b"x" * 100)
+        journal = Journal(tmp_path)
+        journal.start("a", dest, '"v1"', 0)
+        for _ in range(3):
+            journal.advance("a", 3)
+        journal.close()
+        with open(tmp_path / JOURNAL_NAME, "a") as f:
+            f.write('{"event": "offs')
+        assert Journal(tmp_path, resume=True).partial("a", dest) == (6, '"v1"')
+        assert Journal(tmp_path, resume=True).partial("a", tmp_path / "g.exe") is None
+
+    def test_downloaded_checks_hash(self, tmp_path):
+        dest = tmp_path / "f.zip"
+        dest.write_bytes(b"PK data")
+        journal = Journal(tmp_path)
+        journal.start("a", dest, None, 0)
+        journal.finish_download("a", 7, hashlib.sha256(b"PK data").hexdigest())
+        journal.close()
+        assert Journal(tmp_path, resume=True).downloaded("a", dest)
+        dest.write_bytes(b"PK dat!")
+        assert not Journal(tmp_path, resume=True).downloaded("a", dest)
+
+    def test_without_resume_starts_empty(self, tmp_path):
+        out = tmp_path / "f.exe"
+        out.write_bytes(b"MZ")
+        journal = Journal(tmp_path)
+        journal.start("a", out, None, 0)
+        journal.done("a", [out])
+        journal.close()
+        assert not Journal(tmp_path).finished("a")
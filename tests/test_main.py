@@ -0,0 +1,73 @@
+"""Tests for main.py."""
+
+import signal
+import sys
+import time
+
+import pytest
+
+from it_claws import main
+from it_claws.bandwidth import BandwidthLimiter
+from it_claws.presets import REGISTRY
+
+
+def _run(monkeypatch, tmp_path, *argv):
+    monkeypatch.setattr(sys, "argv", ["it-claws", "-o", str(tmp_path / "out"), *argv])
+    main.run()
+
+
+class TestRun:
+    """Tests for run()."""
+
+    def test_unknown_target_rejected(self, monkeypatch, tmp_path, capsys):
+        monkeypatch.setattr(main, "resolve_selected_targets", lambda *a: pytest.fail("started"))
+        with pytest.raises(SystemExit) as exc:
+            _run(monkeypatch, tmp_path, "-t", "zoom", "no-such-target")
+        assert exc.value.code == 2
+        assert "unknown target(s): no-such-target" in capsys.readouterr().err
+
+    def test_catalog_targets_known(self, monkeypatch, tmp_path, capsys):
+        monkeypatch.setattr(REGISTRY, "_entries", None)
+        monkeypatch.setattr(REGISTRY, "_sources", list(REGISTRY._sources))
+        catalog = tmp_path / "extra.toml"
+        catalog.write_text(
+            '[[targets]]\nname = "extra-tool"\npath = "software/{name}"\n'
+            'resolver_type = "static"\nresolver = "resolve_direct_url"\nfile_type = "exe"\n'
+            'resolver_kwargs = { url = "https://dl.example.com/tool.exe" }\n'
+        )
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        _run(monkeypatch, tmp_path, "--catalog", str(catalog), "-t", "extra-tool", "--list-targets")
+        assert capsys.readouterr().out.startswith("extra-tool\t")
+
+    @pytest.mark.parametrize("size", ["0", "-64"])
+    def test_non_positive_chunk_size_rejected(self, monkeypatch, tmp_path, capsys, size):
+        monkeypatch.setattr(main, "resolve_selected_targets", lambda *a: pytest.fail("started"))
+        with pytest.raises(SystemExit) as exc:
+            _run(monkeypatch, tmp_path, "--all", "--chunk-size", size)
+        assert exc.value.code == 2
+        assert "--chunk-size must be positive" in capsys.readouterr().err
+
+
+class TestBandwidthSignals:
+    """Tests for _bandwidth_signals()."""
+
+    def test_handler_does_not_wait_for_limiter_lock(self, monkeypatch):
+        handlers = {}
+        monkeypatch.setattr(
+            signal, "signal", lambda signum, handler: handlers.update({signum: handler})
+        )
+        limiter = BandwidthLimiter(8e6)
+        main._bandwidth_signals(limiter)
+
+        with limiter._lock:
+            handlers[signal.SIGUSR1](signal.SIGUSR1, None)
+            assert limiter.rate == 8e6
+        deadline = time.monotonic() + 5
+        while limiter.rate != 4e6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert limiter.rate == 4e6
+
+        handlers[signal.SIGUSR2](signal.SIGUSR2, None)
+        while limiter.rate != 8e6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert limiter.rate == 8e6
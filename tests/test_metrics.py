@@ -0,0 +1,72 @@
+"""Tests for metrics.py."""
+
+import httpx
+
+from it_claws.metrics import MetricsServer, render, write_textfile
+from it_claws.report import RunReport
+
+
+def _report() -> RunReport:
+    report = RunReport("ConcurrentPipeline", 3)
+    report.add_job("a", "a", "static")
+    report.add_job("b", "b", "dynamic")
+    report.add_stage_time("a", "download", 2.0)
+    report.update_job("a", bytes=1000, succeeded=True)
+    report.add_cache_hit("http")
+    report.mark_upload_ready()
+    report.finish()
+    return report
+
+
+class TestRender:
+    """Tests for render()."""
+
+    def test_jobs_by_outcome(self):
+        text = render(_report())
+        assert 'it_claws_jobs_total{outcome="succeeded"} 1' in text
+        assert 'it_claws_jobs_total{outcome="failed"} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        text = render(_report())
+        assert 'it_claws_stage_duration_seconds_bucket{stage="download",le="1.0"} 0' in text
+        assert 'it_claws_stage_duration_seconds_bucket{stage="download",le="2.5"} 1' in text
+        assert 'it_claws_stage_duration_seconds_bucket{stage="download",le="+Inf"} 1' in text
+        assert 'it_claws_stage_duration_seconds_count{stage="download"} 1' in text
+
+    def test_counters_and_gauges(self):
+        text = render(_report())
+        assert "it_claws_downloaded_bytes_total 1000" in text
+        assert 'it_claws_cache_hits_total{cache="http"} 1' in text
+        assert "it_claws_upload_ready_seconds " in text
+        assert text.endswith("\n")
+
+    def test_every_sample_has_a_type(self):
+        text = render(_report())
+        typed = {line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")}
+        for line in text.splitlines():
+            if line.startswith("#"):
+                continue
+            name = line.split("{")[0].split()[0]
+            family = name.removesuffix("_bucket").removesuffix("_sum").removesuffix("_count")
+            assert family in typed
+
+
+class TestExport:
+    """Tests for write_textfile() and MetricsServer."""
+
+    def test_write_textfile_replaces_atomically(self, tmp_path):
+        path = tmp_path / "collector" / "it_claws.prom"
+        write_textfile(_report(), path)
+        assert "it_claws_jobs_total" in path.read_text()
+        assert [p.name for p in path.parent.iterdir()] == ["it_claws.prom"]
+
+    def test_server_serves_metrics(self):
+        report = _report()
+        server = MetricsServer(0, lambda: report).start()
+        try:
+            response = httpx.get(f"http://127.0.0.1:{server.port}/metrics")
+            assert response.status_code == 200
+            assert "it_claws_jobs_total" in response.text
+            assert httpx.get(f"http://127.0.0.1:{server.port}/other").status_code == 404
+        finally:
+            server.stop()
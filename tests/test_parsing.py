@@ -0,0 +1,67 @@
+"""Tests for parsing.py."""
+
+import httpx
+
+from it_claws import parsing
+from it_claws.parsing import compile_selector, first_match, observe_parse
+
+FILLER = b"<div class='row'><p>filler</p><a href='/other'>o</a></div>" * 4000
+
+
+def _client(body: bytes, chunk: int = 4096) -> tuple[httpx.Client, list[int]]:
+    """Client serving ``body`` in chunks; the list collects bytes actually sent."""
+    sent: list[int] = []
+
+    def chunks():
+        for i in range(0, len(body), chunk):
+            sent.append(chunk)
+            yield body[i : i + chunk]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=chunks(), headers={"content-type": "text/html"})
+
+    return httpx.Client(transport=httpx.MockTransport(handler)), sent
+
+
+class TestFirstMatch:
+    """Tests for first_match()."""
+
+    def test_stops_reading_after_early_match(self, monkeypatch):
+        monkeypatch.setattr(parsing, "FIRST_CHECK", 4096)
+        body = b'<html><body><a id="dl" href="/f.exe">x</a>' + FILLER + b"</body></html>"
+        client, sent = _client(body)
+        node = first_match(client, "https://vendor.test/", [("a#dl", "css")])
+        assert node.get("href") == "/f.exe"
+        assert sum(sent) < len(body) // 4
+
+    def test_match_at_end(self):
+        body = b"<html><body>" + FILLER + b'<a id="dl" href="/f.exe">x</a></body></html>'
+        client, _ = _client(body)
+        node = first_match(client, "https://vendor.test/", [('//a[@id="dl"]', "xpath")])
+        assert node.get("href") == "/f.exe"
+
+    def test_selectors_in_priority_order(self):
+        body = b'<a class="b" href="/b">b</a>' + FILLER + b'<a class="a" href="/a">a</a>'
+        client, _ = _client(body)
+        node = first_match(client, "https://vendor.test/", [("a.a", "css"), ("a.b", "css")])
+        assert node.get("href") == "/a"
+
+    def test_no_match(self):
+        client, _ = _client(b"<html><body>" + FILLER + b"</body></html>")
+        assert first_match(client, "https://vendor.test/", [("a#dl", "css")]) is None
+
+    def test_reports_parse_time(self):
+        client, _ = _client(b'<html><a id="dl" href="/f.exe">x</a></html>')
+        seconds = []
+        with observe_parse(seconds.append):
+            first_match(client, "https://vendor.test/", [("a#dl", "css")])
+        assert len(seconds) == 1
+        assert seconds[0] > 0
+
+
+class TestCompileSelector:
+    """Tests for compile_selector()."""
+
+    def test_cached(self):
+        assert compile_selector("a.x") is compile_selector("a.x")
+        assert compile_selector("//a", "xpath") is not compile_selector("a")
@@ -0,0 +1,52 @@
+"""Tests for profiling.py."""
+
+import pstats
+import threading
+import time
+
+from it_claws.profiling import StageProfiler
+from it_claws.report import RunReport
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class TestStageProfiler:
+    """Tests for StageProfiler."""
+
+    def test_samples_are_split_by_stage(self, tmp_path):
+        report = RunReport("ConcurrentPipeline", 2)
+        report.add_job("a", "a", "static")
+        profiler = StageProfiler(lambda: report, interval=0.001).start()
+
+        def work():
+            with report.stage("a", "extract"):
+                _busy(0.2)
+
+        worker = threading.Thread(target=work)
+        worker.start()
+        with report.stage("a", "resolve"):
+            _busy(0.2)
+        worker.join()
+        profiler.stop()
+
+        assert profiler.stages() == ["extract", "resolve"]
+        written = {p.name for p in profiler.write(tmp_path)}
+        assert {"extract.collapsed", "extract.pstats", "summary.txt"} <= written
+        assert "_busy" in (tmp_path / "extract.collapsed").read_text()
+
+    def test_pstats_file_loads(self, tmp_path):
+        report = RunReport("ConcurrentPipeline", 1)
+        report.add_job("a", "a", "static")
+        profiler = StageProfiler(lambda: report, interval=0.001).start()
+        with report.stage("a", "archive"):
+            _busy(0.2)
+        profiler.stop()
+        profiler.write(tmp_path)
+
+        stats = pstats.Stats(str(tmp_path / "archive.pstats"))
+        assert any(func[2] == "_busy" for func in stats.stats)
+        assert "== archive:" in (tmp_path / "summary.txt").read_text()
@@ -0,0 +1,132 @@
+"""Tests for registry.py."""
+
+import json
+
+import pytest
+
+from it_claws import registry
+from it_claws.models import ScrapeTarget, TargetGroup
+from it_claws.registry import Registry, load_catalog
+from it_claws.scrapers import resolve_direct_url, resolve_static_download
+
+CATALOG = """
+[[targets]]
+name = "b850m-lan"
+path = "network/{name}"
+vendor = "gigabyte"
+tags = ["lan"]
+resolver_type = "static"
+resolver = "resolve_static_download"
+file_type = "zip/exe"
+resolver_kwargs = { url = "https://www.gigabyte.com/b850m", selector = "a" }
+
+[[targets]]
+name = "b850m-wireless"
+path = "miscellaneous/{name}"
+tags = ["wireless"]
+[[targets.members]]
+name = "wifi"
+resolver_type = "static"
+resolver = "resolve_direct_url"
+file_type = "exe"
+resolver_kwargs = { url = "https://dl.example.com/wifi.exe" }
+"""
+
+
+@pytest.fixture(autouse=True)
+def _cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+class TestLoadCatalog:
+    """Tests for load_catalog()."""
+
+    def test_toml_targets_and_groups(self, tmp_path):
+        path = tmp_path / "boards.toml"
+        path.write_text(CATALOG)
+        lan, wireless = load_catalog(path)
+        assert lan.resolver is resolve_static_download
+        assert lan.tags == ("lan",)
+        assert isinstance(wireless, TargetGroup)
+        assert wireless.members[0].resolver is resolve_direct_url
+
+    def test_json_catalog(self, tmp_path):
+        path = tmp_path / "apps.json"
+        entry = {
+            "name": "tool",
+            "path": "software/{name}",
+            "resolver_type": "static",
+            "resolver": "resolve_direct_url",
+            "file_type": "exe",
+        }
+        path.write_text(json.dumps({"targets": [entry]}))
+        assert load_catalog(path)[0].name == "tool"
+
+    def test_second_load_uses_cache(self, tmp_path, monkeypatch):
+        path = tmp_path / "boards.toml"
+        path.write_text(CATALOG)
+        load_catalog(path)
+        monkeypatch.setattr(registry, "parse_catalog", lambda p: pytest.fail("parsed again"))
+        assert [e.name for e in load_catalog(path)] == ["b850m-lan", "b850m-wireless"]
+
+    def test_unknown_priority(self, tmp_path):
+        path = tmp_path / "bad.toml"
+        path.write_text(CATALOG.replace('tags = ["lan"]', 'tags = ["lan"]\npriority = "urgent"'))
+        with pytest.raises(ValueError, match="urgent"):
+            load_catalog(path)
+
+    def test_invalid_sha256(self, tmp_path):
+        path = tmp_path / "bad.toml"
+        path.write_text(CATALOG.replace('tags = ["lan"]', 'tags = ["lan"]\nsha256 = "abc"'))
+        with pytest.raises(ValueError, match="sha256"):
+            load_catalog(path)
+
+    def test_unknown_resolver(self, tmp_path):
+        path = tmp_path / "bad.toml"
+        path.write_text(CATALOG.replace('"resolve_direct_url"', '"resolve_nothing"'))
+        with pytest.raises(ValueError, match="b850m-wireless"):
+            load_catalog(path)
+
+
+class TestRegistry:
+    """Tests for Registry()."""
+
+    def _registry(self, tmp_path):
+        path = tmp_path / "boards.toml"
+        path.write_text(CATALOG)
+        builtin = ScrapeTarget(
+            name="b850m-lan",
+            path="old/{name}",
+            resolver_type="static",
+            resolver=resolve_direct_url,
+            file_type="exe",
+        )
+        return Registry([lambda: [builtin], path])
+
+    def test_later_source_overrides(self, tmp_path):
+        reg = self._registry(tmp_path)
+        assert reg.names() == ["b850m-lan", "b850m-wireless"]
+        assert reg.get("b850m-lan").path == "network/{name}"
+
+    def test_queries(self, tmp_path):
+        reg = self._registry(tmp_path)
+        assert reg.query(vendor="gigabyte") == ["b850m-lan"]
+        assert reg.query(vendor="example") == ["b850m-wireless"]
+        assert reg.query(tag="wireless") == ["b850m-wireless"]
+        assert reg.query(path="network/*") == ["b850m-lan"]
+        assert reg.query(vendor="gigabyte", tag="wireless") == []
+
+    def test_expand_group_and_member_lookup(self, tmp_path):
+        reg = self._registry(tmp_path)
+        ((member, label),) = reg.expand(["b850m-wireless", "missing"])
+        assert member.path == "miscellaneous/b850m-wireless/"
+        assert label == "b850m-wireless wifi"
+        assert reg.target("wifi").name == "wifi"
+
+    def test_group_priority_applies_to_members(self, tmp_path):
+        path = tmp_path / "boards.toml"
+        path.write_text(
+            CATALOG.replace('tags = ["wireless"]', 'tags = ["wireless"]\npriority = "low"')
+        )
+        ((member, _),) = Registry([path]).expand(["b850m-wireless"])
+        assert member.priority == "low"
@@ -0,0 +1,50 @@
+"""Tests for replay.py."""
+
+import httpx
+import pytest
+
+from it_claws.replay import ResolveStore
+from it_claws.scrapers import resolve_static_download
+
+
+class TestResolveStore:
+    """Tests for ResolveStore()."""
+
+    def test_replays_recorded_resolve(self, tmp_path):
+        page = '<a class="dl" href="/files/setup.exe">Download</a>'
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.path)
+            return httpx.Response(200, html=page)
+
+        recorder = ResolveStore(tmp_path)
+        with httpx.Client(transport=recorder.transport(httpx.MockTransport(handler))) as client:
+            recorded = resolve_static_download(client, url="https://vendor.test/p", selector="a.dl")
+        recorder.save()
+
+        replayer = ResolveStore(tmp_path, replay=True)
+        with httpx.Client(transport=replayer.transport()) as client:
+            replayed = resolve_static_download(client, url="https://vendor.test/p", selector="a.dl")
+        assert replayed == recorded == "https://vendor.test/files/setup.exe"
+        assert seen == ["/p"]
+
+    def test_unrecorded_request_fails(self, tmp_path):
+        ResolveStore(tmp_path).save()
+        store = ResolveStore(tmp_path, replay=True)
+        with httpx.Client(transport=store.transport()) as client:
+            with pytest.raises(RuntimeError, match="No recorded response"):
+                client.get("https://vendor.test/missing")
+
+    def test_browser_results_round_trip(self, tmp_path):
+        recorder = ResolveStore(tmp_path)
+        recorder.record_resolved_url("MSI Chipset", "https://vendor.test/chipset.zip")
+        recorder.record_cookies("MSI Chipset", {"session": "abc"})
+        recorder.save()
+        store = ResolveStore(tmp_path, replay=True)
+        assert store.resolved_url("MSI Chipset") == "https://vendor.test/chipset.zip"
+        assert store.cookies("MSI Chipset") == {"session": "abc"}
+
+    def test_replay_requires_recording(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ResolveStore(tmp_path, replay=True)
@@ -0,0 +1,65 @@
+"""Tests for report.py."""
+
+import json
+import threading
+
+from it_claws.report import RunReport
+
+
+class TestRunReport:
+    """Tests for RunReport."""
+
+    def test_job_stage_times_accumulate(self):
+        report = RunReport("ConcurrentPipeline", 3)
+        report.add_job("a", "a", "static")
+        report.add_stage_time("a", "download", 1.5)
+        report.add_stage_time("a", "download", 0.5)
+        report.update_job("a", bytes=4000, succeeded=True)
+        job = report.to_dict()["jobs"][0]
+        assert job["stages"]["download"] == 2.0
+        assert job["throughput_bps"] == 2000.0
+
+    def test_retries_derived_from_attempts(self):
+        report = RunReport("ConcurrentPipeline", 3)
+        report.add_job("a", "a", "static")
+        report.add_attempt("a")
+        report.add_attempt("a")
+        data = report.to_dict()
+        assert data["jobs"][0]["retries"] == 1
+        assert data["totals"]["retries"] == 1
+
+    def test_peak_concurrency_per_stage(self):
+        report = RunReport("ConcurrentPipeline", 2)
+        for name in ("a", "b"):
+            report.add_job(name, name, "static")
+        inside = threading.Barrier(2)
+
+        def work(name):
+            with report.stage(name, "download"):
+                inside.wait()
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in ("a", "b")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with report.stage("a", "extract"):
+            pass
+        stages = report.to_dict()["totals"]["stages"]
+        assert stages["download"]["peak_concurrency"] == 2
+        assert stages["extract"]["peak_concurrency"] == 1
+
+    def test_run_level_stage_overrides_job_sum(self):
+        report = RunReport("ConcurrentPipeline", 1)
+        report.add_job("a", "a", "static")
+        report.add_stage_time("a", "archive", 0.25)
+        report.add_stage_time(None, "archive", 1.0)
+        assert report.to_dict()["totals"]["stages"]["archive"]["seconds"] == 1.0
+
+    def test_write_produces_json(self, tmp_path):
+        report = RunReport("AsyncPipeline", 1)
+        report.finish()
+        report.write(tmp_path / "out" / "report.json")
+        data = json.loads((tmp_path / "out" / "report.json").read_text())
+        assert data["engine"] == "AsyncPipeline"
+        assert data["wall_seconds"] is not None
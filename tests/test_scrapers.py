@@ -0,0 +1,154 @@
+"""Tests for scrapers.py."""
+
+import httpx
+
+from it_claws import scrapers
+from it_claws.scrapers import (
+    fetch_cookies,
+    resolve_asus_many,
+    resolve_asus_static,
+    resolve_msi_static,
+    resolve_nvidia_static,
+)
+
+
+def _client(routes: dict[str, httpx.Response]) -> httpx.Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return routes.get(request.url.path, httpx.Response(404))
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+class TestResolveNvidiaStatic:
+    """Tests for resolve_nvidia_static()."""
+
+    def test_follows_landing_page(self):
+        client = _client(
+            {
+                "/grd/": httpx.Response(
+                    200, html='<a id="DsktpGrdDwnldBtn" href="/download/driverResults/1/">x</a>'
+                ),
+                "/download/driverResults/1/": httpx.Response(
+                    200, html='<a id="agreeDownloadBtn" href="https://dl.example/driver.exe">x</a>'
+                ),
+            }
+        )
+        assert resolve_nvidia_static(client, "https://nvidia.test/grd/") == (
+            "https://dl.example/driver.exe"
+        )
+
+    def test_missing_button_returns_none(self):
+        client = _client({"/grd/": httpx.Response(200, html="<p>nothing</p>")})
+        assert resolve_nvidia_static(client, "https://nvidia.test/grd/") is None
+
+
+class TestResolveMsiStatic:
+    """Tests for resolve_msi_static()."""
+
+    def test_matches_driver_name_within_type(self):
+        payload = {
+            "result": {
+                "downloads": {
+                    "LAN Drivers": [
+                        {"download_title": "Realtek PCI-E Ethernet Drivers", "download_url": "lan"}
+                    ],
+                    "On-Board Audio Drivers": [
+                        {"download_title": "Other", "download_url": "other"},
+                        {"download_title": "Realtek HD Universal Driver", "download_url": "audio"},
+                    ],
+                }
+            }
+        }
+        client = _client({"/api/v1/product/support/panel": httpx.Response(200, json=payload)})
+        url = resolve_msi_static(
+            client,
+            "https://msi.com/Motherboard/MAG-X870-TOMAHAWK-WIFI/support#driver",
+            driver_type="On-Board Audio Drivers",
+            driver_name="Realtek HD Universal Driver",
+        )
+        assert url == "audio"
+
+    def test_unexpected_payload_returns_none(self):
+        client = _client({"/api/v1/product/support/panel": httpx.Response(200, json={})})
+        url = resolve_msi_static(
+            client,
+            "https://msi.com/Motherboard/MAG-X870-TOMAHAWK-WIFI/support",
+            driver_type="LAN Drivers",
+            driver_name="Realtek",
+        )
+        assert url is None
+
+
+ASUS_DRIVERS = {
+    "Result": {
+        "Obj": [
+            {
+                "Name": "Wireless",
+                "Files": [{"DownloadUrl": {"Global": "https://dl.test/wifi.zip"}}],
+            },
+            {"Name": "Bluetooth", "Files": [{"DownloadUrl": {"Global": "https://dl.test/bt.zip"}}]},
+        ]
+    }
+}
+
+
+class TestResolveAsusMany:
+    """Tests for resolve_asus_many()."""
+
+    def test_one_request_for_all_categories(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=ASUS_DRIVERS)
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        urls = resolve_asus_many(
+            client,
+            [
+                {"model": "B650M", "category": "Bluetooth"},
+                {"model": "B650M", "category": "Wireless"},
+                {"model": "B650M", "category": "Audio"},
+            ],
+        )
+        assert urls == ["https://dl.test/bt.zip", "https://dl.test/wifi.zip", None]
+        assert len(requests) == 1
+
+    def test_batch_key_groups_by_model(self):
+        key = resolve_asus_static.batch_key
+        assert key(model="B650M", category="Wireless") == key(model="B650M", category="Audio")
+        assert key(model="B650M", category="Wireless") != key(model="B860M", category="Wireless")
+
+
+class _CookieDriver:
+    """Stands in for Chrome; the cookie appears on the third CDP query."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.queries += 1
+        if self.queries < 3:
+            return {"cookies": []}
+        return {"cookies": [{"name": "aws-waf-token", "value": "t", "session": True}]}
+
+
+class TestFetchCookies:
+    """Tests for fetch_cookies()."""
+
+    def test_waits_for_required_cookie(self, monkeypatch):
+        monkeypatch.setattr(scrapers, "COOKIE_POLL_INTERVAL", 0)
+        driver = _CookieDriver()
+        found = fetch_cookies(driver, "https://dl.test/f.exe", ["aws-waf-token"])
+        assert [c["value"] for c in found] == ["t"]
+        assert driver.queries == 3
+
+    def test_timeout_returns_empty(self, monkeypatch):
+        monkeypatch.setattr(scrapers, "COOKIE_POLL_INTERVAL", 0)
+        assert fetch_cookies(_CookieDriver(), "https://dl.test/f.exe", ["other"], timeout=0) == []
@@ -0,0 +1,87 @@
+"""Tests for server.py."""
+
+import threading
+
+import pytest
+
+from it_claws import server
+from it_claws.bandwidth import BandwidthLimiter
+from it_claws.presets import get_selection_choices
+from it_claws.report import RunReport
+from it_claws.server import BuildError, BuildService, parse_request
+
+
+class _FakePipeline:
+    """Blocks in execute until released, then reports every job as done."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+        self.report = None
+        self.bandwidth = BandwidthLimiter()
+        self.archive_format = "zip"
+
+    def execute(self, jobs, output_root, zip_path=None, **_):
+        self.calls += 1
+        self.report = RunReport("fake", 1)
+        self.release.wait(5)
+        return [(job, True, "ok") for job in jobs]
+
+
+class TestParseRequest:
+    """Tests for parse_request()."""
+
+    def test_targets(self):
+        name = get_selection_choices()[0]
+        names, options = parse_request({"targets": [name, name], "zip": True})
+        assert names == [name]
+        assert options == {"zip": True, "zip_prefix": None, "manifest": False}
+
+    @pytest.mark.parametrize(
+        "body",
+        [{}, {"targets": ["no-such-target"]}, {"targets": "x"}, {"select": {"size": 1}}, []],
+    )
+    def test_rejected(self, body):
+        with pytest.raises(BuildError):
+            parse_request(body)
+
+
+class TestBuildService:
+    """Tests for BuildService()."""
+
+    def test_identical_requests_share_a_build(self, tmp_path):
+        pipeline = _FakePipeline()
+        service = BuildService(pipeline, tmp_path).start()
+        names = get_selection_choices()[:2]
+        first, joined_first = service.submit({"targets": names})
+        second, joined_second = service.submit({"targets": list(reversed(names))})
+        other, _ = service.submit({"targets": names, "zip": True})
+        assert not joined_first and joined_second
+        assert second is first
+        assert other is not first
+
+        pipeline.release.set()
+        service.stop()
+        service._worker.join(5)
+        assert pipeline.calls == 2
+        assert first.status == "succeeded"
+        assert [r["succeeded"] for r in first.results] == [True] * len(first.results)
+        assert first.report is not None
+
+    def test_set_bandwidth(self, tmp_path):
+        service = BuildService(_FakePipeline(), tmp_path)
+        assert service.set_bandwidth({"limit": "5M"})["limit_bps"] == 5e6
+        assert service.set_bandwidth({"limit": None})["limit_bps"] is None
+        for body in ({}, {"limit": -1}, {"limit": "fast"}, {"limit": True}):
+            with pytest.raises(BuildError):
+                service.set_bandwidth(body)
+
+
+class TestMain:
+    """Tests for main()."""
+
+    def test_unavailable_archive_format_exits_before_starting(self, monkeypatch):
+        monkeypatch.setattr(server.archive, "backend_error", lambda fmt: f"no {fmt} here")
+        monkeypatch.setattr(server, "get_selection_choices", lambda: pytest.fail("started"))
+        with pytest.raises(SystemExit):
+            server.main(["--archive-format", "tar.zst"])
@@ -0,0 +1,60 @@
+"""Tests for shard.py."""
+
+import pytest
+
+from it_claws.models import DownloadJob, ScrapeTarget
+from it_claws.scrapers import resolve_direct_url
+from it_claws.shard import parse_shard, partition
+
+
+def _jobs(tmp_path, paths):
+    return [
+        DownloadJob(
+            target=ScrapeTarget(
+                name=name,
+                path=path,
+                resolver_type="static",
+                resolver=resolve_direct_url,
+                file_type="exe",
+            ),
+            output_root=tmp_path,
+        )
+        for name, path in paths.items()
+    ]
+
+
+def _names(parts):
+    return [[job.display_name for job in part] for part in parts]
+
+
+class TestPartition:
+    """Tests for partition()."""
+
+    def test_covers_every_job_once(self, tmp_path):
+        jobs = _jobs(tmp_path, {f"t{i}": f"d/{i}" for i in range(7)})
+        parts = partition(jobs, 3)
+        assert sorted(sum(_names(parts), [])) == sorted(job.display_name for job in jobs)
+        assert [len(part) for part in parts] == [3, 2, 2]
+        assert _names(partition(jobs, 3)) == _names(parts)
+
+    def test_shared_directory_kept_together(self, tmp_path):
+        jobs = _jobs(tmp_path, {"a": "net", "b": "net", "c": "gpu", "d": "audio"})
+        parts = _names(partition(jobs, 2))
+        assert any({"a", "b"} <= set(part) for part in parts)
+
+    def test_balanced_by_weight(self, tmp_path):
+        jobs = _jobs(tmp_path, {name: name for name in "abcd"})
+        parts = partition(jobs, 2, {"a": 900, "b": 100, "c": 500, "d": 500})
+        assert _names(parts) == [["a", "b"], ["c", "d"]]
+
+
+class TestParseShard:
+    """Tests for parse_shard()."""
+
+    def test_one_based(self):
+        assert parse_shard("2/4") == (1, 4)
+
+    @pytest.mark.parametrize("value", ["0/4", "5/4", "1", "a/b"])
+    def test_rejected(self, value):
+        with pytest.raises(ValueError):
+            parse_shard(value)
@@ -0,0 +1,25 @@
+"""Tests for CLI startup imports."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import it_claws
+
+HEAVY_MODULES = {"selenium", "lxml", "inquirer", "fake_useragent", "patoolib", "asyncio", "httpx"}
+
+
+class TestStartupImports:
+    """Tests for lazy imports in main.py."""
+
+    def test_parser_does_not_import_heavy_modules(self):
+        probe = (
+            "import sys, it_claws.main; it_claws.main.build_parser(); "
+            "print(' '.join({m.split('.')[0] for m in sys.modules}))"
+        )
+        env = {**os.environ, "PYTHONPATH": str(Path(it_claws.__file__).parents[1])}
+        out = subprocess.run(
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True, env=env
+        ).stdout
+        assert HEAVY_MODULES.isdisjoint(out.split())
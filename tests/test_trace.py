@@ -0,0 +1,58 @@
+"""Tests for trace.py."""
+
+import json
+import threading
+
+from it_claws.report import RunReport
+from it_claws.trace import Tracer
+
+
+class TestTracer:
+    """Tests for Tracer()."""
+
+    def test_job_track_nests_stages(self, tmp_path):
+        tracer = Tracer()
+        report = RunReport("ConcurrentPipeline", 1, tracer)
+        report.add_job("a", "a", "static")
+        report.add_span("a", "queue", 1.0, 2.0)
+        with report.stage("a", "download"):
+            pass
+        path = tmp_path / "trace.json"
+        tracer.write(path)
+        events = json.loads(path.read_text())["traceEvents"]
+        job = [e for e in events if e.get("cat") == "job"]
+        assert [(e["ph"], e["name"]) for e in job] == [
+            ("b", "a"),
+            ("b", "queue"),
+            ("e", "queue"),
+            ("b", "download"),
+            ("e", "download"),
+            ("e", "a"),
+        ]
+        assert report.to_dict()["jobs"][0]["stages"]["queue"] == 1.0
+
+    def test_interleaved_thread_spans_only_on_job_tracks(self):
+        tracer = Tracer()
+        tracer.span("a", "download", 1.0, 3.0)
+        tracer.span("b", "download", 2.0, 4.0)
+        events = tracer.events()
+        assert not [e for e in events if e["ph"] == "X"]
+        assert len([e for e in events if e.get("cat") == "job"]) == 8
+
+    def test_sequential_thread_spans_emitted(self):
+        tracer = Tracer()
+        worker = threading.Thread(target=tracer.span, args=("a", "extract", 1.0, 2.0))
+        worker.start()
+        worker.join()
+        (span,) = [e for e in tracer.events() if e["ph"] == "X"]
+        assert span["tid"] == worker.ident
+        assert span["dur"] == 1_000_000
+
+    def test_transfer_bytes_counter(self):
+        tracer = Tracer()
+        report = RunReport("ConcurrentPipeline", 1, tracer)
+        report.add_transfer_bytes("a", 100)
+        report.end_transfer("a")
+        counters = [e["args"] for e in tracer.events() if e["ph"] == "C"]
+        assert counters[0] == {"in_flight": 100, "completed": 0}
+        assert counters[-1] == {"in_flight": 0, "completed": 100}
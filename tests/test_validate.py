@@ -0,0 +1,115 @@
+"""Tests for validate.py."""
+
+import hashlib
+import io
+import zipfile
+
+import httpx
+import pytest
+
+from it_claws.presets import REGISTRY
+from it_claws.scrapers import download_file
+from it_claws.validate import PayloadCheck, PayloadError, TruncatedError
+
+
+def _zip_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("setup.exe", b"MZ" + b"\0" * 1000)
+    return buffer.getvalue()
+
+
+class TestPayloadCheck:
+    """Tests for PayloadCheck()."""
+
+    def test_accepts_expected_signature_across_chunks(self):
+        check = PayloadCheck("exe", "https://vendor.test/f.exe")
+        for chunk in (b"M", b"Z\x90\x00", b"\x03\x00\x00\x00\x04"):
+            check.feed(chunk)
+
+    def test_rejects_html_page(self):
+        check = PayloadCheck("zip", "https://vendor.test/f.zip")
+        with pytest.raises(PayloadError, match="received a page"):
+            check.feed(b"<!DOCTYPE html><html>")
+
+    def test_rejects_wrong_file(self):
+        check = PayloadCheck("exe", "https://vendor.test/f.exe")
+        with pytest.raises(PayloadError, match="signature"):
+            check.feed(_zip_bytes())
+
+    def test_msi_preset_accepted(self, tmp_path):
+        target = REGISTRY.target("zoom")
+        url = target.resolver_kwargs["url"]
+        path = tmp_path / "ZoomInstallerFull.msi"
+        path.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\0" * 504)
+        check = PayloadCheck(target.file_type, url, target.sha256)
+        check.feed(path.read_bytes())
+        check.finish(path, hashlib.sha256(path.read_bytes()).hexdigest())
+
+    def test_archive_types_accept_7z(self):
+        PayloadCheck("zip/exe", "https://vendor.test/f.7z").feed(b"7z\xbc\xaf\x27\x1c\x00\x04")
+
+    def test_finish_sniffs_resumed_file(self, tmp_path):
+        path = tmp_path / "f.exe"
+        path.write_bytes(b"PK\x03\x04" + b"\0" * 16)
+        with pytest.raises(PayloadError):
+            PayloadCheck("exe", "https://vendor.test/f.exe").finish(path, "")
+
+    def test_finish_rejects_truncated_zip(self, tmp_path):
+        data = _zip_bytes()
+        path = tmp_path / "f.zip"
+        path.write_bytes(data[:-30])
+        check = PayloadCheck("zip", "https://vendor.test/f.zip")
+        check.feed(data[:64])
+        with pytest.raises(PayloadError, match="Corrupt zip"):
+            check.finish(path, "")
+        path.write_bytes(data)
+        check.finish(path, "")
+
+    def test_finish_checks_sha256(self, tmp_path):
+        path = tmp_path / "f.exe"
+        path.write_bytes(b"MZ" + b"\0" * 16)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        PayloadCheck("exe", "u", digest.upper()).finish(path, digest)
+        with pytest.raises(PayloadError, match="SHA-256"):
+            PayloadCheck("exe", "u", "0" * 64).finish(path, digest)
+
+
+class TestDownloadFileChecks:
+    """Tests for the checks download_file() runs."""
+
+    def _client(self, body: bytes, length: int, content_type: str = "application/octet-stream"):
+        headers = {"content-type": content_type, "content-length": str(length)}
+        return httpx.Client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, content=body, headers=headers)
+            )
+        )
+
+    def test_short_body_is_truncated(self, tmp_path):
+        dest = tmp_path / "f.exe"
+        with pytest.raises(TruncatedError, match="ended at 10 of 20"):
+            download_file(self._client(b"MZ" + b"\0" * 8, 20), "https://vendor.test/f.exe", dest)
+        assert dest.stat().st_size == 10
+
+    def test_wrong_payload_fails_on_first_chunk(self, tmp_path):
+        body = b"<html>" + b"x" * 100_000
+        written = []
+        with pytest.raises(PayloadError):
+            download_file(
+                self._client(body, len(body), "application/octet-stream"),
+                "https://vendor.test/f.exe",
+                tmp_path / "f.exe",
+                chunk_size=1024,
+                check=PayloadCheck("exe", "https://vendor.test/f.exe"),
+                progress=written.append,
+            )
+        assert sum(written) == 0
+
+    def test_html_content_type_is_payload_error(self, tmp_path):
+        with pytest.raises(PayloadError, match="HTML"):
+            download_file(
+                self._client(b"<html></html>", 13, "text/html"),
+                "https://vendor.test/f.exe",
+                tmp_path / "f.exe",
+            )
@@ -0,0 +1,152 @@
+"""Tests for watch.py."""
+
+import httpx
+import pytest
+
+from it_claws.engine import ConcurrentPipeline
+from it_claws.models import DownloadJob, ScrapeTarget
+from it_claws.scrapers import resolve_direct_url
+from it_claws.watch import Watcher, parse_interval
+
+
+def _job(tmp_path, name, path):
+    target = ScrapeTarget(
+        name=name,
+        path=path,
+        resolver_type="static",
+        resolver=resolve_direct_url,
+        file_type="exe",
+    )
+    return DownloadJob(target=target, output_root=tmp_path / "out")
+
+
+class _FakePipeline:
+    """Resolves to fixed URLs and probes to fixed validators (``None`` if unreachable)."""
+
+    def __init__(self, urls, etags):
+        self.urls = urls
+        self.etags = etags
+
+    def resolve(self, jobs):
+        return {job.display_name: self.urls[job.display_name] for job in jobs}
+
+    def probe(self, job, url):
+        etag = self.etags[url]
+        return None if etag is None else {"etag": etag}
+
+
+class TestWatcher:
+    """Tests for Watcher()."""
+
+    def _watcher(self, tmp_path, pipeline, jobs, built):
+        def build(selected):
+            built.append(sorted(job.display_name for job in selected))
+            for job in selected:
+                job.destination_directory.mkdir(parents=True, exist_ok=True)
+            return [(job, True, "ok") for job in selected]
+
+        return Watcher(pipeline, jobs, tmp_path / "out", build, tmp_path / "state.json")
+
+    def test_rebuilds_only_changed_targets(self, tmp_path):
+        jobs = [_job(tmp_path, "a", "net/{name}"), _job(tmp_path, "b", "gpu/{name}")]
+        pipeline = _FakePipeline(
+            {"a": "https://x/a", "b": "https://x/b"}, {"https://x/a": '"1"', "https://x/b": '"1"'}
+        )
+        built = []
+        watcher = self._watcher(tmp_path, pipeline, jobs, built)
+
+        assert watcher.cycle().changed == {"a": "new", "b": "new"}
+        assert watcher.cycle().changed == {}
+        pipeline.etags["https://x/b"] = '"2"'
+        assert watcher.cycle().changed == {"b": "etag"}
+        pipeline.urls["a"] = "https://x/a2"
+        pipeline.etags["https://x/a2"] = '"1"'
+        assert watcher.cycle().changed == {"a": "url"}
+        assert built == [["a", "b"], ["b"], ["a"]]
+
+    def test_shared_directory_rebuilt_together(self, tmp_path):
+        jobs = [_job(tmp_path, "a", "net"), _job(tmp_path, "b", "net"), _job(tmp_path, "c", "x")]
+        urls = {job.display_name: f"https://x/{job.display_name}" for job in jobs}
+        pipeline = _FakePipeline(urls, dict.fromkeys(urls.values(), '"1"'))
+        built = []
+        watcher = self._watcher(tmp_path, pipeline, jobs, built)
+        watcher.cycle()
+        pipeline.etags["https://x/a"] = '"2"'
+        watcher.cycle()
+        assert built[-1] == ["a", "b"]
+
+    def test_failed_probe_is_unresolved(self, tmp_path):
+        jobs = [_job(tmp_path, "a", "net/{name}"), _job(tmp_path, "b", "gpu/{name}")]
+        pipeline = _FakePipeline(
+            {"a": "https://x/a", "b": "https://x/b"}, {"https://x/a": '"1"', "https://x/b": '"1"'}
+        )
+        built = []
+        watcher = self._watcher(tmp_path, pipeline, jobs, built)
+        watcher.cycle()
+        pipeline.etags.update({"https://x/a": None, "https://x/b": '"2"'})
+        summary = watcher.cycle()
+        assert (summary.unresolved, summary.changed) == (["a"], {"b": "etag"})
+        assert built[-1] == ["b"]
+        pipeline.etags["https://x/a"] = '"1"'
+        assert watcher.cycle().unchanged == ["a", "b"]
+
+    def test_state_survives_restart(self, tmp_path):
+        jobs = [_job(tmp_path, "a", "net/{name}")]
+        pipeline = _FakePipeline({"a": "https://x/a"}, {"https://x/a": '"1"'})
+        built = []
+        self._watcher(tmp_path, pipeline, jobs, built).cycle()
+        summary = self._watcher(tmp_path, pipeline, jobs, built).cycle()
+        assert summary.unchanged == ["a"]
+        assert built == [["a"]]
+
+    def test_state_kept_with_output(self, tmp_path, monkeypatch):
+        jobs = [_job(tmp_path, "a", "net/{name}")]
+        pipeline = _FakePipeline({"a": "https://x/a"}, {"https://x/a": '"1"'})
+        built = []
+
+        def build(selected):
+            built.append(selected)
+            for job in selected:
+                job.destination_directory.mkdir(parents=True, exist_ok=True)
+            return [(job, True, "ok") for job in selected]
+
+        for cwd in ("first", "second"):
+            (tmp_path / cwd).mkdir()
+            monkeypatch.chdir(tmp_path / cwd)
+            summary = Watcher(pipeline, jobs, tmp_path / "out", build).cycle()
+        assert summary.unchanged == ["a"]
+        assert len(built) == 1
+        assert (tmp_path / "out" / ".it-claws-watch.json").exists()
+
+    def test_missing_output_rebuilt(self, tmp_path):
+        jobs = [_job(tmp_path, "a", "net/{name}")]
+        pipeline = _FakePipeline({"a": "https://x/a"}, {"https://x/a": '"1"'})
+        watcher = self._watcher(tmp_path, pipeline, jobs, [])
+        watcher.cycle()
+        jobs[0].destination_directory.rmdir()
+        assert watcher.cycle().changed == {"a": "missing"}
+
+
+class TestProbe:
+    """Tests for ConcurrentPipeline.probe()."""
+
+    def test_unreachable_url_is_none(self, tmp_path):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        pipeline = ConcurrentPipeline()
+        pipeline._transport = httpx.MockTransport(refuse)
+        assert pipeline.probe(_job(tmp_path, "a", "net/{name}"), "https://x/a") is None
+
+
+class TestParseInterval:
+    """Tests for parse_interval()."""
+
+    @pytest.mark.parametrize(("value", "seconds"), [("90", 90), ("30s", 30), ("15m", 900)])
+    def test_units(self, value, seconds):
+        assert parse_interval(value) == seconds
+
+    @pytest.mark.parametrize("value", ["0", "-1m", "soon"])
+    def test_rejected(self, value):
+        with pytest.raises(ValueError):
+            parse_interval(value)
@@ -0,0 +1,112 @@
+"""Tests for writer.py."""
+
+import hashlib
+import time
+
+import httpx
+
+from it_claws import writer
+from it_claws.scrapers import download_file
+from it_claws.writer import StreamWriter, TransferStats
+
+
+class TestStreamWriter:
+    """Tests for StreamWriter()."""
+
+    def test_progress_batched(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(writer, "PROGRESS_INTERVAL", 3600)
+        calls = []
+        with StreamWriter(
+            tmp_path / "f.bin", 0, started=time.perf_counter(), progress=calls.append
+        ) as w:
+            for _ in range(100):
+                w.write(b"x" * 10)
+        assert calls == [1000]
+        assert w.stats.bytes == 1000
+
+    def test_short_body_truncates_preallocation(self, tmp_path):
+        dest = tmp_path / "f.bin"
+        with StreamWriter(dest, 4096, started=time.perf_counter()) as w:
+            w.write(b"abc")
+        assert dest.read_bytes() == b"abc"
+
+    def test_drop_cache_keeps_content(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(writer, "DROP_CACHE_EVERY", 4)
+        dest = tmp_path / "f.bin"
+        with StreamWriter(dest, 0, started=time.perf_counter(), drop_cache=True) as w:
+            for part in (b"abcd", b"efgh", b"ij"):
+                w.write(part)
+        assert dest.read_bytes() == b"abcdefghij"
+
+    def test_offset_continues_file(self, tmp_path):
+        dest = tmp_path / "f.bin"
+        dest.write_bytes(b"abc" + b"\0" * 7)
+        digest = hashlib.sha256()
+        with StreamWriter(dest, 6, started=time.perf_counter(), offset=3, digest=digest) as w:
+            w.write(b"def")
+        assert dest.read_bytes() == b"abcdef"
+        assert digest.hexdigest() == hashlib.sha256(b"abcdef").hexdigest()
+        assert w.stats.bytes == 3
+
+
+class TestDownloadFile:
+    """Tests for download_file()."""
+
+    def test_fills_stats(self, tmp_path):
+        body = bytes(range(256)) * 1024
+        client = httpx.Client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(
+                    200, content=body, headers={"content-type": "application/octet-stream"}
+                )
+            )
+        )
+        stats = TransferStats()
+        dest = download_file(
+            client, "https://vendor.test/f.exe", tmp_path / "f.exe", chunk_size=4096, stats=stats
+        )
+        assert dest.read_bytes() == body
+        assert stats.bytes == len(body)
+        assert stats.first_byte_seconds is not None
+        assert stats.stream_seconds is not None
+
+    def _ranged_client(self, body: bytes, etag: str):
+        def handler(request: httpx.Request) -> httpx.Response:
+            headers = {"content-type": "application/octet-stream", "etag": etag}
+            if request.headers.get("if-range") == etag:
+                start = int(request.headers["range"].removeprefix("bytes=").rstrip("-"))
+                headers["content-range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                return httpx.Response(206, content=body[start:], headers=headers)
+            return httpx.Response(200, content=body, headers=headers)
+
+        return httpx.Client(transport=httpx.MockTransport(handler))
+
+    def test_resumes_with_range(self, tmp_path):
+        dest = tmp_path / "f.exe"
+        dest.write_bytes(b"0123")
+        starts = []
+        download_file(
+            self._ranged_client(b"0123456789", '"v1"'),
+            "https://vendor.test/f.exe",
+            dest,
+            offset=4,
+            if_range='"v1"',
+            on_start=lambda offset, _: starts.append(offset),
+        )
+        assert dest.read_bytes() == b"0123456789"
+        assert starts == [4]
+
+    def test_changed_file_starts_over(self, tmp_path):
+        dest = tmp_path / "f.exe"
+        dest.write_bytes(b"stale")
+        starts = []
+        download_file(
+            self._ranged_client(b"0123456789", '"v2"'),
+            "https://vendor.test/f.exe",
+            dest,
+            offset=5,
+            if_range='"v1"',
+            on_start=lambda offset, _: starts.append(offset),
+        )
+        assert dest.read_bytes() == b"0123456789"
+        assert starts == [0]